@@ -0,0 +1,174 @@
+# admission.py - Control de admisión y descarte de carga por clase de endpoint
+"""Los informes (``/report/...``) cuestan cientos de veces más que el CRUD de
+tarjetas. Para que no acaparen el pool de conexiones, cada clase de endpoint
+(``report`` o ``crud``) tiene:
+
+- un límite de peticiones simultáneas con una cola acotada: si la cola está
+  llena, o la petición espera más de ``queue_timeout``, se responde 503 al
+  momento en lugar de dejarla acumularse;
+- un token bucket por usuario (o por IP si no hay token): al agotarlo se
+  responde 429 con ``Retry-After``.
+
+Los límites se configuran en ``config.ADMISSION_LIMITS``; las métricas de cola
+y rechazos se publican en ``/api/metrics``.
+"""
+import asyncio
+import json
+import math
+import time
+from typing import Optional
+
+from auth_handler import user_id_from_authorization
+from config import ADMISSION_LIMITS
+from metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_REJECTED,
+)
+
+# Rutas que nunca se limitan (salud, métricas, documentación)
+EXEMPT_PATHS = ("/api/health", "/api/metrics", "/docs", "/redoc", "/openapi.json")
+MAX_BUCKETS = 10000
+
+
+def endpoint_class(path: str) -> Optional[str]:
+    if path.startswith(EXEMPT_PATHS):
+        return None
+    return "report" if path.startswith("/report") else "crud"
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, rate: float, burst: int) -> float:
+        """Consume un token; devuelve 0 o los segundos hasta el siguiente token."""
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, reason: str, detail: str, retry_after: float):
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class EndpointClassLimiter:
+    """Concurrencia, cola y tasa por usuario de una clase de endpoints."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int,
+                 queue_timeout: float, rate: float, burst: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._buckets: dict = {}
+
+    def check_rate(self, client_key: str) -> None:
+        bucket = self._buckets.get(client_key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._buckets.clear()  # los buckets olvidados vuelven a estar llenos
+            bucket = self._buckets[client_key] = TokenBucket(self.burst)
+        wait = bucket.take(self.rate, self.burst)
+        if wait:
+            raise Rejected(429, "rate_limited", "Demasiadas peticiones, inténtalo más tarde", wait)
+
+    def _publish(self) -> None:
+        ADMISSION_IN_FLIGHT.set((self.name,), self.in_flight)
+        ADMISSION_QUEUE_DEPTH.set((self.name,), self.waiting)
+
+    async def acquire(self) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                raise Rejected(503, "queue_full", "Servidor saturado, inténtalo más tarde", self.queue_timeout)
+            self.waiting += 1
+            self._publish()
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise Rejected(503, "queue_timeout", "Servidor saturado, inténtalo más tarde", self.queue_timeout)
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUE_WAIT.observe((self.name,), time.monotonic() - started)
+        else:
+            await self._slots.acquire()
+        self.in_flight += 1
+        self._publish()
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+        self._publish()
+
+
+def _client_key(scope) -> str:
+    headers = dict(scope["headers"])
+    user_id = user_id_from_authorization(headers.get(b"authorization", b"").decode("latin-1"))
+    if user_id is not None:
+        return f"user:{user_id}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def _reject(send, error: Rejected) -> None:
+    body = json.dumps({"detail": error.detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": error.status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(error.retry_after))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI que aplica los límites de cada clase de endpoint."""
+
+    def __init__(self, app, limits: dict = ADMISSION_LIMITS):
+        self.app = app
+        self.limiters = {name: EndpointClassLimiter(name, **cfg) for name, cfg in limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        name = endpoint_class(scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[name]
+        try:
+            limiter.check_rate(_client_key(scope))
+            await limiter.acquire()
+        except Rejected as error:
+            ADMISSION_REJECTED.inc((name, error.reason))
+            await _reject(send, error)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -1,20 +1,34 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
- 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+# python-jose (y con él cryptography) y passlib se importan al primer uso: son
+# la parte más lenta del arranque y muchos procesos (tests, scripts) no los usan.
+
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+
+def warm_up() -> None:
+    """Importa de antemano las librerías de JWT y hashing."""
+    import jose.jwt  # noqa: F401
+
+    _pwd_context()
  
  
 def hash_password(password: str) -> str:
     """Hashea una contraseña usando bcrypt"""
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
  
  
 def verify_password(password: str, hashed_password: str) -> bool:
     """Verifica si una contraseña coincide con su hash"""
-    return pwd_context.verify(password, hashed_password)
+    return _pwd_context().verify(password, hashed_password)
  
  
 def create_access_token(user_id: int, expires_delta: Optional[timedelta] = None) -> str:
@@ -24,6 +38,8 @@ def create_access_token(user_id: int, expires_delta: Optional[timedelta] = None)
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
  
+    from jose import jwt
+
     to_encode = {"sub": str(user_id), "exp": expire}
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -31,6 +47,8 @@ def create_access_token(user_id: int, expires_delta: Optional[timedelta] = None)
  
 def verify_token(token: str) -> Optional[int]:
     """Verifica un token JWT y retorna el user_id si es válido"""
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -38,4 +56,12 @@ def verify_token(token: str) -> Optional[int]:
             return None
         return int(user_id)
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+def user_id_from_authorization(value: str) -> Optional[int]:
+    """user_id de una cabecera ``Authorization: Bearer <token>``, si es válida."""
+    scheme, _, token = value.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return verify_token(token)
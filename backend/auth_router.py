@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from database import get_db
+from database import SessionLocal, engine, get_db
+from db_router import get_read_db
 from models import User
 from schemas import UserCreate, UserLogin, Token  # ✅ UserLogin ya existe
 from auth_handler import hash_password, verify_password, create_access_token, verify_token
-from crud import get_user_by_email, create_user
+from crud import create_user
+from hot_queries import user_credentials
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -14,8 +16,7 @@ router = APIRouter(tags=["auth"])
 @router.post("/register")
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Endpoint para registrar un nuevo usuario"""
-    existing_user = get_user_by_email(db, user_data.email)
-    if existing_user:
+    if user_credentials(db, user_data.email) is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
@@ -36,7 +37,7 @@ async def login(
     """Endpoint para login que acepta JSON"""
     
     # Buscar usuario por email
-    user = get_user_by_email(db, user_data.email)
+    user = user_credentials(db, user_data.email)
     
     if not user:
         raise HTTPException(
@@ -56,11 +57,7 @@ async def login(
    
     return Token(access_token=access_token, token_type="bearer")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
-    """Dependencia para obtener el usuario actual a partir del token JWT"""
+def _user_from_token(db: Session, token: str) -> User:
     user_id = verify_token(token)
     if user_id is None:
         raise HTTPException(
@@ -68,11 +65,33 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)  # clave primaria: mapa de identidad y sentencia en caché
+    if user is None and db.get_bind() is not engine:
+        # Usuario recién registrado que la réplica aún no tiene
+        primary = SessionLocal()
+        try:
+            user = primary.get(User, user_id)
+        finally:
+            primary.close()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
-    return user
\ No newline at end of file
+    return user
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+):
+    """Dependencia para obtener el usuario actual a partir del token JWT"""
+    return _user_from_token(db, token)
+
+async def get_current_read_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db),
+):
+    """Igual que ``get_current_user`` para endpoints de solo lectura: usa la misma
+    sesión que el endpoint (``get_read_db``), sin abrir otra en el primario."""
+    return _user_from_token(db, token)
@@ -0,0 +1 @@
+# Suite de benchmarks: generador de datos sintéticos y medición de flujos clave.
@@ -0,0 +1,174 @@
+# benchmarks/hot_queries.py - Coste por llamada de las consultas de propiedad
+"""Uso (desde backend/):
+
+    python -m benchmarks.hot_queries
+    python -m benchmarks.hot_queries --calls 20000 --database-url postgresql://...
+
+Compara, para cada comprobación del camino caliente, la forma anterior (un
+``Query`` del ORM construido en cada llamada), la sentencia construida al importar que
+devuelve la entidad y la consulta Core de ``hot_queries`` que devuelve un
+registro ligero. Todas las variantes usan la misma sesión y los mismos ids, así
+que la diferencia es la sobrecarga de Python por llamada.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.run_benchmarks import RESULTS_DIR, git_commit
+
+REPEATS = 5
+
+
+def _variants(hot_queries, models):
+    from sqlalchemy.orm import Session
+
+    Board, Card, ListModel, User = models.Board, models.Card, models.List, models.User
+
+    # Implementaciones anteriores, tal y como estaban en crud.py y card_router.py
+    def orm_board(db: Session, board_id, user_id):
+        return db.query(Board).filter(Board.id == board_id, Board.user_id == user_id).first()
+
+    def orm_list(db: Session, list_id, user_id):
+        return (
+            db.query(ListModel).join(Board, Board.id == ListModel.board_id)
+            .filter(ListModel.id == list_id, Board.user_id == user_id).first()
+        )
+
+    def orm_card(db: Session, card_id, user_id):
+        return (
+            db.query(Card).join(ListModel, ListModel.id == Card.list_id)
+            .join(Board, Board.id == ListModel.board_id)
+            .filter(Card.id == card_id, Board.user_id == user_id).first()
+        )
+
+    def orm_user(db: Session, email):
+        return db.query(User).filter(User.email == email).first()
+
+    def entity(statement, *names):
+        return lambda db, *args: db.execute(statement, dict(zip(names, args))).scalars().first()
+
+    return {
+        "board": {
+            "orm_query": orm_board,
+            "precompiled_entity": entity(hot_queries.BOARD_ENTITY_BY_OWNER, "board_id", "user_id"),
+            "core_record": hot_queries.owned_board,
+        },
+        "list": {
+            "orm_query": orm_list,
+            "precompiled_entity": entity(hot_queries.LIST_ENTITY_BY_OWNER, "list_id", "user_id"),
+            "core_record": hot_queries.owned_list,
+        },
+        "card": {
+            "orm_query": orm_card,
+            "precompiled_entity": entity(hot_queries.CARD_ENTITY_BY_OWNER, "card_id", "user_id"),
+            "core_record": hot_queries.owned_card,
+        },
+        "user_by_email": {
+            "orm_query": orm_user,
+            "precompiled_entity": entity(hot_queries.USER_ENTITY_BY_EMAIL, "email"),
+            "core_record": hot_queries.user_credentials,
+        },
+    }
+
+
+def _lookup_args(seeded, rng: random.Random, calls: int) -> dict:
+    user_id = rng.choice(sorted(seeded.boards_by_user))
+    boards = seeded.boards_by_user[user_id]
+    lists = [list_id for board_id in boards for list_id in seeded.lists_by_board[board_id]]
+    cards = [card_id for board_id in boards for card_id in seeded.cards_by_board[board_id]]
+    return {
+        "board": [(rng.choice(boards), user_id) for _ in range(calls)],
+        "list": [(rng.choice(lists), user_id) for _ in range(calls)],
+        "card": [(rng.choice(cards), user_id) for _ in range(calls)],
+        "user_by_email": [(rng.choice(seeded.emails),) for _ in range(calls)],
+    }
+
+
+def _time_calls(session_factory, func, args: list) -> float:
+    """Microsegundos por llamada (sesión nueva por ronda, como en una petición)."""
+    db = session_factory()
+    try:
+        started = time.perf_counter()
+        for call_args in args:
+            func(db, *call_args)
+            db.expunge_all()  # sin mapa de identidad caliente: cada llamada carga de nuevo
+        return (time.perf_counter() - started) / len(args) * 1e6
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark de las consultas de propiedad")
+    parser.add_argument("--database-url", help="Por defecto, un SQLite temporal")
+    parser.add_argument("--profile", default="small", help="small | medium | large")
+    parser.add_argument("--calls", type=int, default=5000, help="Llamadas por variante y ronda")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    if not args.database_url:
+        tmpdir = tempfile.mkdtemp(prefix="neocare-hot-")
+        args.database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = args.database_url
+
+    import hot_queries
+    import models
+    from benchmarks.seed_data import PROFILES, seed
+    from database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    seeded = seed(engine, PROFILES[args.profile], random_seed=args.seed)
+    rng = random.Random(args.seed)
+    lookup_args = _lookup_args(seeded, rng, args.calls)
+    variants = _variants(hot_queries, models)
+
+    results = {}
+    for lookup, funcs in variants.items():
+        for func in funcs.values():
+            _time_calls(SessionLocal, func, lookup_args[lookup][:200])  # calienta cachés
+        results[lookup] = {}
+        for name, func in funcs.items():
+            rounds = [_time_calls(SessionLocal, func, lookup_args[lookup]) for _ in range(REPEATS)]
+            results[lookup][name] = round(statistics.median(rounds), 2)
+
+    print(f"{'consulta':<15}{'orm_query':>12}{'precompilada':>14}{'core':>10}  (µs por llamada, mediana)")
+    for lookup, timings in results.items():
+        print(f"{lookup:<15}{timings['orm_query']:>12.1f}{timings['precompiled_entity']:>14.1f}"
+              f"{timings['core_record']:>10.1f}  x{timings['orm_query'] / timings['core_record']:.1f}")
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "profile_name": args.profile,
+        "calls": args.calls,
+        "repeats": REPEATS,
+        "microseconds_per_call": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{report['timestamp'][:19].replace(':', '')}-hot-queries.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {output}")
+
+    if tmpdir:
+        engine.dispose()
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(tmpdir, "bench.db"))
+            os.rmdir(tmpdir)
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# benchmarks/seed_data.py - Generador de datos sintéticos con inserciones masivas
+"""Pobla una base de datos vacía con un perfil de escala reproducible.
+
+Los ids se asignan en Python y cada tabla se inserta con sentencias multi-fila
+en bloques de ``CHUNK_SIZE`` dentro de una única transacción.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Engine
+
+from auth_handler import hash_password
+from models import User, Board, List as ListModel, Card, Label, Subtask, Timesheet
+
+CHUNK_SIZE = 5000
+BENCH_PASSWORD = "benchmark"
+WORDS = [
+    "paciente", "informe", "revisión", "consulta", "quirófano", "farmacia",
+    "laboratorio", "urgencias", "turno", "protocolo", "auditoría", "historia",
+    "cardiología", "pediatría", "radiología", "inventario", "formación", "guardia",
+]
+LIST_TITLES = ["Por hacer", "En curso", "Revisión", "Bloqueado", "Hecho", "Vencidas", "Backlog", "Ideas"]
+LABEL_COLORS = ["red", "green", "blue", "yellow", "purple"]
+
+
+@dataclass(frozen=True)
+class ScaleProfile:
+    users: int
+    boards_per_user: int
+    lists_per_board: int
+    cards_per_list: int
+    labels_per_card: int
+    subtasks_per_card: int
+    timesheet_years: int
+    timesheets_per_user_per_week: int
+
+
+PROFILES: Dict[str, ScaleProfile] = {
+    "small": ScaleProfile(5, 2, 5, 20, 1, 2, 1, 5),
+    "medium": ScaleProfile(20, 3, 6, 60, 2, 3, 2, 10),
+    "large": ScaleProfile(50, 4, 8, 150, 2, 4, 3, 15),
+}
+
+
+@dataclass
+class SeedResult:
+    emails: List[str] = field(default_factory=list)
+    # user_id -> [board_id]
+    boards_by_user: Dict[int, List[int]] = field(default_factory=dict)
+    # board_id -> [list_id]
+    lists_by_board: Dict[int, List[int]] = field(default_factory=dict)
+    # board_id -> [card_id]
+    cards_by_board: Dict[int, List[int]] = field(default_factory=dict)
+    first_day: date = None
+    last_day: date = None
+    row_counts: Dict[str, int] = field(default_factory=dict)
+
+
+def _insert_chunked(conn, model, rows: list) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        conn.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+def seed(engine: Engine, profile: ScaleProfile, random_seed: int = 42) -> SeedResult:
+    """Inserta el perfil completo en una base de datos vacía."""
+    rng = random.Random(random_seed)
+    result = SeedResult()
+    last_day = date.today()
+    first_day = last_day - timedelta(days=365 * profile.timesheet_years)
+    span_days = (last_day - first_day).days
+    result.first_day, result.last_day = first_day, last_day
+    hashed = hash_password(BENCH_PASSWORD)
+
+    users, boards, lists, cards, labels, subtasks, timesheets = [], [], [], [], [], [], []
+    cards_by_user: Dict[int, List[int]] = {}
+    board_id = list_id = card_id = 0
+
+    for user_id in range(1, profile.users + 1):
+        email = f"bench_user_{user_id}@neocare.test"
+        result.emails.append(email)
+        users.append({"id": user_id, "email": email, "hashed_password": hashed, "is_active": True})
+        result.boards_by_user[user_id] = []
+        cards_by_user[user_id] = []
+
+        for _ in range(profile.boards_per_user):
+            board_id += 1
+            boards.append({"id": board_id, "title": f"Tablero {board_id}", "user_id": user_id})
+            result.boards_by_user[user_id].append(board_id)
+            result.lists_by_board[board_id] = []
+            result.cards_by_board[board_id] = []
+
+            for position in range(profile.lists_per_board):
+                list_id += 1
+                lists.append({
+                    "id": list_id,
+                    "title": LIST_TITLES[position % len(LIST_TITLES)],
+                    "board_id": board_id,
+                })
+                result.lists_by_board[board_id].append(list_id)
+
+                for order in range(1, profile.cards_per_list + 1):
+                    card_id += 1
+                    created = datetime.combine(
+                        first_day + timedelta(days=rng.randrange(span_days + 1)),
+                        datetime.min.time(),
+                    ) + timedelta(minutes=rng.randrange(24 * 60))
+                    updated = min(created + timedelta(days=rng.randrange(30)), datetime.utcnow())
+                    cards.append({
+                        "id": card_id,
+                        "title": " ".join(rng.sample(WORDS, 3)),
+                        "description": " ".join(rng.choices(WORDS, k=12)),
+                        "due_date": created + timedelta(days=rng.randrange(1, 60)) if rng.random() < 0.6 else None,
+                        "order": order,
+                        "created_at": created,
+                        "updated_at": updated,
+                        "list_id": list_id,
+                        "user_id": user_id,
+                        "completed": rng.random() < 0.3,
+                        "overdue": rng.random() < 0.1,
+                    })
+                    result.cards_by_board[board_id].append(card_id)
+                    cards_by_user[user_id].append(card_id)
+
+                    for _ in range(profile.labels_per_card):
+                        labels.append({
+                            "card_id": card_id,
+                            "name": rng.choice(WORDS)[:30],
+                            "color": rng.choice(LABEL_COLORS),
+                        })
+                    for n in range(profile.subtasks_per_card):
+                        subtasks.append({
+                            "card_id": card_id,
+                            "title": f"Paso {n + 1}: {rng.choice(WORDS)}",
+                            "completed": rng.random() < 0.5,
+                        })
+                    # Contadores desnormalizados (card_counters.py); las horas, más abajo
+                    cards[-1].update(
+                        total_hours=0,
+                        subtasks_total=profile.subtasks_per_card,
+                        subtasks_done=sum(1 for s in subtasks[-profile.subtasks_per_card:] if s["completed"])
+                        if profile.subtasks_per_card else 0,
+                        labels_count=profile.labels_per_card,
+                    )
+
+        # Horas: varias entradas por semana durante todo el periodo. Una fila por
+        # celda (usuario, tarjeta, día), como exige timesheets: se suman las repetidas
+        cells: Dict[tuple, dict] = {}
+        week_start = first_day - timedelta(days=first_day.weekday())
+        while week_start <= last_day and cards_by_user[user_id]:
+            for _ in range(profile.timesheets_per_user_per_week):
+                day = week_start + timedelta(days=rng.randrange(5))
+                entry = {
+                    "description": rng.choice(WORDS),
+                    "hours": rng.choice([0.5, 1, 1.5, 2, 3, 4, 8]),
+                    "date": day,
+                    "user_id": user_id,
+                    "card_id": rng.choice(cards_by_user[user_id]),
+                }
+                cell = cells.setdefault((entry["card_id"], day), {**entry, "hours": 0})
+                cell["hours"] += entry["hours"]
+            week_start += timedelta(days=7)
+        for cell in cells.values():
+            timesheets.append(cell)
+            # Los ids de tarjeta son consecutivos desde 1
+            cards[cell["card_id"] - 1]["total_hours"] += cell["hours"]
+
+    with engine.begin() as conn:
+        for model, rows in (
+            (User, users), (Board, boards), (ListModel, lists), (Card, cards),
+            (Label, labels), (Subtask, subtasks), (Timesheet, timesheets),
+        ):
+            _insert_chunked(conn, model, rows)
+            result.row_counts[model.__tablename__] = len(rows)
+
+        # Con ids explícitos, PostgreSQL no avanza las secuencias por sí solo
+        if conn.dialect.name == "postgresql":
+            for model in (User, Board, ListModel, Card, Label, Subtask, Timesheet):
+                table = model.__tablename__
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+                ))
+
+    return result
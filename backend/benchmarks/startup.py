@@ -0,0 +1,115 @@
+# benchmarks/startup.py - Tiempo de arranque en frío y perfil de importación
+"""Uso (desde backend/):
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --target-ms 800 --top 15
+
+Cada ejecución lanza un intérprete nuevo que importa ``main`` y completa el
+``lifespan`` de la app (calentamiento del pool incluido). Se informa de la
+mediana y el máximo, y de los módulos con mayor tiempo de importación propio
+según ``python -X importtime``. Sale con código 1 si la mediana supera el
+objetivo, para poder usarlo en CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+from benchmarks.run_benchmarks import RESULTS_DIR, git_commit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGET_MS = float(os.getenv("NEOCARE_STARTUP_TARGET_MS", "1500"))
+
+# Se ejecuta en el proceso hijo: importa la app y recorre su lifespan
+_COLD_START = """
+import asyncio, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def run_lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(run_lifespan())
+print(f"{(imported - started) * 1000:.3f} {(ready - started) * 1000:.3f}")
+"""
+
+
+def cold_start() -> tuple:
+    """Devuelve (ms de importación, ms hasta app lista) de un proceso nuevo."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", _COLD_START], cwd=BACKEND_DIR, text=True
+    )
+    import_ms, ready_ms = output.split()[-2:]
+    return float(import_ms), float(ready_ms)
+
+
+def import_profile(top: int) -> list:
+    """Módulos con más tiempo de importación propio (``-X importtime``)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    modules.sort(key=lambda m: m["self_ms"], reverse=True)
+    return modules[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de la API de Neocare")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="Módulos a mostrar en el perfil")
+    parser.add_argument("--output", help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    cold_start()  # descarta la primera: llena la caché de bytecode y del disco
+    runs = [cold_start() for _ in range(args.runs)]
+    import_ms = sorted(r[0] for r in runs)
+    ready_ms = sorted(r[1] for r in runs)
+    profile = import_profile(args.top)
+
+    print(f"Importación de main: mediana {statistics.median(import_ms):.1f} ms")
+    print(f"Hasta app lista:     mediana {statistics.median(ready_ms):.1f} ms  "
+          f"máx {ready_ms[-1]:.1f} ms  (objetivo {args.target_ms:.0f} ms)")
+    print("Módulos más lentos (tiempo propio):")
+    for module in profile:
+        print(f"  {module['self_ms']:>8.1f} ms  {module['module']}")
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_ms": import_ms,
+        "ready_ms": ready_ms,
+        "median_ready_ms": statistics.median(ready_ms),
+        "target_ms": args.target_ms,
+        "import_profile": profile,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{report['timestamp'][:19].replace(':', '')}-startup.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {output}")
+
+    return 0 if statistics.median(ready_ms) <= args.target_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
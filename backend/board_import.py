@@ -0,0 +1,422 @@
+# board_import.py - Importación de tableros desde Trello (JSON) o CSV/Excel
+"""Crea un tablero completo (listas, tarjetas, etiquetas, checklists como
+subtareas y horas) a partir de una exportación de Trello o de un CSV, sin pasar
+por ``POST /api/cards`` tarjeta a tarjeta.
+
+Las tarjetas se acumulan en lotes de ``IMPORT_CHUNK_SIZE``: cada lote son unos
+pocos INSERT multi-fila (listas nuevas, tarjetas, y con sus ids, etiquetas,
+subtareas, horas y eventos de actividad). Todo va en
+una única transacción: si algo falla no queda un tablero a medias. El orden de
+las tarjetas y los contadores de card_counters.py se calculan aquí, sin
+consultas.
+
+El CSV se lee fila a fila. Columnas (cabecera obligatoria, ``,`` ``;`` o
+tabulador; en español o en inglés):
+
+    list/lista, title/titulo, description/descripcion, due_date/vencimiento,
+    completed/completada, completed_at/completada_el, labels/etiquetas,
+    subtasks/subtareas, hours/horas, date/fecha
+
+Las celdas con varios valores (etiquetas, subtareas) se separan con ``|``; una
+subtarea que empieza por ``[x]`` está hecha. Las horas se apuntan al usuario
+que importa, en ``date`` (por defecto, hoy).
+
+Cada tarjeta recibe su evento de creación en card_activity. Las completadas
+solo reciben el de completada si se conoce cuándo lo fueron (``completed_at``
+en el CSV; en Trello, la última actividad o el vencimiento): con la hora de
+la importación aparecerían como completadas esa semana en los informes.
+
+Desde la API (``POST /api/boards/import``) el fichero se guarda en
+``imports/`` y lo procesa un trabajo ``import_board`` de la cola. Uso directo
+(desde backend/)::
+
+    python board_import.py trello.json --email ana@example.com
+    python board_import.py tareas.csv --email ana@example.com --title "Proyecto"
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from board_sync import touch_board
+from card_activity import COMPLETED, CREATED
+from database import BASE_DIR, SessionLocal
+from models import Board, Card, CardActivity, Label, List as ListModel, Subtask, Timesheet, User
+
+IMPORT_DIR = os.path.join(BASE_DIR, "imports")
+IMPORT_CHUNK_SIZE = 1000  # tarjetas por lote
+IMPORT_FORMATS = ("trello", "csv")
+DEFAULT_LABEL_COLOR = "gray"
+IMPORTED_HOURS_DESCRIPTION = "Importado"
+
+Progress = Optional[Callable[[float, Optional[str]], None]]
+
+
+class _BoardWriter:
+    """Acumula listas y tarjetas y las escribe por lotes en la transacción de ``db``."""
+
+    def __init__(self, db: Session, board_id: int, user_id: int, total_cards: Optional[int] = None,
+                 progress: Progress = None):
+        self.db = db
+        self.board_id = board_id
+        self.user_id = user_id
+        self.total_cards = total_cards
+        self.progress = progress
+        self.version = touch_board(db, board_id)
+        self.now = datetime.utcnow()
+        self.list_ids: Dict[str, int] = {}
+        self.pending_lists: Dict[str, str] = {}
+        self.next_order: Dict[str, int] = defaultdict(int)
+        self.cards: list = []
+        self.last_card_id = 0
+        self.counts: Counter = Counter()
+
+    def add_list(self, key: str, title: str) -> None:
+        if key not in self.list_ids and key not in self.pending_lists:
+            self.pending_lists[key] = title
+
+    def add_card(self, list_key: str, title: str, description: Optional[str] = None,
+                 due_date: Optional[datetime] = None, completed: bool = False,
+                 completed_at: Optional[datetime] = None,
+                 created_at: Optional[datetime] = None, labels: Iterable = (),
+                 subtasks: Iterable = (), hours: Iterable = ()) -> None:
+        """``labels``: [(nombre, color)], ``subtasks``: [(título, hecha)],
+        ``hours``: [(fecha, horas)]."""
+        self.add_list(list_key, list_key)
+        self.next_order[list_key] += 1
+        labels, subtasks = list(labels), list(subtasks)
+        # Una fila por celda (tarjeta, día), como exige timesheets
+        hours_by_day = {}
+        for day, amount in hours:
+            hours_by_day[day] = hours_by_day.get(day, 0) + amount
+        hours = list(hours_by_day.items())
+        self.cards.append((list_key, {
+            "title": title,
+            "description": description or None,
+            "due_date": due_date,
+            "order": self.next_order[list_key],
+            "created_at": created_at or self.now,
+            "updated_at": self.now,
+            "version": self.version,
+            "user_id": self.user_id,
+            "completed": completed,
+            "overdue": False,
+            "total_hours": sum(amount for _, amount in hours),
+            "subtasks_total": len(subtasks),
+            "subtasks_done": sum(1 for _, done in subtasks if done),
+            "labels_count": len(labels),
+        }, labels, subtasks, hours, completed_at if completed else None))
+        if len(self.cards) >= IMPORT_CHUNK_SIZE:
+            self.flush()
+
+    # Core sobre la conexión de la sesión: el INSERT masivo del ORM parte el lote
+    # en muchas sentencias en cuanto las filas difieren en qué columnas son NULL
+    def _insert_returning_ids(self, model, rows: list) -> list:
+        table = model.__table__
+        return self.db.connection().execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+    def _insert(self, model, rows: list) -> None:
+        if rows:
+            self.db.connection().execute(insert(model.__table__), rows)
+            self.counts[model.__tablename__] += len(rows)
+
+    def _event(self, card_id: int, card: dict, event_type: str, at: datetime) -> dict:
+        return {
+            "board_id": self.board_id, "card_id": card_id, "event_type": event_type,
+            "from_list_id": None, "to_list_id": card["list_id"], "user_id": self.user_id, "at": at,
+        }
+
+    def flush(self) -> None:
+        if self.pending_lists:
+            rows = [
+                {"title": title, "board_id": self.board_id, "version": self.version, "updated_at": self.now}
+                for title in self.pending_lists.values()
+            ]
+            ids = self._insert_returning_ids(ListModel, rows)
+            self.list_ids.update(zip(self.pending_lists, ids))
+            self.counts["lists"] += len(ids)
+            self.pending_lists.clear()
+        if not self.cards:
+            return
+
+        rows = []
+        for list_key, card, *_ in self.cards:
+            card["list_id"] = self.list_ids[list_key]
+            rows.append(card)
+        self._insert(Card, rows)
+        # Sin RETURNING (en SQLite obligaría a una sentencia por fila): los ids se
+        # recuperan por (lista, orden), único dentro del tablero nuevo
+        cards = Card.__table__
+        ids_by_position = {
+            (list_id, order): card_id
+            for card_id, list_id, order in self.db.connection().execute(
+                select(cards.c.id, cards.c.list_id, cards.c.order).where(
+                    cards.c.list_id.in_({row["list_id"] for row in rows}),
+                    cards.c.id > self.last_card_id,
+                )
+            )
+        }
+        card_ids = [ids_by_position[(row["list_id"], row["order"])] for row in rows]
+        self.last_card_id = max(card_ids)
+
+        labels, subtasks, timesheets, activity = [], [], [], []
+        for card_id, (_, card, card_labels, card_subtasks, card_hours, completed_at) in zip(card_ids, self.cards):
+            labels.extend(
+                {"card_id": card_id, "name": name, "color": color, "version": self.version,
+                 "updated_at": self.now}
+                for name, color in card_labels
+            )
+            subtasks.extend(
+                {"card_id": card_id, "title": title, "completed": done, "version": self.version,
+                 "updated_at": self.now}
+                for title, done in card_subtasks
+            )
+            timesheets.extend(
+                {"card_id": card_id, "user_id": self.user_id, "date": day, "hours": amount,
+                 "description": IMPORTED_HOURS_DESCRIPTION, "version": self.version,
+                 "created_at": self.now, "updated_at": self.now}
+                for day, amount in card_hours
+            )
+            # Historial de actividad, como si se hubieran creado desde la API
+            activity.append(self._event(card_id, card, CREATED, card["created_at"]))
+            if completed_at is not None:
+                activity.append(self._event(card_id, card, COMPLETED, completed_at))
+        self._insert(Label, labels)
+        self._insert(Subtask, subtasks)
+        self._insert(Timesheet, timesheets)
+        self._insert(CardActivity, activity)
+        self.cards.clear()
+
+        if self.progress is not None:
+            done = self.counts["cards"]
+            fraction = min(done / self.total_cards, 1.0) if self.total_cards else 0.0
+            self.progress(fraction, f"{done} tarjetas importadas")
+
+    def finish(self) -> dict:
+        self.flush()
+        return {"board_id": self.board_id, **self.counts}
+
+
+def _create_board(db: Session, title: str, user_id: int) -> int:
+    return db.execute(
+        insert(Board).values(title=title[:255] or "Tablero importado", user_id=user_id, version=0)
+        .returning(Board.id)
+    ).scalar_one()
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    """ISO 8601 (con ``Z`` o zona, se pasa a UTC sin zona) o ``dd/mm/aaaa``."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        parsed = datetime.strptime(value, "%d/%m/%Y")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# --- Trello ---
+
+def _trello_created_at(object_id: str) -> Optional[datetime]:
+    # Los ids de Trello (ObjectId) empiezan por el instante de creación en hexadecimal
+    try:
+        return datetime.utcfromtimestamp(int(object_id[:8], 16))
+    except (TypeError, ValueError):
+        return None
+
+
+def import_trello(db: Session, data: dict, user_id: int, progress: Progress = None) -> dict:
+    """Importa una exportación JSON de Trello (Menú > Imprimir y exportar > JSON).
+    Se omiten las listas y tarjetas archivadas. Trello no exporta horas."""
+    board_id = _create_board(db, data.get("name") or "Tablero de Trello", user_id)
+    open_lists = sorted(
+        (item for item in data.get("lists", []) if not item.get("closed")),
+        key=lambda item: item.get("pos") or 0,
+    )
+    cards = sorted(
+        (card for card in data.get("cards", []) if not card.get("closed")),
+        key=lambda card: card.get("pos") or 0,
+    )
+    writer = _BoardWriter(db, board_id, user_id, total_cards=len(cards), progress=progress)
+    for item in open_lists:
+        writer.add_list(item["id"], (item.get("name") or "Lista")[:255])
+    open_list_ids = {item["id"] for item in open_lists}
+
+    labels = {
+        label["id"]: ((label.get("name") or label.get("color") or "etiqueta")[:30],
+                      (label.get("color") or DEFAULT_LABEL_COLOR)[:20])
+        for label in data.get("labels", [])
+    }
+    checklist_items = defaultdict(list)
+    for checklist in data.get("checklists", []):
+        items = sorted(checklist.get("checkItems", []), key=lambda item: item.get("pos") or 0)
+        checklist_items[checklist.get("idCard")].extend(
+            ((item.get("name") or "Subtarea")[:100], item.get("state") == "complete") for item in items
+        )
+
+    for card in cards:
+        if card.get("idList") not in open_list_ids:
+            continue
+        writer.add_card(
+            card["idList"],
+            (card.get("name") or "Tarjeta")[:255],
+            description=card.get("desc"),
+            due_date=_parse_datetime(card.get("due")),
+            completed=bool(card.get("dueComplete")),
+            # Trello no guarda cuándo se completó: la última actividad es lo más cercano
+            completed_at=_parse_datetime(card.get("dateLastActivity") or card.get("due")),
+            created_at=_trello_created_at(card.get("id")),
+            labels=[labels[label_id] for label_id in card.get("idLabels", []) if label_id in labels],
+            subtasks=checklist_items.get(card.get("id"), ()),
+        )
+    return writer.finish()
+
+
+# --- CSV ---
+
+_CSV_COLUMNS = {
+    "list": ("list", "lista"),
+    "title": ("title", "titulo", "título", "card", "tarjeta"),
+    "description": ("description", "descripcion", "descripción"),
+    "due_date": ("due_date", "due", "vencimiento"),
+    "completed": ("completed", "completada", "hecha"),
+    "completed_at": ("completed_at", "completada_el", "fecha_completada"),
+    "labels": ("labels", "etiquetas"),
+    "subtasks": ("subtasks", "subtareas", "checklist"),
+    "hours": ("hours", "horas"),
+    "date": ("date", "fecha"),
+}
+_TRUE_VALUES = {"1", "true", "yes", "y", "x", "si", "sí", "s"}
+
+
+def _csv_header_map(fieldnames: list) -> dict:
+    normalized = {name.strip().lower(): name for name in fieldnames or () if name}
+    mapping = {}
+    for field, aliases in _CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[field] = normalized[alias]
+                break
+    if "title" not in mapping:
+        raise ValueError("El CSV necesita una columna 'title' (o 'titulo')")
+    return mapping
+
+
+def _split_cell(value: Optional[str]) -> list:
+    return [part.strip() for part in (value or "").split("|") if part.strip()]
+
+
+def import_csv(db: Session, text_stream: Iterable[str], user_id: int, title: str,
+               progress: Progress = None, total_cards: Optional[int] = None) -> dict:
+    """Importa un CSV fila a fila (ver el formato en la cabecera del módulo)."""
+    lines = iter(text_stream)
+    sample = "".join(line for _, line in zip(range(5), lines))
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    rows = csv.DictReader(_chain(sample.splitlines(keepends=True), lines), dialect=dialect)
+    columns = _csv_header_map(rows.fieldnames)
+
+    board_id = _create_board(db, title, user_id)
+    writer = _BoardWriter(db, board_id, user_id, total_cards=total_cards, progress=progress)
+    today = date.today()
+    for line_number, row in enumerate(rows, start=2):
+        def cell(field: str) -> str:
+            return (row.get(columns[field]) or "").strip() if field in columns else ""
+
+        if not cell("title"):
+            continue
+        try:
+            hours = float(cell("hours").replace(",", ".")) if cell("hours") else 0
+            day = _parse_datetime(cell("date")).date() if cell("date") else today
+            due_date = _parse_datetime(cell("due_date"))
+            completed_at = _parse_datetime(cell("completed_at"))
+        except ValueError as exc:
+            raise ValueError(f"Fila {line_number}: {exc}") from exc
+        list_title = cell("list") or "Importadas"
+        writer.add_card(
+            list_title[:255],
+            cell("title")[:255],
+            description=cell("description"),
+            due_date=due_date,
+            completed=cell("completed").lower() in _TRUE_VALUES or completed_at is not None,
+            completed_at=completed_at,
+            labels=[(name[:30], DEFAULT_LABEL_COLOR) for name in _split_cell(cell("labels"))],
+            subtasks=[
+                (item[3:].strip()[:100], True) if item.lower().startswith("[x]") else (item[:100], False)
+                for item in _split_cell(cell("subtasks"))
+            ],
+            hours=[(day, hours)] if hours > 0 else [],
+        )
+    return writer.finish()
+
+
+def _chain(first: list, rest):
+    yield from first
+    yield from rest
+
+
+# --- Punto de entrada común (API, cola de trabajos y línea de comandos) ---
+
+def detect_format(filename: str) -> Optional[str]:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return {".json": "trello", ".csv": "csv", ".tsv": "csv", ".txt": "csv"}.get(extension)
+
+
+def _count_csv_rows(path: str) -> int:
+    with open(path, "rb") as fh:
+        return max(sum(1 for _ in fh) - 1, 0)
+
+
+def import_file(db: Session, path: str, file_format: str, user_id: int, title: Optional[str] = None,
+                progress: Progress = None) -> dict:
+    """Importa el fichero y hace commit. Devuelve el tablero creado y los recuentos."""
+    if file_format == "trello":
+        with open(path, "rb") as fh:
+            result = import_trello(db, json.load(fh), user_id, progress)
+    elif file_format == "csv":
+        title = title or os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding="utf-8-sig", newline="") as fh:
+            result = import_csv(db, fh, user_id, title, progress, total_cards=_count_csv_rows(path))
+    else:
+        raise ValueError(f"Formato de importación desconocido: {file_format}")
+    db.commit()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa un tablero de Trello (JSON) o CSV")
+    parser.add_argument("path")
+    parser.add_argument("--email", required=True, help="Usuario dueño del tablero")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Por defecto, según la extensión")
+    parser.add_argument("--title", help="Título del tablero (CSV)")
+    args = parser.parse_args()
+    file_format = args.format or detect_format(args.path)
+    if file_format is None:
+        parser.error("No se reconoce el formato: usa --format")
+    db = SessionLocal()
+    try:
+        user_id = db.execute(select(User.id).where(User.email == args.email)).scalar()
+        if user_id is None:
+            parser.error(f"No existe el usuario {args.email}")
+        started = time.perf_counter()
+        result = import_file(
+            db, args.path, file_format, user_id, args.title,
+            progress=lambda value, message: print(f"\r  {message}", end="", flush=True),
+        )
+    finally:
+        db.close()
+    print(f"\nImportado en {time.perf_counter() - started:.1f} s: {result}")
@@ -0,0 +1,147 @@
+# board_purge.py - Borrado por conjuntos de tableros y listas
+"""Borra tableros y listas con unas pocas sentencias DELETE por conjuntos, sin
+cargar tarjetas, horas, etiquetas ni subtareas en memoria.
+
+Los tableros con más de ``BACKGROUND_PURGE_MIN_CARDS`` tarjetas no se borran
+en la petición: se desvinculan del usuario (``user_id = NULL``, con lo que
+dejan de ser visibles para cualquier comprobación de propiedad), se marcan con
+``deleted_at`` y se purgan después por lotes con un trabajo ``purge_board`` de
+la cola (job_queue.py). ``python board_purge.py`` completa a mano las purgas
+pendientes.
+"""
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import (
+    Board, Card, CardActivity, List as ListModel, Label, Subtask, Timesheet, Tombstone,
+    ArchivedCard, ArchivedLabel, ArchivedSubtask, ArchivedTimesheet, ReportSnapshot,
+)
+from board_sync import touch_board
+from cache_bus import publish
+
+BACKGROUND_PURGE_MIN_CARDS = 2000
+PURGE_BATCH_SIZE = 1000
+
+# Sentencias de borrado sobre la base de datos; la sesión no debe sincronizarse
+_NO_SYNC = {"synchronize_session": False}
+
+
+def _delete_cards(db: Session, card_ids, archived_hours: bool = True) -> None:
+    """Borra tarjetas (ids o subconsulta) y sus hijos, de hijos a padres.
+
+    Con ``archived_hours`` borra también las horas archivadas de estas tarjetas
+    (timesheet_partitions.py archiva meses enteros, con tarjetas aún vivas)."""
+    children = (Label, Subtask, Timesheet) + ((ArchivedTimesheet,) if archived_hours else ())
+    for child in children:
+        db.execute(delete(child).where(child.card_id.in_(card_ids)).execution_options(**_NO_SYNC))
+    db.execute(delete(Card).where(Card.id.in_(card_ids)).execution_options(**_NO_SYNC))
+
+
+def _delete_archived_cards(db: Session, condition) -> None:
+    """Borra del archivo las tarjetas que cumplen ``condition`` y sus hijos."""
+    card_ids = select(ArchivedCard.id).where(condition)
+    for child in (ArchivedLabel, ArchivedSubtask, ArchivedTimesheet):
+        db.execute(delete(child).where(child.card_id.in_(card_ids)).execution_options(**_NO_SYNC))
+    db.execute(delete(ArchivedCard).where(condition).execution_options(**_NO_SYNC))
+
+
+def _board_card_ids(board_id: int):
+    return (
+        select(Card.id)
+        .join(ListModel, ListModel.id == Card.list_id)
+        .where(ListModel.board_id == board_id)
+    )
+
+
+def count_board_cards(db: Session, board_id: int) -> int:
+    return db.execute(
+        select(func.count()).select_from(_board_card_ids(board_id).subquery())
+    ).scalar_one()
+
+
+def delete_board_rows(db: Session, board_id: int) -> None:
+    """Borra el tablero completo con unas pocas sentencias (sin commit)."""
+    publish(db, "board", board_id)
+    _delete_cards(db, _board_card_ids(board_id))
+    _delete_archived_cards(db, ArchivedCard.board_id == board_id)
+    db.execute(delete(ListModel).where(ListModel.board_id == board_id).execution_options(**_NO_SYNC))
+    db.execute(delete(Tombstone).where(Tombstone.board_id == board_id).execution_options(**_NO_SYNC))
+    db.execute(delete(CardActivity).where(CardActivity.board_id == board_id).execution_options(**_NO_SYNC))
+    db.execute(delete(ReportSnapshot).where(ReportSnapshot.board_id == board_id).execution_options(**_NO_SYNC))
+    db.execute(delete(Board).where(Board.id == board_id).execution_options(**_NO_SYNC))
+    db.expire_all()
+
+
+def delete_list_rows(db: Session, list_obj: ListModel) -> None:
+    """Borra una lista y su contenido dejando tombstones de la lista y sus tarjetas."""
+    version = touch_board(db, list_obj.board_id)
+    now = datetime.utcnow()
+    db.execute(
+        insert(Tombstone).from_select(
+            ["board_id", "entity_type", "entity_id", "version", "deleted_at"],
+            select(
+                literal(list_obj.board_id), literal("cards"), Card.id, literal(version), literal(now)
+            ).where(Card.list_id == list_obj.id),
+        )
+    )
+    db.add(Tombstone(
+        board_id=list_obj.board_id,
+        entity_type="lists",
+        entity_id=list_obj.id,
+        version=version,
+        deleted_at=now,
+    ))
+    _delete_cards(db, select(Card.id).where(Card.list_id == list_obj.id))
+    _delete_archived_cards(db, ArchivedCard.list_id == list_obj.id)
+    db.execute(delete(ListModel).where(ListModel.id == list_obj.id).execution_options(**_NO_SYNC))
+    db.expunge(list_obj)
+
+
+def detach_board(db: Session, board: Board) -> None:
+    """Oculta el tablero de inmediato y lo deja pendiente de purga (sin commit)."""
+    publish(db, "board", board.id)
+    board.user_id = None
+    board.deleted_at = datetime.utcnow()
+
+
+def purge_board(board_id: int, progress: Optional[Callable[[float, str], None]] = None) -> None:
+    """Purga por lotes un tablero desvinculado (trabajo en segundo plano)."""
+    db = SessionLocal()
+    try:
+        total = count_board_cards(db, board_id) or 1
+        deleted = 0
+        while True:
+            card_ids = db.execute(_board_card_ids(board_id).limit(PURGE_BATCH_SIZE)).scalars().all()
+            if not card_ids:
+                break
+            _delete_cards(db, card_ids)
+            db.commit()
+            deleted += len(card_ids)
+            if progress is not None:
+                progress(min(deleted / total, 0.99), f"{deleted} tarjetas borradas")
+        delete_board_rows(db, board_id)
+        db.commit()
+    finally:
+        db.close()
+
+
+def purge_pending_boards() -> int:
+    """Completa las purgas interrumpidas. Devuelve cuántos tableros se purgaron."""
+    db = SessionLocal()
+    try:
+        pending = db.execute(
+            select(Board.id).where(Board.deleted_at.isnot(None))
+        ).scalars().all()
+    finally:
+        db.close()
+    for board_id in pending:
+        purge_board(board_id)
+    return len(pending)
+
+
+if __name__ == "__main__":
+    print(f"Tableros purgados: {purge_pending_boards()}")
@@ -1,24 +1,64 @@
+import os
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import uuid4
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from config import IMPORT_MAX_BYTES
 from database import get_db
+from db_router import get_read_db
 from models import Board, User
-from schemas import Board as BoardSchema, BoardCreate
-from auth_router import get_current_user
+from schemas import Board as BoardSchema, BoardCreate, BoardChanges, Job as JobSchema
+from auth_router import get_current_read_user, get_current_user
+from board_import import IMPORT_DIR, IMPORT_FORMATS, detect_format
+from board_sync import get_board_changes
+from board_purge import (
+    BACKGROUND_PURGE_MIN_CARDS,
+    count_board_cards,
+    delete_board_rows,
+    detach_board,
+)
+from job_queue import enqueue
 from crud import (
     create_board as crud_create_board,
     get_boards_by_user as crud_get_boards_by_user,
-    delete_board as crud_delete_board,
     get_board_by_id_and_user # ✅ Usamos esta para validar propiedad
 )
 
 router = APIRouter(tags=["boards"])
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"El fichero supera el máximo de {IMPORT_MAX_BYTES // (1024 * 1024)} MB",
+    )
+
+
+def _save_upload(source, path: str) -> None:
+    """Copia el fichero subido a ``path`` por trozos (bloqueante: va en un hilo)."""
+    written = 0
+    try:
+        with open(path, "wb") as fh:
+            while chunk := source.read(UPLOAD_CHUNK_BYTES):
+                written += len(chunk)
+                # El tamaño declarado puede faltar: se vuelve a contar al copiar
+                if written > IMPORT_MAX_BYTES:
+                    raise _too_large()
+                fh.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
 @router.get("/", response_model=List[BoardSchema])
 async def list_boards(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Listar todos los tableros del usuario autenticado"""
     boards = crud_get_boards_by_user(db, current_user.id)
@@ -34,6 +74,72 @@ async def create_board(
     new_board = crud_create_board(db, current_user.id, board_in)
     return new_board
 
+@router.post("/import", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def import_board(
+    file: UploadFile = File(...),
+    file_format: str | None = Query(None, alias="format", description="trello | csv (por defecto, según la extensión)"),
+    title: str | None = Query(None, description="Título del tablero (CSV; por defecto, el nombre del fichero)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Importa un tablero desde una exportación de Trello (JSON) o un CSV.
+
+    La importación la hace un trabajo de la cola: se responde 202 con el trabajo
+    (su progreso en ``/api/jobs/{id}``; al terminar, ``result.board_id``).
+    Los ficheros de más de ``NEOCARE_IMPORT_MAX_MB`` se rechazan con 413.
+    """
+    file_format = file_format or detect_format(file.filename)
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato no reconocido: usa format=trello o format=csv",
+        )
+
+    if file.size is not None and file.size > IMPORT_MAX_BYTES:
+        raise _too_large()
+
+    # El worker corre en otro proceso: el fichero se deja en disco, por trozos
+    os.makedirs(IMPORT_DIR, exist_ok=True)
+    path = os.path.join(IMPORT_DIR, f"{uuid4().hex}{os.path.splitext(file.filename or '')[1]}")
+    await run_in_threadpool(_save_upload, file.file, path)
+
+    job = enqueue(
+        db, "import_board",
+        {"path": path, "format": file_format, "user_id": current_user.id,
+         "title": title or os.path.splitext(file.filename or "")[0] or None},
+        user_id=current_user.id,
+        max_attempts=1,  # un fichero mal formado fallaría igual en cada intento
+    )
+    db.commit()
+    db.refresh(job)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(JobSchema.model_validate(job)),
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
+
+@router.get("/{board_id}/changes", response_model=BoardChanges)
+async def get_changes(
+    board_id: int,
+    since: int = Query(0, ge=0, description="Última versión del tablero que conoce el cliente"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Cambios del tablero posteriores a la versión `since`.
+
+    El cliente debe aplicar primero `deleted` y después las filas devueltas, y
+    guardar `version` para la siguiente llamada. Borrar una lista o una tarjeta
+    implica borrar también su contenido. Si `full_reload` es true, debe
+    recargar el tablero completo.
+    """
+    board = get_board_by_id_and_user(db, board_id, current_user.id)
+    if not board:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tablero no encontrado o no tienes permiso"
+        )
+    return get_board_changes(db, board, since)
+
 # ✅ RUTA DE EDICIÓN PARA TABLEROS
 @router.put("/{board_id}", response_model=BoardSchema)
 async def update_board(
@@ -58,17 +164,43 @@ async def update_board(
     db.refresh(db_board)
     return db_board
 
-@router.delete("/{board_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{board_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        status.HTTP_204_NO_CONTENT: {"description": "Tablero eliminado"},
+        status.HTTP_202_ACCEPTED: {"model": JobSchema, "description": "Purga encolada en /api/jobs/{id}"},
+    },
+)
 async def delete_board(
     board_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Eliminar un tablero del usuario autenticado"""
-    success = crud_delete_board(db, board_id, current_user.id)
-    if not success:
+    """Eliminar un tablero del usuario autenticado.
+
+    Los tableros grandes se ocultan al momento y se purgan con un trabajo de la
+    cola: se responde 202 con el trabajo (su estado en ``/api/jobs/{id}``).
+    """
+    board = get_board_by_id_and_user(db, board_id, current_user.id)
+    if not board:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Board not found or not owned by user",
         )
+
+    if count_board_cards(db, board.id) >= BACKGROUND_PURGE_MIN_CARDS:
+        detach_board(db, board)
+        # Desvincular y encolar en la misma transacción: la purga no se pierde
+        job = enqueue(db, "purge_board", {"board_id": board.id}, user_id=current_user.id)
+        db.commit()
+        db.refresh(job)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(JobSchema.model_validate(job)),
+            headers={"Location": f"/api/jobs/{job.id}"},
+        )
+    else:
+        delete_board_rows(db, board.id)
+        db.commit()
     return None
\ No newline at end of file
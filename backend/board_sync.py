@@ -0,0 +1,186 @@
+# board_sync.py - Versionado de tableros para sincronización incremental
+"""Cada transacción que toca un tablero incrementa ``Board.version`` una sola vez
+y sella con ese número las filas creadas o modificadas (listas, tarjetas,
+etiquetas, subtareas y horas). Los borrados dejan un ``Tombstone`` con la misma
+versión, de modo que ``/api/boards/{id}/changes?since=N`` solo necesita leer las
+filas con ``version > N``.
+"""
+from typing import Optional
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from cache_bus import publish
+from database import SessionLocal
+from models import Board, Card, List as ListModel, Label, Subtask, Timesheet, Tombstone
+
+# Modelo -> nombre de la colección en la respuesta de /changes
+TRACKED_MODELS = {
+    ListModel: "lists",
+    Card: "cards",
+    Label: "labels",
+    Subtask: "subtasks",
+    Timesheet: "timesheets",
+}
+
+_VERSIONS_KEY = "board_versions"
+
+
+def touch_board(db: Session, board_id: int) -> int:
+    """Incrementa la versión del tablero (una vez por transacción) y la devuelve."""
+    versions = db.info.setdefault(_VERSIONS_KEY, {})
+    if board_id not in versions:
+        publish(db, "board", board_id)
+        db.execute(
+            update(Board.__table__)
+            .where(Board.__table__.c.id == board_id)
+            .values(version=func.coalesce(Board.__table__.c.version, 0) + 1)
+        )
+        versions[board_id] = db.execute(
+            select(Board.__table__.c.version).where(Board.__table__.c.id == board_id)
+        ).scalar_one()
+        # La copia en memoria del tablero queda obsoleta tras el UPDATE directo
+        board = db.identity_map.get(db.identity_key(Board, board_id))
+        if board is not None and board not in db.deleted:
+            db.expire(board, ["version"])
+    return versions[board_id]
+
+
+def _board_id_for_list(db: Session, list_id: Optional[int]) -> Optional[int]:
+    if list_id is None:
+        return None
+    list_obj = db.get(ListModel, list_id)
+    return list_obj.board_id if list_obj is not None else None
+
+
+def _board_id_for_card(db: Session, card_id: Optional[int]) -> Optional[int]:
+    if card_id is None:
+        return None
+    card = db.get(Card, card_id)
+    return _board_id_for_list(db, card.list_id) if card is not None else None
+
+
+def board_id_for(db: Session, obj) -> Optional[int]:
+    """Resuelve el tablero al que pertenece una fila sincronizable."""
+    if isinstance(obj, ListModel):
+        return obj.board_id
+    if isinstance(obj, Card):
+        return _board_id_for_list(db, obj.list_id)
+    return _board_id_for_card(db, obj.card_id)
+
+
+def _previous_board_id(db: Session, card: Card) -> Optional[int]:
+    """Tablero anterior de una tarjeta movida entre tableros, si lo hubo."""
+    history = inspect(card).attrs.list_id.history
+    if not history.deleted:
+        return None
+    return _board_id_for_list(db, history.deleted[0])
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _stamp_versions(db: Session, flush_context, instances):
+    deleted_boards = {obj.id for obj in db.deleted if isinstance(obj, Board)}
+
+    with db.no_autoflush:
+        for obj in list(db.dirty):
+            if isinstance(obj, Board) and db.is_modified(obj) and obj.id not in deleted_boards:
+                touch_board(db, obj.id)
+
+        for obj in list(db.new) + list(db.dirty):
+            entity_type = TRACKED_MODELS.get(type(obj))
+            if entity_type is None or (obj in db.dirty and not db.is_modified(obj)):
+                continue
+            board_id = board_id_for(db, obj)
+            if board_id is None or board_id in deleted_boards:
+                continue
+            obj.version = touch_board(db, board_id)
+
+            # Tarjeta movida a otro tablero: el tablero de origen la ve como borrada
+            # y el de destino debe recibir también sus hijos.
+            if isinstance(obj, Card) and obj in db.dirty:
+                old_board_id = _previous_board_id(db, obj)
+                if old_board_id is not None and old_board_id != board_id:
+                    db.add(Tombstone(
+                        board_id=old_board_id,
+                        entity_type=entity_type,
+                        entity_id=obj.id,
+                        version=touch_board(db, old_board_id),
+                    ))
+                    for child in (Label, Subtask, Timesheet):
+                        db.execute(
+                            update(child.__table__)
+                            .where(child.__table__.c.card_id == obj.id)
+                            .values(version=obj.version)
+                        )
+
+        for obj in list(db.deleted):
+            entity_type = TRACKED_MODELS.get(type(obj))
+            if entity_type is None:
+                continue
+            board_id = board_id_for(db, obj)
+            if board_id is None or board_id in deleted_boards:
+                continue
+            db.add(Tombstone(
+                board_id=board_id,
+                entity_type=entity_type,
+                entity_id=obj.id,
+                version=touch_board(db, board_id),
+            ))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(SessionLocal, "after_rollback")
+def _reset_versions(db: Session):
+    db.info.pop(_VERSIONS_KEY, None)
+
+
+def get_board_changes(db: Session, board: Board, since: int) -> dict:
+    """Filas creadas/modificadas y borrados del tablero posteriores a ``since``."""
+    version = board.version or 0
+    changes = {
+        "board_id": board.id,
+        "title": board.title,
+        "since": since,
+        "version": version,
+        "full_reload": since > version,
+        "lists": [],
+        "cards": [],
+        "labels": [],
+        "subtasks": [],
+        "timesheets": [],
+        "deleted": {name: [] for name in TRACKED_MODELS.values()},
+    }
+    if since >= version:
+        return changes
+
+    changes["lists"] = (
+        db.query(ListModel)
+        .filter(ListModel.board_id == board.id, ListModel.version > since)
+        .all()
+    )
+    changes["cards"] = (
+        db.query(Card)
+        .join(ListModel, ListModel.id == Card.list_id)
+        .filter(ListModel.board_id == board.id, Card.version > since)
+        .order_by(Card.list_id, Card.order)
+        .all()
+    )
+    for model in (Label, Subtask, Timesheet):
+        changes[TRACKED_MODELS[model]] = (
+            db.query(model)
+            .join(Card, Card.id == model.card_id)
+            .join(ListModel, ListModel.id == Card.list_id)
+            .filter(ListModel.board_id == board.id, model.version > since)
+            .all()
+        )
+
+    tombstones = (
+        db.query(Tombstone.entity_type, Tombstone.entity_id)
+        .filter(Tombstone.board_id == board.id, Tombstone.version > since)
+        .order_by(Tombstone.version)
+        .all()
+    )
+    for entity_type, entity_id in tombstones:
+        changes["deleted"].setdefault(entity_type, []).append(entity_id)
+
+    return changes
@@ -0,0 +1,248 @@
+# cache_bus.py - Bus de invalidación de cachés entre workers
+"""Con varios workers de uvicorn, una caché en memoria queda obsoleta cuando
+otro worker escribe. Las escrituras publican aquí qué ha cambiado (hoy,
+``board:<id>`` desde ``touch_board`` y el borrado de tableros) y cada worker
+descarta las entradas afectadas:
+
+- En el propio proceso, al hacer commit (``after_commit``), sin esperas.
+- En PostgreSQL, con ``pg_notify`` dentro de la transacción: la notificación
+  solo sale si hay commit. Un hilo por worker hace ``LISTEN`` y la recibe en
+  milisegundos.
+- En el resto (SQLite en desarrollo y pruebas), la publicación es una fila en
+  ``cache_invalidations``, en la misma transacción, y el hilo la sondea cada
+  ``CACHE_BUS_POLL_SECONDS``.
+
+Las cachés (``BusCache``) solo se usan mientras el hilo escucha; en procesos
+sin bus (scripts, worker de trabajos) se consulta siempre la base de datos,
+pero sus escrituras se siguen publicando para los workers de la API. Con
+``NEOCARE_CACHE_BUS=0`` nadie escucha y no se publica nada fuera del proceso.
+La tabla la poda el hilo de la API y también ``job_worker.py``.
+"""
+import abc
+import logging
+import select as select_module
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from config import (
+    CACHE_BUS_ENABLED,
+    CACHE_BUS_POLL_SECONDS,
+    CACHE_BUS_RETENTION_SECONDS,
+    CACHE_TTL_SECONDS,
+)
+from database import SessionLocal, engine
+from metrics import CACHE_INVALIDATIONS, CACHE_LOOKUPS
+from models import CacheInvalidation
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "neocare_invalidate"
+_PENDING_KEY = "cache_bus_pending"
+PRUNE_EVERY_SECONDS = 30
+RECONNECT_SECONDS = 1.0
+
+# Tema -> funciones(key) a las que avisar; key None significa "todo"
+_subscribers: Dict[str, list] = defaultdict(list)
+
+
+def subscribe(topic: str, callback: Callable[[Optional[str]], None]) -> None:
+    _subscribers[topic].append(callback)
+
+
+def _dispatch(topic: str, key: Optional[str], source: str) -> None:
+    for callback in _subscribers.get(topic, ()):
+        callback(key)
+    CACHE_INVALIDATIONS.inc((topic, source))
+
+
+def _dispatch_all(source: str) -> None:
+    for topic in list(_subscribers):
+        _dispatch(topic, None, source)
+
+
+# --- Publicación (en la transacción del llamador) ---
+
+def publish(db: Session, topic: str, key) -> None:
+    """Anuncia que ``topic:key`` cambia en esta transacción (sin commit)."""
+    key = str(key)
+    pending = db.info.setdefault(_PENDING_KEY, set())
+    if (topic, key) in pending:
+        return
+    pending.add((topic, key))
+    if not CACHE_BUS_ENABLED:
+        return
+    if engine.dialect.name == "postgresql":
+        db.execute(select(func.pg_notify(CHANNEL, f"{topic}:{key}")))
+    else:
+        db.execute(insert(CacheInvalidation).values(topic=topic, key=key, created_at=datetime.utcnow()))
+
+
+def has_pending(db: Session) -> bool:
+    """La sesión tiene cambios publicados sin confirmar (no se debe cachear lo que lee)."""
+    return bool(db.info.get(_PENDING_KEY))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_committed(db: Session):
+    for topic, key in db.info.pop(_PENDING_KEY, ()):
+        _dispatch(topic, key, "local")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending(db: Session):
+    db.info.pop(_PENDING_KEY, None)
+
+
+def prune_invalidations(conn) -> int:
+    """Borra las filas de ``cache_invalidations`` más antiguas que la retención (sin commit)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=CACHE_BUS_RETENTION_SECONDS)
+    return conn.execute(delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff)).rowcount
+
+
+# --- Escucha ---
+
+class _Listener(threading.Thread, abc.ABC):
+    def __init__(self):
+        super().__init__(name="cache-bus", daemon=True)
+        self.stopping = threading.Event()
+        self.ready = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                self.listen()
+            except Exception:
+                logger.exception("Bus de invalidación caído; se reconecta")
+                self.ready.clear()
+                # Mientras no escuchábamos se pudo perder algo: se vacía todo
+                _dispatch_all("reset")
+                self.stopping.wait(RECONNECT_SECONDS)
+
+    @abc.abstractmethod
+    def listen(self) -> None:
+        """Escucha hasta ``stopping``; marca ``ready`` cuando ya recibe avisos."""
+
+
+class _PostgresListener(_Listener):
+    def listen(self) -> None:
+        raw = engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(f"LISTEN {CHANNEL}")
+            self.ready.set()
+            while not self.stopping.is_set():
+                if not select_module.select([conn], [], [], 0.5)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    topic, _, key = conn.notifies.pop(0).payload.partition(":")
+                    _dispatch(topic, key, "remote")
+        finally:
+            # Conexión en autocommit y con LISTEN: no debe volver al pool
+            raw.invalidate()
+            raw.close()
+
+
+class _TableListener(_Listener):
+    def listen(self) -> None:
+        with engine.connect() as conn:
+            last_id = conn.execute(select(func.max(CacheInvalidation.id))).scalar() or 0
+            conn.rollback()
+            self.ready.set()
+            next_prune = time.monotonic() + PRUNE_EVERY_SECONDS
+            while not self.stopping.wait(CACHE_BUS_POLL_SECONDS):
+                rows = conn.execute(
+                    select(CacheInvalidation.id, CacheInvalidation.topic, CacheInvalidation.key)
+                    .where(CacheInvalidation.id > last_id)
+                    .order_by(CacheInvalidation.id)
+                ).all()
+                for row_id, topic, key in rows:
+                    _dispatch(topic, key, "remote")
+                    last_id = row_id
+                if time.monotonic() >= next_prune:
+                    prune_invalidations(conn)
+                    next_prune = time.monotonic() + PRUNE_EVERY_SECONDS
+                # Sin transacción abierta entre sondeos (SQLite no bloquea a los escritores)
+                conn.commit()
+
+
+_listener: Optional[_Listener] = None
+
+
+def start(timeout: float = 5.0) -> None:
+    global _listener
+    if _listener is not None:
+        return
+    _listener = _PostgresListener() if engine.dialect.name == "postgresql" else _TableListener()
+    _listener.start()
+    _listener.ready.wait(timeout)
+
+
+def stop() -> None:
+    global _listener
+    if _listener is None:
+        return
+    _listener.stopping.set()
+    _listener.join(timeout=2)
+    _listener = None
+    _dispatch_all("reset")
+
+
+def is_listening() -> bool:
+    return _listener is not None and _listener.ready.is_set()
+
+
+# --- Cachés ---
+
+class BusCache:
+    """Caché en memoria del proceso cuyas entradas se descartan al recibir
+    ``topic:key`` por el bus (y, en cualquier caso, pasados ``ttl`` segundos)."""
+
+    def __init__(self, name: str, topic: str, maxsize: int = 10000, ttl: float = CACHE_TTL_SECONDS):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: dict = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        subscribe(topic, self.invalidate)
+
+    def get_or_load(self, key, loader: Callable, cacheable: bool = True):
+        """Devuelve la entrada o la carga con ``loader()``. Los valores None no se guardan."""
+        if not is_listening():
+            return loader()
+        key = str(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > now:
+                CACHE_LOOKUPS.inc((self.name, "hit"))
+                return entry[0]
+            generation = self._generation
+        CACHE_LOOKUPS.inc((self.name, "miss"))
+        value = loader()
+        if value is None or not cacheable:
+            return value
+        with self._lock:
+            # Si llegó una invalidación mientras cargábamos, el valor puede ser viejo
+            if self._generation == generation:
+                if len(self._data) >= self.maxsize:
+                    self._data.clear()
+                self._data[key] = (value, now + self.ttl)
+        return value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(str(key), None)
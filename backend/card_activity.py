@@ -0,0 +1,93 @@
+# card_activity.py - Historial de eventos de tarjetas (solo inserciones)
+"""Las mutaciones de ``card_router`` añaden una fila a ``card_activity`` por
+cada evento: creación, movimiento entre listas, completada, reabierta y
+vencida. Las filas nunca se modifican, así que los informes pueden responder
+"qué se completó en la semana X" con un rango sobre el índice
+``(board_id, event_type, at)`` aunque la tarjeta se haya editado después.
+
+Para bases existentes, ``python card_activity.py`` rellena el historial de las
+tarjetas que aún no tienen eventos a partir de ``created_at`` y ``updated_at``.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import exists, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Card, CardActivity, List as ListModel
+
+CREATED = "created"
+MOVED = "moved"
+COMPLETED = "completed"
+REOPENED = "reopened"
+OVERDUE = "overdue"
+
+
+def record_card_event(
+    db: Session,
+    card: Card,
+    event_type: str,
+    board_id: int,
+    user_id: Optional[int] = None,
+    from_list_id: Optional[int] = None,
+) -> None:
+    """Añade un evento a la sesión; se guarda con el commit de la mutación."""
+    db.add(CardActivity(
+        board_id=board_id,
+        card_id=card.id,
+        event_type=event_type,
+        from_list_id=from_list_id,
+        to_list_id=card.list_id,
+        user_id=user_id,
+        at=datetime.utcnow(),
+    ))
+
+
+def record_card_changes(
+    db: Session,
+    card: Card,
+    board_id: int,
+    user_id: int,
+    was_completed: bool,
+    was_overdue: bool,
+    from_list_id: int,
+) -> None:
+    """Registra los eventos que se derivan de comparar la tarjeta con su estado previo."""
+    if card.list_id != from_list_id:
+        record_card_event(db, card, MOVED, board_id, user_id, from_list_id)
+    if bool(card.completed) != bool(was_completed):
+        record_card_event(db, card, COMPLETED if card.completed else REOPENED, board_id, user_id)
+    if card.overdue and not was_overdue:
+        record_card_event(db, card, OVERDUE, board_id, user_id)
+
+
+def backfill_activity(db: Session) -> int:
+    """Crea los eventos aproximados de las tarjetas sin historial. Devuelve cuántos."""
+    columns = ["board_id", "card_id", "event_type", "to_list_id", "user_id", "at"]
+    no_history = ~exists().where(CardActivity.card_id == Card.id)
+    sources = (
+        (CREATED, Card.created_at, ()),
+        (COMPLETED, Card.updated_at, (Card.completed == True,)),
+        (OVERDUE, Card.updated_at, (Card.overdue == True,)),
+    )
+    # Un único INSERT ... SELECT: las tres ramas ven las mismas tarjetas sin historial
+    events = union_all(*(
+        select(
+            ListModel.board_id, Card.id, literal(event_type), Card.list_id, Card.user_id, at
+        )
+        .join(ListModel, ListModel.id == Card.list_id)
+        .where(no_history, at.isnot(None), *condition)
+        for event_type, at, condition in sources
+    ))
+    total = db.execute(insert(CardActivity).from_select(columns, events)).rowcount
+    db.commit()
+    return total
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"Eventos creados: {backfill_activity(db)}")
+    finally:
+        db.close()
@@ -0,0 +1,133 @@
+# card_archive.py - Archivo de tarjetas completadas hace tiempo
+"""Mueve a las tablas ``archived_*`` las tarjetas completadas cuya última
+actualización tiene más de ``ARCHIVE_AFTER_DAYS`` días, junto con sus etiquetas,
+subtareas y horas. Así las tablas activas (tablero, búsqueda, informes) solo
+contienen el trabajo vivo.
+
+Cada lote se copia con ``INSERT ... SELECT`` y se borra de las tablas activas
+en la misma transacción, dejando un tombstone por tarjeta para que los clientes
+sincronizados las retiren. Los informes pueden incluir el archivo con
+``include_archived=true`` (ver ``card_source`` y ``timesheet_source``).
+
+Uso (desde backend/)::
+
+    python card_archive.py            # usa NEOCARE_ARCHIVE_AFTER_DAYS (90)
+    python card_archive.py --days 30
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, literal, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from config import ARCHIVE_AFTER_DAYS
+from database import SessionLocal
+from models import (
+    Board, Card, List as ListModel, Label, Subtask, Timesheet, Tombstone,
+    ArchivedCard, ArchivedLabel, ArchivedSubtask, ArchivedTimesheet,
+)
+from board_purge import _delete_cards
+from board_sync import touch_board
+
+ARCHIVE_BATCH_SIZE = 500
+
+# Tabla activa -> tabla de archivo de los hijos de una tarjeta
+_ARCHIVED_CHILDREN = (
+    (Label, ArchivedLabel),
+    (Subtask, ArchivedSubtask),
+    (Timesheet, ArchivedTimesheet),
+)
+
+
+def _archive_batch(db: Session, board_id: int, card_ids: list, now: datetime) -> None:
+    version = touch_board(db, board_id)
+    db.execute(
+        insert(ArchivedCard).from_select(
+            [c.name for c in Card.__table__.c] + ["board_id", "archived_at"],
+            select(*Card.__table__.c, literal(board_id), literal(now)).where(Card.id.in_(card_ids)),
+        )
+    )
+    for hot, cold in _ARCHIVED_CHILDREN:
+        db.execute(
+            insert(cold).from_select(
+                [c.name for c in hot.__table__.c],
+                select(*hot.__table__.c).where(hot.card_id.in_(card_ids)),
+            )
+        )
+    db.execute(
+        insert(Tombstone).from_select(
+            ["board_id", "entity_type", "entity_id", "version", "deleted_at"],
+            select(
+                literal(board_id), literal("cards"), Card.id, literal(version), literal(now)
+            ).where(Card.id.in_(card_ids)),
+        )
+    )
+    # Las horas recién copiadas a archived_timesheets se quedan
+    _delete_cards(db, card_ids, archived_hours=False)
+
+
+def archive_completed_cards(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """Archiva por lotes las tarjetas frías. Devuelve cuántas se archivaron."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    candidates = (
+        select(Card.id, ListModel.board_id)
+        .join(ListModel, ListModel.id == Card.list_id)
+        .join(Board, Board.id == ListModel.board_id)
+        .where(
+            Card.completed == True,
+            Card.updated_at < cutoff,
+            Board.deleted_at.is_(None),
+        )
+        .order_by(ListModel.board_id, Card.id)
+        .limit(ARCHIVE_BATCH_SIZE)
+    )
+
+    archived = 0
+    while True:
+        rows = db.execute(candidates).all()
+        if not rows:
+            break
+        by_board = {}
+        for card_id, board_id in rows:
+            by_board.setdefault(board_id, []).append(card_id)
+        now = datetime.utcnow()
+        for board_id, card_ids in by_board.items():
+            _archive_batch(db, board_id, card_ids, now)
+        db.commit()
+        archived += len(rows)
+    db.expire_all()
+    return archived
+
+
+def _union_source(hot, cold, name: str):
+    """Alias de ``hot`` sobre ``hot UNION ALL cold`` (mismas columnas)."""
+    columns = hot.__table__.c
+    rows = union_all(
+        select(*columns),
+        select(*(cold.__table__.c[c.name] for c in columns)),
+    ).subquery(name)
+    return aliased(hot, rows, name=name)
+
+
+def card_source(include_archived: bool):
+    """``Card`` o, con archivo, un alias de ``Card`` que incluye ``archived_cards``."""
+    return _union_source(Card, ArchivedCard, "cards_all") if include_archived else Card
+
+
+def timesheet_source(include_archived: bool):
+    """``Timesheet`` o, con archivo, un alias que incluye ``archived_timesheets``."""
+    return (
+        _union_source(Timesheet, ArchivedTimesheet, "timesheets_all")
+        if include_archived else Timesheet
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archiva tarjetas completadas hace tiempo")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS)
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        print(f"Tarjetas archivadas: {archive_completed_cards(db, args.days)}")
+    finally:
+        db.close()
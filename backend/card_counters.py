@@ -0,0 +1,133 @@
+# card_counters.py - Contadores desnormalizados de cada tarjeta
+"""Cada tarjeta guarda sus horas totales, subtareas (hechas/total) y número de
+etiquetas, para que el tablero los muestre sin sumar ``/api/timesheets/me`` ni
+pedir ``/subtasks`` tarjeta a tarjeta.
+
+Las rutas que crean, modifican o borran horas, etiquetas o subtareas llaman a
+``adjust_card_counters`` dentro de su propia transacción: un ``UPDATE``
+relativo (``col = col + delta``), sin leer antes la tarjeta. Cuando la
+variación no se conoce de antemano (la rejilla sobrescribe celdas con
+``ON CONFLICT``), ``recompute_card_hours`` vuelve a sumar las horas de las
+tarjetas afectadas. Lo que escribe por otros caminos (cargas masivas, SQL a
+mano) puede desviarlos; ``reconcile_card_counters`` los recalcula y corrige.
+
+Uso (desde backend/)::
+
+    python card_counters.py             # corrige las tarjetas desviadas
+    python card_counters.py --dry-run   # solo informa
+"""
+import argparse
+from typing import Optional
+
+from sqlalchemy import and_, bindparam, func, or_, select, true, update
+from sqlalchemy.orm import Session
+
+from board_sync import touch_board
+from database import SessionLocal
+from models import ArchivedTimesheet, Card, Label, Subtask, Timesheet
+
+COUNTER_COLUMNS = ("total_hours", "subtasks_total", "subtasks_done", "labels_count")
+RECONCILE_BATCH_SIZE = 1000
+HOURS_TOLERANCE = 1e-6  # las sumas de Float arrastran error de redondeo
+
+_cards = Card.__table__
+
+
+def _expire_counters(db: Session, card_id: int, columns) -> None:
+    # La copia en memoria de la tarjeta queda obsoleta tras el UPDATE directo
+    card = db.identity_map.get(db.identity_key(Card, card_id))
+    if card is not None and card not in db.deleted:
+        db.expire(card, list(columns))
+
+
+def adjust_card_counters(db: Session, card_id: Optional[int], board_id: Optional[int] = None,
+                         **deltas) -> None:
+    """Suma ``deltas`` (p. ej. ``total_hours=1.5``) a los contadores (sin commit).
+
+    Con ``board_id``, la tarjeta se sella además con la versión del tablero
+    para que ``/changes`` envíe los contadores nuevos."""
+    values = {name: _cards.c[name] + delta for name, delta in deltas.items() if delta}
+    if card_id is None or not values:
+        return
+    if board_id is not None:
+        values["version"] = touch_board(db, board_id)
+    db.execute(update(_cards).where(_cards.c.id == card_id).values(**values))
+    _expire_counters(db, card_id, values)
+
+
+def recompute_card_hours(db: Session, board_by_card: dict) -> None:
+    """Recalcula ``total_hours`` de las tarjetas ``{card_id: board_id}`` (sin commit)."""
+    params = [
+        {"card_id": card_id, "card_version": touch_board(db, board_id)}
+        for card_id, board_id in board_by_card.items()
+    ]
+    if not params:
+        return
+    db.execute(
+        update(_cards)
+        .where(_cards.c.id == bindparam("card_id"))
+        .values(total_hours=_expected_hours(), version=bindparam("card_version")),
+        params,
+    )
+    for row in params:
+        _expire_counters(db, row["card_id"], ("total_hours", "version"))
+
+
+# --- Reconciliación ---
+
+def _expected_hours():
+    # Las horas archivadas con sus particiones (timesheet_partitions.py) siguen contando
+    return (
+        select(func.coalesce(func.sum(Timesheet.hours), 0))
+        .where(Timesheet.card_id == _cards.c.id).scalar_subquery()
+        + select(func.coalesce(func.sum(ArchivedTimesheet.hours), 0))
+        .where(ArchivedTimesheet.card_id == _cards.c.id).scalar_subquery()
+    )
+
+
+def _expected_counters():
+    """Subconsultas correlacionadas con el valor real de cada contador."""
+    subtasks = Subtask.__table__
+    return {
+        "total_hours": _expected_hours(),
+        "subtasks_total": select(func.count()).select_from(subtasks)
+        .where(subtasks.c.card_id == _cards.c.id).scalar_subquery(),
+        "subtasks_done": select(func.count()).select_from(subtasks)
+        .where(subtasks.c.card_id == _cards.c.id, subtasks.c.completed == true()).scalar_subquery(),
+        "labels_count": select(func.count()).select_from(Label.__table__)
+        .where(Label.card_id == _cards.c.id).scalar_subquery(),
+    }
+
+
+def reconcile_card_counters(db, fix: bool = True) -> int:
+    """Recalcula los contadores por tramos de ids y corrige los desviados
+    (con ``fix=False`` solo los cuenta). Devuelve cuántas tarjetas lo estaban.
+    Acepta una sesión o una conexión; hace commit por tramo si es una sesión."""
+    expected = _expected_counters()
+    drifted_filter = or_(
+        func.abs(_cards.c.total_hours - expected["total_hours"]) > HOURS_TOLERANCE,
+        *(_cards.c[name] != expected[name] for name in COUNTER_COLUMNS[1:]),
+    )
+    max_id = db.execute(select(func.max(_cards.c.id))).scalar() or 0
+    drifted = 0
+    for start in range(0, max_id, RECONCILE_BATCH_SIZE):
+        in_batch = and_(_cards.c.id > start, _cards.c.id <= start + RECONCILE_BATCH_SIZE)
+        card_ids = db.execute(select(_cards.c.id).where(in_batch, drifted_filter)).scalars().all()
+        drifted += len(card_ids)
+        if fix and card_ids:
+            db.execute(update(_cards).where(_cards.c.id.in_(card_ids)).values(**expected))
+        if isinstance(db, Session):
+            db.commit()
+    return drifted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repara los contadores desnormalizados de las tarjetas")
+    parser.add_argument("--dry-run", action="store_true", help="Solo cuenta las tarjetas desviadas")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        drifted = reconcile_card_counters(db, fix=not args.dry_run)
+    finally:
+        db.close()
+    print(f"Tarjetas desviadas: {drifted}" + ("" if args.dry_run else " (corregidas)"))
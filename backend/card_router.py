@@ -1,12 +1,18 @@
 # backend/card_router.py
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, tuple_
 from database import get_db
-from models import Card, List as ListModel, Board, User, Label, Subtask
+from db_router import get_read_db
+from models import ArchivedTimesheet, Card, List as ListModel, Board, User, Label, Subtask
 from schemas import (
     Card as CardSchema,
+    CardPage,
     CardCreate,
     CardUpdate,
     CardMove,
@@ -16,39 +22,35 @@ from schemas import (
     SubtaskCreate,
     SubtaskUpdate,
 )
-from auth_router import get_current_user
+from auth_router import get_current_read_user, get_current_user
+from board_sync import touch_board
+from card_counters import adjust_card_counters
+from card_activity import CREATED, MOVED, record_card_changes, record_card_event
+from hot_queries import CARD_ENTITY_BY_OWNER, LIST_ENTITY_BY_OWNER, owned_card, owned_list
 
 router = APIRouter(tags=["cards"])
 
+CARD_PAGE_SIZE = 50
+CARD_PAGE_MAX = 200
+DUE_DEFAULT_DAYS = 30
+
 def ensure_list_belongs_to_user(db: Session, list_id: int, user_id: int) -> ListModel | None:
     """Verifica si una lista pertenece al usuario actual a través del tablero"""
-    return (
-        db.query(ListModel)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(ListModel.id == list_id, Board.user_id == user_id)
-        .first()
-    )
+    return db.execute(LIST_ENTITY_BY_OWNER, {"list_id": list_id, "user_id": user_id}).scalars().first()
 
 
 def ensure_card_belongs_to_user(db: Session, card_id: int, user_id: int) -> Card | None:
-    return (
-        db.query(Card)
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(Card.id == card_id, Board.user_id == user_id)
-        .first()
-    )
+    return db.execute(CARD_ENTITY_BY_OWNER, {"card_id": card_id, "user_id": user_id}).scalars().first()
 
 @router.get("/by-list/{list_id}", response_model=List[CardSchema])
 async def get_cards_by_list(
     list_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Obtener todas las tarjetas de una lista específica para el usuario autenticado"""
     # Validamos que la lista existe y es del usuario
-    list_obj = ensure_list_belongs_to_user(db, list_id, current_user.id)
-    if list_obj is None:
+    if owned_list(db, list_id, current_user.id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lista no encontrada")
 
     # Retornamos las tarjetas ordenadas
@@ -78,6 +80,8 @@ async def create_card(
         order=max_order + 1
     )
     db.add(db_card)
+    db.flush()
+    record_card_event(db, db_card, CREATED, list_obj.board_id, current_user.id)
     db.commit()
     db.refresh(db_card)
     return db_card
@@ -86,8 +90,8 @@ async def create_card(
 async def list_cards(
     board_id: int,
     responsible_id: int | None = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     query = (
         db.query(Card)
@@ -107,8 +111,8 @@ async def search_cards(
     board_id: int,
     query_text: str = Query(..., alias="query", min_length=1),
     responsible_id: int | None = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     base_query = (
         db.query(Card)
@@ -128,11 +132,92 @@ async def search_cards(
     return base_query.order_by(Card.created_at.desc()).all()
 
 
+# --- Vistas entre tableros (agenda y "mi trabajo") con paginación por clave ---
+
+def _encode_cursor(*values) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, *parsers) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != len(parsers):
+            raise ValueError(cursor)
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor no válido")
+
+
+def _my_cards(db: Session, user_id: int):
+    """Tarjetas de las que el usuario es responsable en sus tableros activos.
+    El filtro por ``Card.user_id`` va primero en los índices ``ix_cards_user_*``."""
+    return (
+        db.query(Card)
+        .join(ListModel, ListModel.id == Card.list_id)
+        .join(Board, Board.id == ListModel.board_id)
+        .filter(Card.user_id == user_id, Board.user_id == user_id, Board.deleted_at.is_(None))
+    )
+
+
+def _card_page(cards: list, limit: int, cursor_of) -> dict:
+    # Se pide una fila de más para saber si hay página siguiente
+    next_cursor = _encode_cursor(*cursor_of(cards[limit - 1])) if len(cards) > limit else None
+    return {"items": cards[:limit], "next_cursor": next_cursor}
+
+
+@router.get("/due", response_model=CardPage)
+async def get_due_cards(
+    date_from: datetime | None = Query(None, alias="from"),
+    date_to: datetime | None = Query(None, alias="to"),
+    include_completed: bool = False,
+    cursor: str | None = None,
+    limit: int = Query(CARD_PAGE_SIZE, ge=1, le=CARD_PAGE_MAX),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Tarjetas que vencen entre ``from`` y ``to`` en todos los tableros del
+    usuario (por defecto, desde hoy y durante 30 días), por fecha de vencimiento."""
+    date_from = date_from or datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    date_to = date_to or date_from + timedelta(days=DUE_DEFAULT_DAYS)
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' es anterior a 'from'")
+
+    query = _my_cards(db, current_user.id).filter(Card.due_date >= date_from, Card.due_date <= date_to)
+    if not include_completed:
+        query = query.filter(Card.completed == False)
+    if cursor:
+        due_date, card_id = _decode_cursor(cursor, datetime.fromisoformat, int)
+        query = query.filter(tuple_(Card.due_date, Card.id) > tuple_(due_date, card_id))
+
+    cards = query.order_by(Card.due_date, Card.id).limit(limit + 1).all()
+    return _card_page(cards, limit, lambda card: (card.due_date, card.id))
+
+
+@router.get("/assigned-to-me", response_model=CardPage)
+async def get_cards_assigned_to_me(
+    completed: bool = False,
+    cursor: str | None = None,
+    limit: int = Query(CARD_PAGE_SIZE, ge=1, le=CARD_PAGE_MAX),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Tarjetas del usuario en todos sus tableros (pendientes por defecto), de
+    la más reciente a la más antigua."""
+    query = _my_cards(db, current_user.id).filter(Card.completed == completed)
+    if cursor:
+        (card_id,) = _decode_cursor(cursor, int)
+        query = query.filter(Card.id < card_id)
+
+    cards = query.order_by(Card.id.desc()).limit(limit + 1).all()
+    return _card_page(cards, limit, lambda card: (card.id,))
+
+
 @router.get("/{card_id}", response_model=CardSchema)
 async def get_card_by_id(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     card = ensure_card_belongs_to_user(db, card_id, current_user.id)
     if card is None:
@@ -151,6 +236,8 @@ async def update_card(
     if card is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found")
 
+    board_id = card.list_ref.board_id
+    previous = (card.completed, card.overdue, card.list_id)
     if updates.title is not None:
         card.title = updates.title
     if updates.description is not None:
@@ -164,12 +251,14 @@ async def update_card(
         if list_obj is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Target list not found")
         card.list_id = updates.list_id
+        board_id = list_obj.board_id
 
     if getattr(updates, 'completed', None) is not None:
         card.completed = updates.completed
     if getattr(updates, 'overdue', None) is not None:
         card.overdue = updates.overdue
 
+    record_card_changes(db, card, board_id, current_user.id, *previous)
     db.commit()
     db.refresh(card)
     return card
@@ -185,11 +274,14 @@ async def delete_card(
     if card is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found")
 
+    version = touch_board(db, card.list_ref.board_id)
     db.query(Card).filter(
         Card.list_id == card.list_id,
         Card.order > card.order,
-    ).update({Card.order: Card.order - 1}, synchronize_session=False)
+    ).update({Card.order: Card.order - 1, Card.version: version}, synchronize_session=False)
 
+    # Horas de meses ya archivados (timesheet_partitions.py): no tienen clave foránea
+    db.query(ArchivedTimesheet).filter(ArchivedTimesheet.card_id == card.id).delete(synchronize_session=False)
     db.delete(card)
     db.commit()
     return None
@@ -198,11 +290,10 @@ async def delete_card(
 @router.get("/{card_id}/labels", response_model=List[LabelSchema])
 async def get_labels_for_card(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
-    card = ensure_card_belongs_to_user(db, card_id, current_user.id)
-    if card is None:
+    if owned_card(db, card_id, current_user.id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found")
 
     return db.query(Label).filter(Label.card_id == card_id).all()
@@ -225,6 +316,7 @@ async def create_label_for_card(
 
     db_label = Label(card_id=card_id, name=label_in.name, color=label_in.color)
     db.add(db_label)
+    adjust_card_counters(db, card_id, card.list_ref.board_id, labels_count=1)
     db.commit()
     db.refresh(db_label)
     return db_label
@@ -236,19 +328,20 @@ async def delete_label(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    label = (
-        db.query(Label)
+    label, board_id = (
+        db.query(Label, ListModel.board_id)
         .join(Card, Card.id == Label.card_id)
         .join(ListModel, ListModel.id == Card.list_id)
         .join(Board, Board.id == ListModel.board_id)
         .filter(Label.id == label_id, Board.user_id == current_user.id)
         .first()
-    )
+    ) or (None, None)
 
     if label is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Label not found")
 
     db.delete(label)
+    adjust_card_counters(db, label.card_id, board_id, labels_count=-1)
     db.commit()
     return None
 
@@ -256,11 +349,10 @@ async def delete_label(
 @router.get("/{card_id}/subtasks", response_model=List[SubtaskSchema])
 async def get_subtasks_for_card(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
-    card = ensure_card_belongs_to_user(db, card_id, current_user.id)
-    if card is None:
+    if owned_card(db, card_id, current_user.id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found")
 
     return (
@@ -288,6 +380,7 @@ async def create_subtask_for_card(
 
     db_subtask = Subtask(card_id=card_id, title=subtask_in.title)
     db.add(db_subtask)
+    adjust_card_counters(db, card_id, card.list_ref.board_id, subtasks_total=1)
     db.commit()
     db.refresh(db_subtask)
     return db_subtask
@@ -300,22 +393,23 @@ async def update_subtask(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    subtask = (
-        db.query(Subtask)
+    subtask, board_id = (
+        db.query(Subtask, ListModel.board_id)
         .join(Card, Card.id == Subtask.card_id)
         .join(ListModel, ListModel.id == Card.list_id)
         .join(Board, Board.id == ListModel.board_id)
         .filter(Subtask.id == subtask_id, Board.user_id == current_user.id)
         .first()
-    )
+    ) or (None, None)
 
     if subtask is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subtask not found")
 
     if updates.title is not None:
         subtask.title = updates.title
-    if updates.completed is not None:
+    if updates.completed is not None and updates.completed != bool(subtask.completed):
         subtask.completed = updates.completed
+        adjust_card_counters(db, subtask.card_id, board_id, subtasks_done=1 if updates.completed else -1)
 
     db.commit()
     db.refresh(subtask)
@@ -328,19 +422,22 @@ async def delete_subtask(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    subtask = (
-        db.query(Subtask)
+    subtask, board_id = (
+        db.query(Subtask, ListModel.board_id)
         .join(Card, Card.id == Subtask.card_id)
         .join(ListModel, ListModel.id == Card.list_id)
         .join(Board, Board.id == ListModel.board_id)
         .filter(Subtask.id == subtask_id, Board.user_id == current_user.id)
         .first()
-    )
+    ) or (None, None)
 
     if subtask is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subtask not found")
 
     db.delete(subtask)
+    adjust_card_counters(
+        db, subtask.card_id, board_id, subtasks_total=-1, subtasks_done=-1 if subtask.completed else 0
+    )
     db.commit()
     return None
 
@@ -365,31 +462,37 @@ async def move_card(
     new_list_id = move_data.list_id
     new_order = move_data.new_order
 
+    # Las tarjetas desplazadas también cuentan como cambios para /changes
+    old_version = touch_board(db, card.list_ref.board_id)
+    new_version = touch_board(db, target_list.board_id)
+
     if old_list_id == new_list_id:
         if new_order > old_order:
             db.query(Card).filter(
                 Card.list_id == old_list_id,
                 Card.order > old_order,
                 Card.order <= new_order,
-            ).update({Card.order: Card.order - 1}, synchronize_session=False)
+            ).update({Card.order: Card.order - 1, Card.version: old_version}, synchronize_session=False)
         elif new_order < old_order:
             db.query(Card).filter(
                 Card.list_id == old_list_id,
                 Card.order >= new_order,
                 Card.order < old_order,
-            ).update({Card.order: Card.order + 1}, synchronize_session=False)
+            ).update({Card.order: Card.order + 1, Card.version: old_version}, synchronize_session=False)
     else:
         db.query(Card).filter(
             Card.list_id == old_list_id,
             Card.order > old_order,
-        ).update({Card.order: Card.order - 1}, synchronize_session=False)
+        ).update({Card.order: Card.order - 1, Card.version: old_version}, synchronize_session=False)
         db.query(Card).filter(
             Card.list_id == new_list_id,
             Card.order >= new_order,
-        ).update({Card.order: Card.order + 1}, synchronize_session=False)
+        ).update({Card.order: Card.order + 1, Card.version: new_version}, synchronize_session=False)
 
     card.list_id = new_list_id
     card.order = new_order
+    if new_list_id != old_list_id:
+        record_card_event(db, card, MOVED, target_list.board_id, current_user.id, old_list_id)
 
     db.commit()
     db.refresh(card)
@@ -1,6 +1,80 @@
+import os
+
 # JWT Configuration
 SECRET_KEY = "your-secret-key-here"  # Change this to a secure secret key
 ALGORITHM = "HS256"
 # Aumentamos la vida del token para evitar que la sesión se caiga a los pocos minutos.
 # 8 horas de sesión continua es razonable para este proyecto.
-ACCESS_TOKEN_EXPIRE_MINUTES = 8 * 60
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = 8 * 60
+
+# Perfilador SQL (solo desarrollo): NEOCARE_SQL_PROFILE=1 activa la detección
+# de N+1 y el log de consultas lentas.
+SQL_PROFILE = os.getenv("NEOCARE_SQL_PROFILE", "0") == "1"
+SLOW_QUERY_MS = float(os.getenv("NEOCARE_SLOW_QUERY_MS", "100"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("NEOCARE_N_PLUS_ONE_THRESHOLD", "5"))
+
+# Archivo: las tarjetas completadas hace más de estos días salen de las tablas
+# activas (python card_archive.py).
+ARCHIVE_AFTER_DAYS = int(os.getenv("NEOCARE_ARCHIVE_AFTER_DAYS", "90"))
+
+# Réplica de lectura (DATABASE_REPLICA_URL): tras una escritura, las lecturas del
+# mismo usuario van al primario durante esta ventana; si la réplica falla, se
+# deja de usar durante REPLICA_RETRY_SECONDS.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("NEOCARE_READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("NEOCARE_REPLICA_RETRY_SECONDS", "30"))
+
+# Conexiones que se abren al arrancar para no pagar el primer connect en una petición
+POOL_WARMUP_CONNECTIONS = int(os.getenv("NEOCARE_POOL_WARMUP", "2"))
+
+# Informes idénticos y simultáneos comparten un único cálculo (single_flight.py)
+REPORT_LEASE_SECONDS = float(os.getenv("NEOCARE_REPORT_LEASE_SECONDS", "30"))
+REPORT_RESULT_TTL_SECONDS = float(os.getenv("NEOCARE_REPORT_RESULT_TTL_SECONDS", "30"))
+
+# Control de admisión (admission.py). Por clase de endpoint: peticiones
+# simultáneas, tamaño y espera máxima de la cola, y tasa/ráfaga por usuario
+# (peticiones por segundo). NEOCARE_ADMISSION=0 lo desactiva.
+ADMISSION_ENABLED = os.getenv("NEOCARE_ADMISSION", "1") == "1"
+ADMISSION_LIMITS = {
+    "report": {
+        "max_concurrent": int(os.getenv("NEOCARE_REPORT_MAX_CONCURRENT", "4")),
+        "max_queue": int(os.getenv("NEOCARE_REPORT_MAX_QUEUE", "16")),
+        "queue_timeout": float(os.getenv("NEOCARE_REPORT_QUEUE_TIMEOUT", "2")),
+        "rate": float(os.getenv("NEOCARE_REPORT_RATE", "2")),
+        "burst": int(os.getenv("NEOCARE_REPORT_BURST", "10")),
+    },
+    "crud": {
+        "max_concurrent": int(os.getenv("NEOCARE_CRUD_MAX_CONCURRENT", "32")),
+        "max_queue": int(os.getenv("NEOCARE_CRUD_MAX_QUEUE", "128")),
+        "queue_timeout": float(os.getenv("NEOCARE_CRUD_QUEUE_TIMEOUT", "1")),
+        "rate": float(os.getenv("NEOCARE_CRUD_RATE", "20")),
+        "burst": int(os.getenv("NEOCARE_CRUD_BURST", "60")),
+    },
+}
+
+# Cola de trabajos: un trabajo en curso cuyo lease caduca (worker caído) vuelve a
+# la cola; los reintentos esperan JOB_RETRY_BASE_SECONDS * 2^(intento - 1).
+JOB_LEASE_SECONDS = float(os.getenv("NEOCARE_JOB_LEASE_SECONDS", "300"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("NEOCARE_JOB_RETRY_BASE_SECONDS", "10"))
+JOB_POLL_SECONDS = float(os.getenv("NEOCARE_JOB_POLL_SECONDS", "1"))
+
+# Informes semanales pregenerados (report_snapshots.py): una semana ISO se da por
+# cerrada REPORT_SNAPSHOT_DELAY_HOURS después del lunes siguiente (para las horas
+# que se apuntan tarde); los tableros se procesan en trabajos de este tamaño.
+REPORT_SNAPSHOT_DELAY_HOURS = float(os.getenv("NEOCARE_REPORT_SNAPSHOT_DELAY_HOURS", "6"))
+REPORT_SNAPSHOT_BATCH_SIZE = int(os.getenv("NEOCARE_REPORT_SNAPSHOT_BATCH_SIZE", "50"))
+
+# Bus de invalidación de cachés entre workers (cache_bus.py): con PostgreSQL usa
+# LISTEN/NOTIFY; con otras bases, cada worker sondea la tabla cache_invalidations
+# cada CACHE_BUS_POLL_SECONDS. CACHE_TTL_SECONDS acota cualquier entrada perdida.
+CACHE_BUS_ENABLED = os.getenv("NEOCARE_CACHE_BUS", "1") != "0"
+CACHE_BUS_POLL_SECONDS = float(os.getenv("NEOCARE_CACHE_BUS_POLL_SECONDS", "0.05"))
+CACHE_BUS_RETENTION_SECONDS = float(os.getenv("NEOCARE_CACHE_BUS_RETENTION_SECONDS", "300"))
+CACHE_TTL_SECONDS = float(os.getenv("NEOCARE_CACHE_TTL_SECONDS", "60"))
+
+# Particionado mensual de timesheets (timesheet_partitions.py, solo PostgreSQL):
+# con la tabla ya convertida, se mantienen creadas las particiones de los
+# próximos meses.
+TIMESHEET_PARTITIONS_AHEAD = int(os.getenv("NEOCARE_TIMESHEET_PARTITIONS_AHEAD", "3"))
+
+# Importación de tableros (POST /api/boards/import): tamaño máximo del fichero
+IMPORT_MAX_BYTES = int(float(os.getenv("NEOCARE_IMPORT_MAX_MB", "50")) * 1024 * 1024)
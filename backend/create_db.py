@@ -1,11 +1,16 @@
-"""Utility to create all tables from models (development only).
+"""Utility to create or update the local database (development only).
 
-WARNING: This does NOT migrate data or alter existing tables safely. If you already
-have a production DB, prefer to use Alembic migrations. This script is intended
-for local development: delete `neocare.db` and run this script to create a fresh DB.
+The schema is managed by Alembic migrations: this script is equivalent to
+running `alembic upgrade head` from backend/. `neocare.db` is not versioned;
+delete it and run this script to start from a fresh DB.
 """
-from database import engine, Base
+import os
 
-print("Creating database tables (development only). If you have an existing 'neocare.db', BACK IT UP or delete it first.")
-Base.metadata.create_all(bind=engine)
+from alembic import command
+from alembic.config import Config
+
+from database import BASE_DIR
+
+print("Applying migrations (alembic upgrade head)...")
+command.upgrade(Config(os.path.join(BASE_DIR, "alembic.ini")), "head")
 print("Done.")
@@ -1,13 +1,15 @@
 from typing import List as ListType, Optional
  
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
  
 from models import User, Board, List as ListModel
 from schemas import UserCreate, BoardCreate, ListCreate
+from board_purge import delete_board_rows, delete_list_rows
+from hot_queries import BOARD_ENTITY_BY_OWNER, USER_ENTITY_BY_EMAIL, owned_board
  
  
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+    return db.execute(USER_ENTITY_BY_EMAIL, {"email": email}).scalars().first()
  
  
 def create_user(db: Session, user_in: UserCreate) -> User:
@@ -31,31 +33,35 @@ def create_board(db: Session, user_id: int, board_in: BoardCreate) -> Board:
  
  
 def get_boards_by_user(db: Session, user_id: int) -> ListType[Board]:
-    return db.query(Board).filter(Board.user_id == user_id).all()
+    # Las listas y sus tarjetas van en la respuesta: dos consultas en vez de una por lista
+    return (
+        db.query(Board)
+        .options(selectinload(Board.lists).selectinload(ListModel.cards))
+        .filter(Board.user_id == user_id)
+        .all()
+    )
  
  
 def get_board_by_id_and_user(
     db: Session, board_id: int, user_id: int
 ) -> Optional[Board]:
-    return (
-        db.query(Board)
-        .filter(Board.id == board_id, Board.user_id == user_id)
-        .first()
-    )
+    return db.execute(
+        BOARD_ENTITY_BY_OWNER, {"board_id": board_id, "user_id": user_id}
+    ).scalars().first()
  
  
 def delete_board(db: Session, board_id: int, user_id: int) -> bool:
-    board = get_board_by_id_and_user(db, board_id, user_id)
+    board = owned_board(db, board_id, user_id)
     if board is None:
         return False
  
-    db.delete(board)
+    delete_board_rows(db, board.id)
     db.commit()
     return True
  
  
 def create_list(db: Session, user_id: int, list_in: ListCreate) -> Optional[ListModel]:
-    board = get_board_by_id_and_user(db, list_in.board_id, user_id)
+    board = owned_board(db, list_in.board_id, user_id)
     if board is None:
         return None
  
@@ -69,11 +75,16 @@ def create_list(db: Session, user_id: int, list_in: ListCreate) -> Optional[List
 def get_lists_by_board(
     db: Session, board_id: int, user_id: int
 ) -> ListType[ListModel]:
-    board = get_board_by_id_and_user(db, board_id, user_id)
+    board = owned_board(db, board_id, user_id)
     if board is None:
         return []
  
-    return db.query(ListModel).filter(ListModel.board_id == board.id).all()
+    return (
+        db.query(ListModel)
+        .options(selectinload(ListModel.cards))
+        .filter(ListModel.board_id == board.id)
+        .all()
+    )
  
  
 def get_list_by_id_and_user(
@@ -92,6 +103,6 @@ def delete_list(db: Session, list_id: int, user_id: int) -> bool:
     if list_obj is None:
         return False
  
-    db.delete(list_obj)
+    delete_list_rows(db, list_obj)
     db.commit()
     return True
@@ -1,19 +1,57 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
  
-# Use absolute path for SQLite
+# Use absolute path for SQLite (DATABASE_URL permite usar otra base, p. ej. PostgreSQL)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'neocare.db')}"
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'neocare.db')}"
+)
  
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {},
 )
+
+# SQLite no aplica las claves foráneas (ni ON DELETE CASCADE) si no se activan
+# en cada conexión.
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Réplica de lectura opcional para informes y listados (ver db_router.py)
+SQLALCHEMY_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+replica_engine = None
+ReadSessionLocal = None
+if SQLALCHEMY_REPLICA_URL:
+    replica_engine = create_engine(
+        SQLALCHEMY_REPLICA_URL,
+        connect_args={"check_same_thread": False} if SQLALCHEMY_REPLICA_URL.startswith("sqlite") else {},
+        # Una réplica caída se detecta al sacar la conexión del pool
+        pool_pre_ping=True,
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
  
 Base = declarative_base()
  
+def warm_up_pool(target_engine, connections: int) -> None:
+    """Abre ``connections`` conexiones a la vez y las devuelve al pool."""
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = target_engine.connect()
+            opened.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in opened:
+            conn.close()
+
 def get_db():
     db = SessionLocal()
     try:
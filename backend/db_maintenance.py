@@ -0,0 +1,187 @@
+# db_maintenance.py - Mantenimiento y copias en caliente de la base SQLite
+"""Con el uso, las tarjetas que se crean, mueven, archivan y borran dejan
+estadísticas del planificador desfasadas y páginas libres en el fichero. Este
+comando hace el mantenimiento por pasos cortos, para no bloquear a la API:
+
+- ``analyze``: ``ANALYZE`` tabla a tabla con ``analysis_limit`` (muestreo
+  acotado) y después ``PRAGMA optimize``;
+- ``vacuum``: devuelve las páginas libres con ``PRAGMA incremental_vacuum`` en
+  lotes. La primera vez activa ``auto_vacuum=INCREMENTAL``, lo que exige un
+  ``VACUUM`` completo (bloqueante) una única vez;
+- ``stats``: tamaño de cada tabla e índice (tabla virtual ``dbstat``);
+- ``backup``: copia consistente con la API de backup de SQLite, copiando
+  ``--pages`` páginas por paso y soltando el bloqueo entre pasos.
+
+Uso (desde backend/)::
+
+    python db_maintenance.py                    # analyze + vacuum + stats
+    python db_maintenance.py stats
+    python db_maintenance.py vacuum --pages 500
+    python db_maintenance.py backup --output backups/neocare.db
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Optional
+
+from database import BASE_DIR, SQLALCHEMY_DATABASE_URL
+
+BACKUP_DIR = os.path.join(BASE_DIR, "backups")
+BUSY_TIMEOUT_SECONDS = 30
+ANALYSIS_LIMIT = 1000  # filas muestreadas por índice en ANALYZE
+VACUUM_STEP_PAGES = 200
+BACKUP_STEP_PAGES = 64
+STEP_PAUSE_SECONDS = 0.05  # hueco entre pasos para que entren los escritores
+
+
+def default_database_path() -> Optional[str]:
+    """Fichero de ``DATABASE_URL``; None si la base configurada no es SQLite."""
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite:///"):
+        return SQLALCHEMY_DATABASE_URL[len("sqlite:///"):]
+    return None
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    if not os.path.exists(path):
+        raise SystemExit(f"No existe la base de datos {path}")
+    # Autocommit: cada sentencia es su propia transacción corta
+    return sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+
+
+def _user_tables(conn: sqlite3.Connection) -> list:
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+
+
+def analyze(path: str) -> None:
+    conn = _connect(path)
+    try:
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        for table in _user_tables(conn):
+            started = time.perf_counter()
+            conn.execute(f'ANALYZE "{table}"')
+            print(f"  ANALYZE {table}: {(time.perf_counter() - started) * 1000:.0f} ms")
+            time.sleep(STEP_PAUSE_SECONDS)
+        conn.execute("PRAGMA optimize")
+        print("  PRAGMA optimize")
+    finally:
+        conn.close()
+
+
+def vacuum(path: str, step_pages: int = VACUUM_STEP_PAGES) -> int:
+    """Libera las páginas vacías por lotes. Devuelve cuántas se liberaron."""
+    conn = _connect(path)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            print("  auto_vacuum pasa a INCREMENTAL: VACUUM completo (una sola vez)")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return 0
+        freed = 0
+        while True:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages == 0:
+                break
+            conn.execute(f"PRAGMA incremental_vacuum({step_pages})")
+            freed += min(step_pages, free_pages)
+            time.sleep(STEP_PAUSE_SECONDS)
+        print(f"  Páginas liberadas: {freed}")
+        return freed
+    finally:
+        conn.close()
+
+
+def table_sizes(path: str) -> list:
+    """[(nombre, tipo, tabla, bytes)] ordenado de mayor a menor."""
+    conn = _connect(path)
+    try:
+        objects = {
+            name: (kind, table)
+            for kind, name, table in conn.execute("SELECT type, name, tbl_name FROM sqlite_master")
+        }
+        try:
+            sizes = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+        except sqlite3.OperationalError:
+            raise SystemExit("Esta versión de SQLite no incluye la tabla virtual dbstat")
+    finally:
+        conn.close()
+    rows = [(name, *objects.get(name, ("table", name)), size) for name, size in sizes]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def print_stats(path: str) -> None:
+    conn = _connect(path)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"  Fichero: {page_count * page_size / 1024:.0f} KiB "
+          f"({free_pages} páginas libres de {page_count}, {page_size} B/página)")
+    rows = [
+        (name if kind == "table" else f"{name} ({table})", kind, size)
+        for name, kind, table, size in table_sizes(path)
+    ]
+    width = max(len(label) for label, _, _ in rows) + 2
+    print(f"  {'objeto':<{width}}{'tipo':<7}{'KiB':>10}")
+    for label, kind, size in rows:
+        print(f"  {label:<{width}}{kind:<7}{size / 1024:>10.0f}")
+
+
+def backup_database(source_path: str, target_path: str, step_pages: int = BACKUP_STEP_PAGES,
+                    pause: float = STEP_PAUSE_SECONDS, verbose: bool = False) -> None:
+    """Copia consistente en caliente. Entre pasos la base queda libre para
+    escribir; si otro proceso escribe, SQLite reinicia la copia para que el
+    resultado corresponda a un único instante."""
+    def progress(status, remaining, total):
+        if verbose:
+            print(f"\r  {total - remaining}/{total} páginas", end="", flush=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+    source = _connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=step_pages, progress=progress, sleep=pause)
+    finally:
+        target.close()
+        source.close()
+    if verbose:
+        print()
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base SQLite de Neocare")
+    parser.add_argument("command", nargs="?", default="all", choices=("all", "analyze", "vacuum", "stats", "backup"))
+    parser.add_argument("--database", default=default_database_path())
+    parser.add_argument("--pages", type=int, help="Páginas por paso (vacuum y backup)")
+    parser.add_argument("--output", help="Fichero de la copia (backup)")
+    args = parser.parse_args(argv)
+    # Sin esto se mantendría en silencio un neocare.db que la API no usa
+    if args.database is None:
+        parser.error("DATABASE_URL no apunta a una base SQLite: indica el fichero con --database")
+
+    if args.command == "backup":
+        output = args.output or os.path.join(
+            BACKUP_DIR, f"neocare-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.db"
+        )
+        started = time.perf_counter()
+        backup_database(args.database, output, args.pages or BACKUP_STEP_PAGES, verbose=True)
+        print(f"Copia guardada en {output} ({time.perf_counter() - started:.1f} s)")
+        return
+    if args.command in ("all", "analyze"):
+        print("Estadísticas del planificador:")
+        analyze(args.database)
+    if args.command in ("all", "vacuum"):
+        print("Vacuum incremental:")
+        vacuum(args.database, args.pages or VACUUM_STEP_PAGES)
+    if args.command in ("all", "stats"):
+        print("Tamaños:")
+        print_stats(args.database)
+
+
+if __name__ == "__main__":
+    main()
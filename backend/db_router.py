@@ -0,0 +1,118 @@
+# db_router.py - Enrutado de las lecturas a la réplica
+"""Los endpoints de solo lectura (informes, listados, búsqueda) usan
+``get_read_db`` en lugar de ``get_db``. Si hay réplica (``DATABASE_REPLICA_URL``)
+la sesión se abre contra ella, salvo que:
+
+- el usuario haya escrito hace menos de ``READ_YOUR_WRITES_SECONDS``: así ve
+  sus propios cambios aunque la réplica vaya con retraso. Lo marca
+  ``ReadYourWritesMiddleware`` con una cookie (válida entre workers) y, para
+  clientes sin cookies, por usuario en memoria;
+- la réplica haya fallado hace menos de ``REPLICA_RETRY_SECONDS``: las
+  lecturas vuelven al primario hasta el siguiente intento.
+
+Sin réplica configurada, ``get_read_db`` equivale a ``get_db``. Esos endpoints
+autentican con ``get_current_read_user``, que reutiliza la misma sesión.
+"""
+import threading
+import time
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+
+from auth_handler import user_id_from_authorization
+from config import READ_YOUR_WRITES_SECONDS, REPLICA_RETRY_SECONDS
+from database import ReadSessionLocal, SessionLocal
+from metrics import DB_READ_ROUTING
+
+LAST_WRITE_COOKIE = "neocare_last_write"
+_MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Login y registro no cambian nada que el usuario vaya a leer después
+_NO_WRITE_PREFIXES = ("/api/auth/",)
+
+_last_write_by_user: dict = {}
+_lock = threading.Lock()
+_replica_down_until = 0.0
+
+
+def mark_write(user_id: int) -> None:
+    with _lock:
+        _last_write_by_user[user_id] = time.monotonic()
+
+
+def _recently_wrote(request: Request) -> bool:
+    if LAST_WRITE_COOKIE in request.cookies:
+        return True
+    user_id = user_id_from_authorization(request.headers.get("authorization", ""))
+    if user_id is None:
+        return False
+    with _lock:
+        last_write = _last_write_by_user.get(user_id)
+    return last_write is not None and time.monotonic() - last_write < READ_YOUR_WRITES_SECONDS
+
+
+def _mark_replica_down() -> None:
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+def _open_read_session(request: Request):
+    """Devuelve (sesión, destino, motivo)."""
+    if ReadSessionLocal is None:
+        return SessionLocal(), "primary", "no_replica"
+    if time.monotonic() < _replica_down_until:
+        return SessionLocal(), "primary", "replica_down"
+    if _recently_wrote(request):
+        return SessionLocal(), "primary", "read_your_writes"
+
+    db = ReadSessionLocal()
+    try:
+        db.connection()  # pool_pre_ping valida la conexión aquí
+    except DBAPIError:
+        db.close()
+        _mark_replica_down()
+        return SessionLocal(), "primary", "replica_error"
+    return db, "replica", "read_only"
+
+
+def get_read_db(request: Request):
+    db, target, reason = _open_read_session(request)
+    DB_READ_ROUTING.inc((target, reason))
+    try:
+        yield db
+    except DBAPIError:
+        # Si la réplica falla a mitad de petición, las siguientes van al primario
+        if target == "replica":
+            _mark_replica_down()
+        raise
+    finally:
+        db.close()
+
+
+class ReadYourWritesMiddleware:
+    """Middleware ASGI que marca a los usuarios que acaban de escribir."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] not in _MUTATING_METHODS
+                or scope["path"].startswith(_NO_WRITE_PREFIXES)):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = dict(scope["headers"])
+                user_id = user_id_from_authorization(headers.get(b"authorization", b"").decode("latin-1"))
+                if user_id is not None:
+                    mark_write(user_id)
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}=1; Max-Age={int(READ_YOUR_WRITES_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode("latin-1"))
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
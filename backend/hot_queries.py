@@ -0,0 +1,127 @@
+# hot_queries.py - Consultas del camino caliente (propiedad y búsquedas por clave)
+"""Las comprobaciones de propiedad se ejecutan en casi todas las peticiones.
+En lugar de construir un ``Query`` del ORM en cada llamada, aquí las sentencias
+se construyen una sola vez al importar el módulo, con parámetros ``bindparam``.
+La caché de compilación de SQLAlchemy ya evitaba recompilar el SQL; lo que se
+ahorra es montar el ``Query`` y sus expresiones y, en las variantes Core,
+cargar entidades del ORM.
+
+Cuando el llamador solo necesita saber si existe (y algún id), la consulta se
+ejecuta en Core sobre la conexión de la sesión y devuelve un registro ligero con
+``__slots__`` en lugar de una entidad del ORM. Ojo: por esa vía la sesión no
+hace autoflush, así que no verá objetos añadidos y aún no enviados.
+
+``owned_board`` además guarda los tableros en una caché del proceso que el bus
+de invalidación (cache_bus.py) mantiene al día entre workers.
+"""
+from typing import Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from cache_bus import BusCache, has_pending
+from database import engine
+from models import Board, Card, List as ListModel, User
+
+
+class _Record:
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class BoardRef(_Record):
+    __slots__ = ("id", "title", "user_id", "version")
+
+
+class ListRef(_Record):
+    __slots__ = ("id", "board_id")
+
+
+class CardRef(_Record):
+    __slots__ = ("id", "list_id", "board_id")
+
+
+class UserCredentials(_Record):
+    __slots__ = ("id", "email", "hashed_password", "is_active")
+
+
+# --- Sentencias construidas una vez al importar ---
+
+_BOARD_BY_ID = select(Board.id, Board.title, Board.user_id, Board.version).where(
+    Board.id == bindparam("board_id")
+)
+_OWNED_LIST = (
+    select(ListModel.id, ListModel.board_id)
+    .join(Board, Board.id == ListModel.board_id)
+    .where(ListModel.id == bindparam("list_id"), Board.user_id == bindparam("user_id"))
+)
+_OWNED_CARD = (
+    select(Card.id, Card.list_id, ListModel.board_id)
+    .join(ListModel, ListModel.id == Card.list_id)
+    .join(Board, Board.id == ListModel.board_id)
+    .where(Card.id == bindparam("card_id"), Board.user_id == bindparam("user_id"))
+)
+_USER_BY_EMAIL = (
+    select(User.id, User.email, User.hashed_password, User.is_active)
+    .where(User.email == bindparam("email"))
+    .limit(1)
+)
+
+# Variantes que devuelven la entidad, para quien la va a modificar o serializar
+# (al escribir, el versionado de board_sync.py la encuentra ya en la sesión)
+BOARD_ENTITY_BY_OWNER = select(Board).where(
+    Board.id == bindparam("board_id"), Board.user_id == bindparam("user_id")
+)
+LIST_ENTITY_BY_OWNER = (
+    select(ListModel)
+    .join(Board, Board.id == ListModel.board_id)
+    .where(ListModel.id == bindparam("list_id"), Board.user_id == bindparam("user_id"))
+)
+CARD_ENTITY_BY_OWNER = (
+    select(Card)
+    .join(ListModel, ListModel.id == Card.list_id)
+    .join(Board, Board.id == ListModel.board_id)
+    .where(Card.id == bindparam("card_id"), Board.user_id == bindparam("user_id"))
+)
+USER_ENTITY_BY_EMAIL = select(User).where(User.email == bindparam("email")).limit(1)
+
+
+def _first(db: Session, statement, params: dict, record: type):
+    row = db.connection().execute(statement, params).first()
+    return record(*row) if row is not None else None
+
+
+# Tablero -> (id, título, dueño, versión). Cualquier cambio del tablero pasa por
+# touch_board, que publica ``board:<id>`` en el bus y vacía la entrada.
+_board_cache = BusCache("board", "board")
+
+
+def owned_board(db: Session, board_id: int, user_id: int) -> Optional[BoardRef]:
+    row = _board_cache.get_or_load(
+        board_id,
+        lambda: db.connection().execute(_BOARD_BY_ID, {"board_id": board_id}).first(),
+        # Ni lecturas de la réplica (pueden ir con retraso) ni datos sin confirmar
+        cacheable=db.get_bind() is engine and not has_pending(db),
+    )
+    if row is None or row[2] != user_id:
+        return None
+    return BoardRef(*row)
+
+
+def owned_list(db: Session, list_id: int, user_id: int) -> Optional[ListRef]:
+    return _first(db, _OWNED_LIST, {"list_id": list_id, "user_id": user_id}, ListRef)
+
+
+def owned_card(db: Session, card_id: int, user_id: int) -> Optional[CardRef]:
+    return _first(db, _OWNED_CARD, {"card_id": card_id, "user_id": user_id}, CardRef)
+
+
+def user_credentials(db: Session, email: str) -> Optional[UserCredentials]:
+    return _first(db, _USER_BY_EMAIL, {"email": email}, UserCredentials)
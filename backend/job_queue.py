@@ -0,0 +1,280 @@
+# job_queue.py - Cola de trabajos persistente en la base de datos
+"""El trabajo pesado (purgar tableros grandes, archivar, reconstruir el
+historial) no se ejecuta en el proceso de la API sino en la tabla ``jobs``:
+
+- ``enqueue`` añade el trabajo en la misma transacción que el cambio que lo
+  origina, así que nunca se pierde aunque el proceso muera justo después.
+- ``job_worker.py`` reclama trabajos con un UPDATE condicional (solo uno de los
+  workers gana cada fila) y los ejecuta en un pool de procesos.
+- Cada trabajo en curso tiene un lease (``locked_until``) que se renueva al
+  informar del progreso; si el worker cae, al caducar vuelve a la cola.
+- Los fallos se reintentan con espera exponencial hasta ``max_attempts``.
+
+El estado y el progreso se consultan en ``/api/jobs``.
+"""
+import json
+import os
+import socket
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import JOB_LEASE_SECONDS, JOB_RETRY_BASE_SECONDS
+from database import SessionLocal
+from models import Job
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+ABANDONED_ERROR = "El worker dejó de responder en el último intento"
+
+# Tipo de trabajo -> función(payload, progress) que devuelve un dict opcional
+_HANDLERS: Dict[str, Callable] = {}
+
+
+def job_handler(kind: str):
+    """Registra la función que ejecuta los trabajos de tipo ``kind``."""
+    def decorator(func):
+        _HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    user_id: Optional[int] = None,
+    priority: int = 0,
+    max_attempts: int = 3,
+    run_after: Optional[datetime] = None,
+    unique_key: Optional[str] = None,
+) -> Optional[Job]:
+    """Añade un trabajo a la cola (sin commit: va en la transacción del llamador).
+
+    Con ``unique_key`` devuelve None si ese trabajo ya estaba encolado.
+    """
+    if kind not in _HANDLERS:
+        raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+    if unique_key is not None:
+        if db.execute(select(Job.id).where(Job.unique_key == unique_key)).first() is not None:
+            return None
+    job = Job(
+        kind=kind,
+        unique_key=unique_key,
+        payload=json.dumps(payload or {}),
+        user_id=user_id,
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=run_after or datetime.utcnow(),
+    )
+    try:
+        # Savepoint: si otro proceso lo encoló a la vez, no se pierde la transacción
+        with db.begin_nested():
+            db.add(job)
+    except IntegrityError:
+        return None
+    return job
+
+
+def _fail_abandoned(db: Session, now: datetime) -> None:
+    """Da por fallidos los trabajos cuyo worker cayó en el último intento."""
+    abandoned = (
+        (Job.status == RUNNING) & (Job.locked_until < now) & (Job.attempts >= Job.max_attempts)
+    )
+    # Primero se lee: en SQLite un UPDATE bloquea la base aunque no cambie nada
+    if db.execute(select(Job.id).where(abandoned).limit(1)).first() is None:
+        return
+    db.execute(
+        update(Job).where(abandoned).values(
+            status=FAILED,
+            locked_by=None,
+            locked_until=None,
+            error=ABANDONED_ERROR,
+            finished_at=now,
+        )
+    )
+    db.commit()
+
+
+def claim_next(db: Session, owner: str) -> Optional[int]:
+    """Reclama el siguiente trabajo listo (o uno con el lease caducado)."""
+    _fail_abandoned(db, datetime.utcnow())
+    while True:
+        now = datetime.utcnow()
+        ready = or_(
+            (Job.status == QUEUED) & (Job.run_after <= now),
+            (Job.status == RUNNING) & (Job.locked_until < now) & (Job.attempts < Job.max_attempts),
+        )
+        job_id = db.execute(
+            select(Job.id).where(ready)
+            .order_by(Job.priority.desc(), Job.run_after, Job.id)
+            .limit(1)
+        ).scalar_one_or_none()
+        if job_id is None:
+            return None
+        # Si otro worker lo reclamó entre el SELECT y el UPDATE, no cambia ninguna fila
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, ready)
+            .values(
+                status=RUNNING,
+                locked_by=owner,
+                locked_until=now + timedelta(seconds=JOB_LEASE_SECONDS),
+                attempts=Job.attempts + 1,
+                started_at=now,
+            )
+        ).rowcount
+        db.commit()
+        if claimed == 1:
+            return job_id
+
+
+def set_progress(db: Session, job_id: int, owner: str, progress: float, message: Optional[str] = None) -> None:
+    """Guarda el progreso y renueva el lease del trabajo."""
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == owner, Job.status == RUNNING)
+        .values(
+            progress=progress,
+            progress_message=message,
+            locked_until=datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS),
+        )
+    )
+    db.commit()
+
+
+def _finish(db: Session, job_id: int, owner: str, **values) -> None:
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == owner)
+        .values(locked_by=None, locked_until=None, **values)
+    )
+    db.commit()
+
+
+def run_job(job_id: int) -> str:
+    """Ejecuta un trabajo ya reclamado. Pensado para el proceso hijo del worker."""
+    owner = worker_id()
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if job is None or job.status != RUNNING:
+            return "skipped"
+        # El proceso padre reclamó el trabajo; el hijo pasa a ser su dueño
+        db.execute(update(Job).where(Job.id == job_id).values(locked_by=owner))
+        db.commit()
+        kind, payload, attempts, max_attempts = job.kind, json.loads(job.payload), job.attempts, job.max_attempts
+
+        def progress(value: float, message: Optional[str] = None) -> None:
+            set_progress(db, job_id, owner, value, message)
+
+        try:
+            handler = _HANDLERS.get(kind)
+            if handler is None:
+                raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+            result = handler(payload, progress)
+        except Exception:
+            db.rollback()
+            # Se guarda completo para depurar; /api/jobs solo muestra la última línea
+            error = traceback.format_exc(limit=5)
+            if attempts >= max_attempts:
+                _finish(db, job_id, owner, status=FAILED, error=error, finished_at=datetime.utcnow())
+                return FAILED
+            delay = JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+            _finish(db, job_id, owner, status=QUEUED, error=error,
+                    run_after=datetime.utcnow() + timedelta(seconds=delay))
+            return QUEUED
+
+        _finish(
+            db, job_id, owner,
+            status=SUCCEEDED, progress=1.0, error=None, finished_at=datetime.utcnow(),
+            result=json.dumps(result) if result is not None else None,
+        )
+        return SUCCEEDED
+    finally:
+        db.close()
+
+
+# --- Trabajos disponibles ---
+
+@job_handler("purge_board")
+def _purge_board_job(payload: dict, progress) -> None:
+    from board_purge import purge_board
+
+    purge_board(payload["board_id"], progress)
+
+
+@job_handler("archive_cards")
+def _archive_cards_job(payload: dict, progress) -> dict:
+    from card_archive import archive_completed_cards
+    from config import ARCHIVE_AFTER_DAYS
+
+    db = SessionLocal()
+    try:
+        return {"archived": archive_completed_cards(db, payload.get("days", ARCHIVE_AFTER_DAYS))}
+    finally:
+        db.close()
+
+
+@job_handler("backfill_activity")
+def _backfill_activity_job(payload: dict, progress) -> dict:
+    from card_activity import backfill_activity
+
+    db = SessionLocal()
+    try:
+        return {"events": backfill_activity(db)}
+    finally:
+        db.close()
+
+
+@job_handler("weekly_reports")
+def _weekly_reports_job(payload: dict, progress) -> dict:
+    from report_snapshots import enqueue_snapshot_batches
+
+    db = SessionLocal()
+    try:
+        return {"batches": enqueue_snapshot_batches(db, payload["week"])}
+    finally:
+        db.close()
+
+
+@job_handler("report_snapshots")
+def _report_snapshots_job(payload: dict, progress) -> dict:
+    from report_snapshots import snapshot_boards
+
+    db = SessionLocal()
+    try:
+        return {"snapshots": snapshot_boards(db, payload["week"], payload["board_ids"], progress)}
+    finally:
+        db.close()
+
+
+@job_handler("import_board")
+def _import_board_job(payload: dict, progress) -> dict:
+    from board_import import import_file
+
+    db = SessionLocal()
+    # En SQLite la importación tiene la base bloqueada para escribir hasta el
+    # commit: el progreso intermedio no se podría guardar desde otra conexión
+    if db.get_bind().dialect.name == "sqlite":
+        progress = None
+    try:
+        return import_file(
+            db, payload["path"], payload["format"], payload["user_id"], payload.get("title"), progress
+        )
+    finally:
+        db.close()
+        # Un solo intento (ver board_router.import_board): el fichero ya no hace falta
+        if os.path.exists(payload["path"]):
+            os.remove(payload["path"])
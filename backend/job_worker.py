@@ -0,0 +1,106 @@
+# job_worker.py - Worker de la cola de trabajos
+"""Reclama trabajos de la tabla ``jobs`` y los ejecuta en un pool de procesos,
+fuera del proceso de la API. Se pueden lanzar varios workers a la vez: cada
+trabajo lo reclama uno solo. También encola los informes de cada semana que se
+cierra (report_snapshots.py), poda ``cache_invalidations`` (cache_bus.py) y,
+con timesheets particionada, crea las particiones de los próximos meses
+(timesheet_partitions.py).
+
+Uso (desde backend/)::
+
+    python job_worker.py                  # 2 procesos, en bucle
+    python job_worker.py --processes 4
+    python job_worker.py --once           # vacía la cola y termina
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from cache_bus import prune_invalidations
+from config import CACHE_BUS_ENABLED, JOB_POLL_SECONDS
+from database import SessionLocal, engine
+from job_queue import claim_next, run_job, worker_id
+from report_snapshots import schedule_weekly_reports
+from timesheet_partitions import ensure_partitions
+
+SCHEDULE_EVERY_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+def _init_child() -> None:
+    # Las conexiones heredadas del padre no se pueden compartir entre procesos
+    engine.dispose(close=False)
+
+
+def _new_pool(processes: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=processes, initializer=_init_child)
+
+
+def _collect(done) -> bool:
+    """Registra el fallo de cada trabajo terminado; devuelve True si el pool se rompió."""
+    broken = False
+    for future in done:
+        try:
+            future.result()
+        except BrokenProcessPool:
+            broken = True
+            logger.exception("Pool de procesos roto; se crea uno nuevo")
+        except Exception:
+            # p. ej. un error de base de datos al guardar el resultado: el lease
+            # caduca y claim_next lo reintenta
+            logger.exception("Trabajo terminado con error; el worker sigue")
+    return broken
+
+
+def run_worker(processes: int, once: bool = False) -> None:
+    owner = worker_id()
+    running = set()
+    next_schedule = 0.0
+    pool = _new_pool(processes)
+    try:
+        while True:
+            db = SessionLocal()
+            try:
+                if time.monotonic() >= next_schedule:
+                    # Informes de las semanas cerradas pendientes (idempotente)
+                    schedule_weekly_reports(db)
+                    # Sin API escuchando, nadie más vaciaría la tabla del bus
+                    if CACHE_BUS_ENABLED and engine.dialect.name != "postgresql":
+                        with engine.begin() as conn:
+                            prune_invalidations(conn)
+                    # Sin particionar (o fuera de PostgreSQL) no hace nada
+                    if engine.dialect.name == "postgresql":
+                        with engine.begin() as conn:
+                            ensure_partitions(conn)
+                    next_schedule = time.monotonic() + SCHEDULE_EVERY_SECONDS
+                while len(running) < processes:
+                    job_id = claim_next(db, owner)
+                    if job_id is None:
+                        break
+                    running.add(pool.submit(run_job, job_id))
+            finally:
+                db.close()
+
+            if running:
+                done, running = wait(running, timeout=JOB_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                if _collect(done):
+                    # Los demás trabajos del pool roto también se han perdido
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool, running = _new_pool(processes), set()
+            elif once:
+                return
+            else:
+                time.sleep(JOB_POLL_SECONDS)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ejecuta los trabajos en cola de Neocare")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--once", action="store_true", help="Termina cuando no quedan trabajos")
+    args = parser.parse_args()
+    run_worker(args.processes, args.once)
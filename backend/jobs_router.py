@@ -0,0 +1,41 @@
+# jobs_router.py - Estado de los trabajos en segundo plano
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import Job, User
+from schemas import Job as JobSchema
+from auth_router import get_current_user
+
+router = APIRouter(tags=["Jobs"])
+
+RECENT_JOBS_LIMIT = 50
+
+
+# El progreso cambia continuamente: se lee siempre del primario, no de la réplica
+@router.get("/", response_model=List[JobSchema])
+async def list_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Últimos trabajos lanzados por el usuario."""
+    return (
+        db.query(Job)
+        .filter(Job.user_id == current_user.id)
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(RECENT_JOBS_LIMIT)
+        .all()
+    )
+
+
+@router.get("/{job_id}", response_model=JobSchema)
+async def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+    return job
@@ -3,15 +3,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from database import get_db
+from db_router import get_read_db
 from models import User, List as ListModel  # ✅ Importamos el modelo de la base de datos
 from schemas import ListModel as ListSchema, ListCreate
-from auth_router import get_current_user
+from auth_router import get_current_read_user, get_current_user
 from crud import (
     create_list as crud_create_list,
     get_lists_by_board as crud_get_lists_by_board,
     delete_list as crud_delete_list,
-    get_board_by_id_and_user # ✅ Importamos la validación de dueño
 )
+from hot_queries import owned_board  # ✅ Validación de dueño sin cargar el tablero
 
 router = APIRouter(tags=["lists"])
 
@@ -19,8 +20,8 @@ router = APIRouter(tags=["lists"])
 @router.get("/by-board/{board_id}", response_model=ListType[ListSchema])
 async def list_lists_for_board(
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     lists = crud_get_lists_by_board(db, board_id, current_user.id)
     return lists
@@ -55,8 +56,7 @@ async def update_list(
         raise HTTPException(status_code=404, detail="Lista no encontrada")
 
     # 2. Verificar que el tablero pertenece al usuario
-    board = get_board_by_id_and_user(db, db_list.board_id, current_user.id)
-    if not board:
+    if owned_board(db, db_list.board_id, current_user.id) is None:
         raise HTTPException(status_code=403, detail="No tienes permiso")
 
     # 3. Actualizar solo el título si viene en la petición
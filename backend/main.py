@@ -1,23 +1,73 @@
 # main.py - VERSIÓN CORREGIDA
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
-from database import engine, Base, get_db
+from database import engine, Base, get_db, SessionLocal, replica_engine, warm_up_pool
+from config import SQL_PROFILE, POOL_WARMUP_CONNECTIONS, ADMISSION_ENABLED, CACHE_BUS_ENABLED
 import models
+import board_sync  # Registra el versionado de tableros en las sesiones
+import cache_bus
+from metrics import MetricsMiddleware, instrument_engine, render_metrics
+from db_router import ReadYourWritesMiddleware
+from admission import AdmissionMiddleware
 
 # Importaciones desde tus otros archivos
 from auth_router import router as auth_router
-from crud import get_user_by_email
 from board_router import router as board_router
 from list_router import router as list_router
 from card_router import router as card_router
 from timesheet_router import router as timesheet_router
 from report_router import router as report_router
+from jobs_router import router as jobs_router
+import auth_handler
+
+
+# El esquema se gestiona con migraciones (alembic upgrade head); importar este
+# módulo no toca la base de datos.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(warm_up_pool, engine, POOL_WARMUP_CONNECTIONS)
+    if replica_engine is not None:
+        await asyncio.to_thread(warm_up_pool, replica_engine, POOL_WARMUP_CONNECTIONS)
+    # JWT y hashing se importan en segundo plano para no retrasar el arranque
+    warm_up_auth = asyncio.create_task(asyncio.to_thread(auth_handler.warm_up))
+    # Invalidaciones de otros workers (sin bus, las cachés no se usan)
+    if CACHE_BUS_ENABLED:
+        await asyncio.to_thread(cache_bus.start)
+    yield
+    await warm_up_auth
+    cache_bus.stop()
+    engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
-# Crear las tablas de la base de datos
-Base.metadata.create_all(bind=engine)
+# Límites de concurrencia y tasa por clase de endpoint (429/503 rápidos). Va
+# por dentro de las métricas para que los rechazos también se midan.
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
 
-app = FastAPI()
+# Métricas de latencia y consultas SQL por ruta (expuestas en /api/metrics)
+instrument_engine(engine)
+app.add_middleware(MetricsMiddleware)
+
+# Réplica de lectura: tras escribir, las lecturas del usuario van al primario
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Perfilador SQL de desarrollo (N+1 y consultas lentas), desactivado por defecto
+if SQL_PROFILE:
+    import sql_profiler
+
+    sql_profiler.install(engine, SessionLocal)
+    app.add_middleware(sql_profiler.ProfilerMiddleware)
 
 # Configuración de CORS
 app.add_middleware(
@@ -36,6 +86,7 @@ app.include_router(list_router, prefix="/api/lists", tags=["Listas"])
 app.include_router(card_router, prefix="/api/cards", tags=["Tarjetas"])
 app.include_router(timesheet_router, prefix="/api/timesheets", tags=["Timesheets"])
 app.include_router(report_router)
+app.include_router(jobs_router, prefix="/api/jobs", tags=["Jobs"])
 
 @app.get("/api/health")
 async def health_check():
@@ -43,4 +94,9 @@ async def health_check():
         "status": "OK",
         "service": "FastAPI Backend",
         "version": "1.0.0"
-    }
\ No newline at end of file
+    }
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas en formato de texto de Prometheus."""
+    return PlainTextResponse(render_metrics(engine), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,267 @@
+# metrics.py - Métricas de latencia por ruta y de base de datos (formato Prometheus)
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Histograma acumulativo al estilo Prometheus, con etiquetas."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        # etiquetas -> [conteo por bucket..., +Inf, suma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base.rstrip(',')}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base.rstrip(',')}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels).rstrip(',')}}} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    return "".join(f'{name}="{value}",' for name, value in zip(names, values))
+
+
+REQUEST_LATENCY = Histogram(
+    "neocare_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta.",
+    LATENCY_BUCKETS,
+    ("method", "route"),
+)
+REQUESTS_TOTAL = Counter(
+    "neocare_http_requests_total",
+    "Peticiones HTTP atendidas por ruta y código de estado.",
+    ("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "neocare_request_db_queries",
+    "Sentencias SQL ejecutadas por petición.",
+    QUERY_COUNT_BUCKETS,
+    ("method", "route"),
+)
+REQUEST_DB_TIME = Histogram(
+    "neocare_request_db_duration_seconds",
+    "Tiempo total en base de datos por petición.",
+    LATENCY_BUCKETS,
+    ("method", "route"),
+)
+DB_READ_ROUTING = Counter(
+    "neocare_db_read_routing_total",
+    "Sesiones de solo lectura por destino (replica/primary) y motivo.",
+    ("target", "reason"),
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "neocare_admission_in_flight",
+    "Peticiones en ejecución por clase de endpoint.",
+    ("endpoint_class",),
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "neocare_admission_queue_depth",
+    "Peticiones esperando turno por clase de endpoint.",
+    ("endpoint_class",),
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "neocare_admission_queue_wait_seconds",
+    "Tiempo de espera en cola antes de ejecutar la petición.",
+    LATENCY_BUCKETS,
+    ("endpoint_class",),
+)
+ADMISSION_REJECTED = Counter(
+    "neocare_admission_rejected_total",
+    "Peticiones rechazadas por límite de tasa (429) o por cola llena o agotada (503).",
+    ("endpoint_class", "reason"),
+)
+REPORT_COALESCING = Counter(
+    "neocare_report_coalescing_total",
+    "Peticiones de informe por resultado: calculadas (leader) o compartidas.",
+    ("endpoint", "outcome"),
+)
+REPORT_SNAPSHOTS = Counter(
+    "neocare_report_snapshots_total",
+    "Informes de semanas cerradas servidos desde snapshot (hit) o calculados (miss).",
+    ("endpoint", "outcome"),
+)
+CACHE_INVALIDATIONS = Counter(
+    "neocare_cache_invalidations_total",
+    "Invalidaciones recibidas por tema: del propio proceso (local) o de otros workers (remote).",
+    ("topic", "source"),
+)
+CACHE_LOOKUPS = Counter(
+    "neocare_cache_lookups_total",
+    "Consultas a cachés en memoria invalidadas por el bus.",
+    ("cache", "outcome"),
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+# Estadísticas de la petición en curso. Es un objeto mutable para que los
+# endpoints síncronos (que corren en el threadpool con una copia del contexto)
+# sumen sobre la misma instancia que ve el middleware.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((context, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["query_start"].pop()
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # Si la sentencia falla no hay after_cursor_execute: se retira su inicio de la pila
+    conn = exception_context.connection
+    if conn is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra los hooks de SQLAlchemy que cuentan consultas y tiempo en BD."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide latencia y consultas SQL por ruta."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            # Usamos la plantilla de la ruta (/api/cards/{card_id}) para no
+            # crear una serie por cada id.
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            REQUEST_LATENCY.observe(labels, elapsed)
+            REQUESTS_TOTAL.inc(labels + (str(status_code[0]),))
+            REQUEST_DB_QUERIES.observe(labels, stats.queries)
+            REQUEST_DB_TIME.observe(labels, stats.db_time)
+
+
+def _pool_lines(engine: Engine) -> list:
+    pool = engine.pool
+    gauges = {
+        "neocare_db_pool_size": ("Tamaño configurado del pool.", getattr(pool, "size", None)),
+        "neocare_db_pool_checked_out": ("Conexiones en uso.", getattr(pool, "checkedout", None)),
+        "neocare_db_pool_checked_in": ("Conexiones libres en el pool.", getattr(pool, "checkedin", None)),
+        "neocare_db_pool_overflow": ("Conexiones por encima del tamaño del pool.", getattr(pool, "overflow", None)),
+    }
+    lines = []
+    for name, (help_text, getter) in gauges.items():
+        if getter is None:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {getter()}")
+    return lines
+
+
+def render_metrics(engine: Engine) -> str:
+    lines = []
+    for metric in (REQUESTS_TOTAL, REQUEST_LATENCY, REQUEST_DB_QUERIES, REQUEST_DB_TIME, DB_READ_ROUTING,
+                   REPORT_COALESCING, ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_QUEUE_WAIT,
+                   ADMISSION_REJECTED, REPORT_SNAPSHOTS, CACHE_INVALIDATIONS, CACHE_LOOKUPS):
+        lines.extend(metric.render())
+    lines.extend(_pool_lines(engine))
+    return "\n".join(lines) + "\n"
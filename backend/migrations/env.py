@@ -0,0 +1,63 @@
+# migrations/env.py - Entorno de Alembic
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import SQLALCHEMY_DATABASE_URL, Base, engine
+import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        # SQLite no soporta la mayoría de ALTER TABLE: se recrea la tabla por lotes
+        render_as_batch=SQLALCHEMY_DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # Quien ya tiene una conexión abierta (p. ej. las pruebas) la pasa aquí
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+    with engine.connect() as connection:
+        if connection.dialect.name != "sqlite":
+            _run_migrations(connection)
+            return
+        # Las migraciones por lotes recrean tablas: con las claves foráneas
+        # activas, borrar la tabla antigua dispararía sus ON DELETE CASCADE
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        connection.commit()
+        try:
+            _run_migrations(connection)
+        finally:
+            connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+            connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,60 @@
+"""ON DELETE CASCADE en las claves foráneas y borrado diferido de tableros
+
+Las claves de listas, tarjetas, horas, etiquetas y subtareas se recrean con
+ON DELETE CASCADE (board_purge.py borra con sentencias por conjuntos y el ORM
+ya no carga los hijos). En SQLite se recrean las tablas por lotes.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:22:50.544153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla, columna, tabla referida) de las claves que pasan a ON DELETE CASCADE
+_CASCADES = (
+    ("lists", "board_id", "boards"),
+    ("cards", "list_id", "lists"),
+    ("timesheets", "card_id", "cards"),
+    ("labels", "card_id", "cards"),
+    ("subtasks", "card_id", "cards"),
+)
+# Las claves del esquema inicial no tienen nombre: PostgreSQL las llama
+# <tabla>_<columna>_fkey y en SQLite se les da ese mismo nombre al recrear la tabla.
+_NAMING = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _rebuild_foreign_keys(ondelete) -> None:
+    for table, column, referred in _CASCADES:
+        name = f"{table}_{column}_fkey"
+        with op.batch_alter_table(table, naming_convention=_NAMING) as batch_op:
+            batch_op.drop_constraint(name, type_="foreignkey")
+            batch_op.create_foreign_key(name, referred, [column], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('boards', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_boards_deleted_at'), ['deleted_at'], unique=False)
+
+    _rebuild_foreign_keys("CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild_foreign_keys(None)
+
+    with op.batch_alter_table('boards', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_boards_deleted_at'))
+        batch_op.drop_column('deleted_at')
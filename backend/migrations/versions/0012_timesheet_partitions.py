@@ -0,0 +1,28 @@
+"""Particionado mensual de timesheets (sin cambios de esquema)
+
+El particionado no depende de una variable de entorno al migrar: es una
+operación de PostgreSQL que se lanza aparte, sobre la tabla ya migrada, con
+``python timesheet_partitions.py convert`` (y ``revert`` para deshacerla).
+Esta revisión se conserva para no romper la cadena de migraciones.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 12:20:41.308215
+
+"""
+from typing import Sequence, Union
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, Sequence[str], None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
@@ -0,0 +1,40 @@
+"""AUTOINCREMENT en cache_invalidations (SQLite)
+
+Sin AUTOINCREMENT, SQLite reutiliza ids cuando la poda vacía la tabla y los
+oyentes (que leen ``id > último visto``) se saltaban las invalidaciones nuevas.
+La tabla se recrea conservando sus filas; en el resto de bases no cambia nada.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19 13:05:12.418307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0016'
+down_revision: Union[str, Sequence[str], None] = '0015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate(autoincrement: bool) -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table(
+        'cache_invalidations', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}
+    ):
+        pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate(autoincrement=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate(autoincrement=False)
@@ -1,5 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, Date
+from sqlalchemy import (
+    Column, Integer, String, Boolean, ForeignKey, DateTime, Float, Date, Index, LargeBinary, UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -20,65 +22,97 @@ class Board(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    # Versión monotónica del tablero: se incrementa en cada transacción que
+    # modifica algo del tablero (ver board_sync.py).
+    version = Column(Integer, default=0, nullable=False)
+    # Tableros grandes: se desvinculan del usuario y se purgan en segundo plano
+    deleted_at = Column(DateTime, nullable=True, index=True)
     owner = relationship("User", back_populates="boards")
-    lists = relationship("List", back_populates="board")
+    lists = relationship(
+        "List", back_populates="board", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 class List(Base):
     __tablename__ = "lists"
+    __table_args__ = (Index("ix_lists_board_version", "board_id", "version"),)
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    board_id = Column(Integer, ForeignKey("boards.id"))
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"))
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     board = relationship("Board", back_populates="lists")
     cards = relationship(
         "Card",
         back_populates="list_ref",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="Card.order",
     )
 
 
 class Card(Base):
     __tablename__ = "cards"
+    __table_args__ = (
+        Index("ix_cards_list_version", "list_id", "version"),
+        # Agenda y "mi trabajo" entre tableros, con el id como desempate del cursor
+        Index("ix_cards_user_due", "user_id", "due_date", "id"),
+        Index("ix_cards_user_completed", "user_id", "completed", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
     due_date = Column(DateTime, nullable=True)
     order = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    list_id = Column(Integer, ForeignKey("lists.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = Column(Integer, default=0, nullable=False)
+    list_id = Column(Integer, ForeignKey("lists.id", ondelete="CASCADE"))
     list_ref = relationship("List", back_populates="cards")
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User")
     # Relación para horas
     timesheets = relationship(
-        "Timesheet", back_populates="card", cascade="all, delete-orphan"
+        "Timesheet", back_populates="card", cascade="all, delete-orphan", passive_deletes=True
     )
 
     # Estado de la tarjeta
     completed = Column(Boolean, default=False)
     overdue = Column(Boolean, default=False)
 
+    # Contadores desnormalizados (card_counters.py)
+    total_hours = Column(Float, default=0, server_default="0", nullable=False)
+    subtasks_total = Column(Integer, default=0, server_default="0", nullable=False)
+    subtasks_done = Column(Integer, default=0, server_default="0", nullable=False)
+    labels_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Semana 6: etiquetas y subtareas
     labels = relationship(
-        "Label", back_populates="card", cascade="all, delete-orphan"
+        "Label", back_populates="card", cascade="all, delete-orphan", passive_deletes=True
     )
     subtasks = relationship(
-        "Subtask", back_populates="card", cascade="all, delete-orphan"
+        "Subtask", back_populates="card", cascade="all, delete-orphan", passive_deletes=True
     )
 
 
 class Timesheet(Base):
     __tablename__ = "timesheets"
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        Index("ix_timesheets_card_version", "card_id", "version"),
+        # Celda (usuario, tarjeta, día): una sola fila, escrita con ON CONFLICT
+        UniqueConstraint("user_id", "card_id", "date", name="uq_timesheets_user_card_date"),
+    )
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     description = Column(String, nullable=False)
     hours = Column(Float, nullable=False)
+    # En PostgreSQL se puede particionar por meses de date (timesheet_partitions.py)
     date = Column(Date, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = Column(Integer, default=0, nullable=False)
 
     user_id = Column(Integer, ForeignKey("users.id"))
-    card_id = Column(Integer, ForeignKey("cards.id"), nullable=True)
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=True)
 
     user = relationship("User", back_populates="timesheets")
     card = relationship("Card", back_populates="timesheets")
@@ -86,21 +120,199 @@ class Timesheet(Base):
 
 class Label(Base):
     __tablename__ = "labels"
+    __table_args__ = (Index("ix_labels_card_version", "card_id", "version"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    card_id = Column(Integer, ForeignKey("cards.id"), nullable=False, index=True)
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(30), nullable=False)
     color = Column(String(20), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = Column(Integer, default=0, nullable=False)
 
     card = relationship("Card", back_populates="labels")
 
 
 class Subtask(Base):
     __tablename__ = "subtasks"
+    __table_args__ = (Index("ix_subtasks_card_version", "card_id", "version"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    card_id = Column(Integer, ForeignKey("cards.id"), nullable=False, index=True)
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String(100), nullable=False)
+    completed = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = Column(Integer, default=0, nullable=False)
+
+    card = relationship("Card", back_populates="subtasks")
+
+
+# Sincronización incremental: registro de borrados por tablero
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_board_version", "board_id", "version"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    board_id = Column(Integer, nullable=False)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+# Archivo de tarjetas completadas hace tiempo (ver card_archive.py). Mismas
+# columnas que las tablas activas más ``archived_at``; sin claves foráneas para
+# que el archivo no dependa de las filas activas.
+class ArchivedCard(Base):
+    __tablename__ = "archived_cards"
+    __table_args__ = (Index("ix_archived_cards_board", "board_id"),)
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    due_date = Column(DateTime, nullable=True)
+    order = Column(Integer, default=0)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, default=0, nullable=False)
+    list_id = Column(Integer, index=True)
+    user_id = Column(Integer)
+    completed = Column(Boolean, default=False)
+    overdue = Column(Boolean, default=False)
+    total_hours = Column(Float, default=0, server_default="0", nullable=False)
+    subtasks_total = Column(Integer, default=0, server_default="0", nullable=False)
+    subtasks_done = Column(Integer, default=0, server_default="0", nullable=False)
+    labels_count = Column(Integer, default=0, server_default="0", nullable=False)
+    board_id = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ArchivedTimesheet(Base):
+    __tablename__ = "archived_timesheets"
+
+    id = Column(Integer, primary_key=True)
+    description = Column(String, nullable=False)
+    hours = Column(Float, nullable=False)
+    date = Column(Date, nullable=False, index=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, default=0, nullable=False)
+    user_id = Column(Integer, index=True)
+    card_id = Column(Integer, index=True)
+
+
+class ArchivedLabel(Base):
+    __tablename__ = "archived_labels"
+
+    id = Column(Integer, primary_key=True)
+    card_id = Column(Integer, nullable=False, index=True)
+    name = Column(String(30), nullable=False)
+    color = Column(String(20), nullable=False)
+    updated_at = Column(DateTime)
+    version = Column(Integer, default=0, nullable=False)
+
+
+class ArchivedSubtask(Base):
+    __tablename__ = "archived_subtasks"
+
+    id = Column(Integer, primary_key=True)
+    card_id = Column(Integer, nullable=False, index=True)
     title = Column(String(100), nullable=False)
     completed = Column(Boolean, default=False)
+    updated_at = Column(DateTime)
+    version = Column(Integer, default=0, nullable=False)
+
+
+# Historial de tarjetas: una fila por evento, nunca se actualiza (ver card_activity.py).
+# Sin claves foráneas para que sobreviva al borrado o archivo de la tarjeta.
+class CardActivity(Base):
+    __tablename__ = "card_activity"
+    __table_args__ = (
+        Index("ix_card_activity_board_event_at", "board_id", "event_type", "at"),
+        Index("ix_card_activity_card_at", "card_id", "at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    board_id = Column(Integer, nullable=False)
+    card_id = Column(Integer, nullable=False)
+    event_type = Column(String(20), nullable=False)
+    from_list_id = Column(Integer, nullable=True)
+    to_list_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Coalescencia de informes entre procesos (ver single_flight.py)
+class ReportLease(Base):
+    __tablename__ = "report_leases"
+
+    key = Column(String(255), primary_key=True)
+    owner = Column(String(64), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    # Otro proceso espera el resultado: el dueño lo guarda en report_results
+    waiting = Column(Boolean, default=False, server_default="0", nullable=False)
+
+
+class ReportResult(Base):
+    __tablename__ = "report_results"
+
+    key = Column(String(255), primary_key=True)
+    payload = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+# Cola de trabajos en segundo plano (ver job_queue.py y job_worker.py)
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Siguiente trabajo: estado, prioridad y hora de ejecución
+        Index("ix_jobs_status_priority_run_after", "status", "priority", "run_after"),
+        Index("ix_jobs_user_created", "user_id", "created_at"),
+        UniqueConstraint("unique_key", name="uq_jobs_unique_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    # Evita encolar dos veces el mismo trabajo (p. ej. los informes de una semana)
+    unique_key = Column(String(100), nullable=True)
+    payload = Column(String, nullable=False, default="{}")
+    status = Column(String(20), nullable=False, default="queued")
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(64), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    progress = Column(Float, nullable=False, default=0.0)
+    progress_message = Column(String, nullable=True)
+    result = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+# Informes de semanas cerradas, generados una vez y nunca modificados (ver report_snapshots.py)
+class ReportSnapshot(Base):
+    __tablename__ = "report_snapshots"
+    __table_args__ = (
+        UniqueConstraint("board_id", "kind", "week", name="uq_report_snapshots_board_kind_week"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(20), nullable=False)
+    week = Column(String(8), nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # JSON comprimido con zlib
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Bus de invalidación entre workers cuando no hay PostgreSQL (ver cache_bus.py)
+class CacheInvalidation(Base):
+    __tablename__ = "cache_invalidations"
+    # Los oyentes leen id > último visto: SQLite no debe reutilizar ids tras podar
+    __table_args__ = {"sqlite_autoincrement": True}
 
-    card = relationship("Card", back_populates="subtasks")
\ No newline at end of file
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(20), nullable=False)
+    key = Column(String(100), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,44 @@
+# replica_sync.py - Réplica SQLite local para desarrollo
+"""Copia la base SQLite principal en otro fichero que hace de réplica de
+lectura, con la API de copia en caliente de SQLite. Con ``--every`` repite la
+copia periódicamente, lo que simula el retraso de una réplica real.
+
+Uso (desde backend/)::
+
+    python replica_sync.py --every 2
+    DATABASE_REPLICA_URL=sqlite:///$(pwd)/neocare_replica.db uvicorn main:app
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+from database import BASE_DIR
+
+DEFAULT_PRIMARY = os.path.join(BASE_DIR, "neocare.db")
+DEFAULT_REPLICA = os.path.join(BASE_DIR, "neocare_replica.db")
+
+
+def sync_replica(primary_path: str = DEFAULT_PRIMARY, replica_path: str = DEFAULT_REPLICA) -> None:
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copia la base SQLite a una réplica local")
+    parser.add_argument("--primary", default=DEFAULT_PRIMARY)
+    parser.add_argument("--replica", default=DEFAULT_REPLICA)
+    parser.add_argument("--every", type=float, help="Segundos entre copias (por defecto, una sola)")
+    args = parser.parse_args()
+
+    while True:
+        sync_replica(args.primary, args.replica)
+        print(f"Réplica actualizada: {args.replica}")
+        if not args.every:
+            break
+        time.sleep(args.every)
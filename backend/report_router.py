@@ -3,13 +3,17 @@ from datetime import date, datetime, timedelta
 from typing import Optional, List, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, and_, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, and_, or_, select, union, cast, case, Integer
+from sqlalchemy.orm import Session
 
-from database import get_db
-from models import Board, Card, List as ListModel, Timesheet, User
-from auth_router import get_current_user
-from crud import get_board_by_id_and_user
+from db_router import get_read_db
+from models import Board, Card, CardActivity, List as ListModel, Timesheet, User
+from auth_router import get_current_read_user
+from hot_queries import BoardRef, owned_board
+from card_archive import card_source, timesheet_source
+from card_activity import COMPLETED, CREATED, MOVED, OVERDUE
+from single_flight import single_flight
+from report_snapshots import report_snapshot
 
 router = APIRouter(prefix="/report", tags=["Report"])
 
@@ -37,39 +41,279 @@ def week_to_dates(week: str) -> tuple[date, date]:
             detail=f"Formato de semana inválido. Use 'YYYY-Www', ej: '2025-W01'. Error: {str(e)}",
         )
 
+def iso_week_sql(column, dialect_name: str):
+    """Expresión SQL 'YYYY-Www' (semana ISO 8601) de una fecha, según el dialecto."""
+    if dialect_name == "postgresql":
+        return func.to_char(column, 'IYYY-"W"IW')
+    if dialect_name == "mysql":
+        return func.date_format(column, "%x-W%v")
+    if dialect_name == "sqlite":
+        # El jueves de la semana ISO determina el año y el número de semana
+        thursday = func.date(column, "-3 days", "weekday 4")
+        return func.printf(
+            "%04d-W%02d",
+            cast(func.strftime("%Y", thursday), Integer),
+            (cast(func.strftime("%j", thursday), Integer) - 1) / 7 + 1,
+        )
+    return None
+
+def week_bucket_sql(column, dialect_name: str):
+    """Expresión para agrupar por semana; si el dialecto no sabe calcularla, agrupa por día."""
+    expr = iso_week_sql(column, dialect_name)
+    return expr if expr is not None else func.date(column)
+
+def _as_iso_week(value) -> str:
+    """Normaliza el valor agrupado (semana 'YYYY-Www' o fecha) a semana ISO."""
+    value = str(value)
+    if "-W" in value:
+        return value
+    iso_year, iso_week, _ = date.fromisoformat(value[:10]).isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+def activity_counts(db: Session, board_id: int, event_types, start_dt: datetime, end_dt: datetime) -> dict:
+    """Tarjetas distintas por tipo de evento en el rango (índice board/event/at)."""
+    counts = dict(
+        db.query(CardActivity.event_type, func.count(func.distinct(CardActivity.card_id)))
+        .filter(
+            CardActivity.board_id == board_id,
+            CardActivity.event_type.in_(event_types),
+            CardActivity.at.between(start_dt, end_dt),
+        )
+        .group_by(CardActivity.event_type)
+        .all()
+    )
+    return {event_type: counts.get(event_type, 0) for event_type in event_types}
+
+def report_board(
+    board_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+) -> BoardRef:
+    """Dependencia de los informes de un tablero: comprueba el acceso una sola
+    vez por petición y pasa el tablero a los decoradores y al informe."""
+    board = owned_board(db, board_id, current_user.id)
+    if board is None:
+        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
+    return board
+
+MAX_TREND_WEEKS = 104
+
+@router.get("/portfolio")
+def report_portfolio(
+    week: str = Query(..., description="Semana en formato YYYY-Www"),
+    include_archived: bool = Query(False, description="Incluye tarjetas y horas archivadas"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Resumen semanal de todos los tableros del usuario, agrupado por tablero.
+
+    Usa un número fijo de consultas (tableros, tarjetas, eventos, horas por
+    tablero y horas por usuario) sea cual sea el número de tableros. Nuevas,
+    completadas y vencidas salen del historial de eventos, como en /summary.
+    """
+    CardSrc = card_source(include_archived)
+    TimesheetSrc = timesheet_source(include_archived)
+    start_date, end_date = week_to_dates(week)
+    start_dt = datetime.combine(start_date, datetime.min.time())
+    end_dt = datetime.combine(end_date, datetime.max.time())
+
+    boards = (
+        db.query(Board.id, Board.title)
+        .filter(Board.user_id == current_user.id)
+        .order_by(Board.id)
+        .all()
+    )
+    portfolio = {
+        b.id: {
+            "board_id": b.id,
+            "board_title": b.title,
+            "total_cards": 0,
+            "open_cards": 0,
+            "created": 0,
+            "completed": 0,
+            "overdue": 0,
+            "total_hours": 0.0,
+            "timesheet_entries": 0,
+            "users_with_hours": 0,
+        }
+        for b in boards
+    }
+
+    in_week = lambda column: column.between(start_dt, end_dt)
+    card_rows = (
+        db.query(
+            ListModel.board_id.label("board_id"),
+            func.count(CardSrc.id).label("total_cards"),
+            func.sum(case((CardSrc.completed == True, 0), else_=1)).label("open_cards"),
+        )
+        .join(ListModel, ListModel.id == CardSrc.list_id)
+        .join(Board, Board.id == ListModel.board_id)
+        .filter(Board.user_id == current_user.id)
+        .group_by(ListModel.board_id)
+        .all()
+    )
+    for row in card_rows:
+        portfolio[row.board_id].update(
+            total_cards=int(row.total_cards),
+            open_cards=int(row.open_cards or 0),
+        )
+
+    # Nuevas, completadas y vencidas en la semana según el historial de eventos
+    activity_rows = (
+        db.query(
+            CardActivity.board_id.label("board_id"),
+            CardActivity.event_type.label("event_type"),
+            func.count(func.distinct(CardActivity.card_id)).label("total"),
+        )
+        .filter(
+            CardActivity.board_id.in_(list(portfolio)),
+            CardActivity.event_type.in_([CREATED, COMPLETED, OVERDUE]),
+            in_week(CardActivity.at),
+        )
+        .group_by(CardActivity.board_id, CardActivity.event_type)
+        .all()
+    )
+    for row in activity_rows:
+        portfolio[row.board_id][row.event_type] = int(row.total)
+
+    hours_filter = (
+        Board.user_id == current_user.id,
+        TimesheetSrc.date >= start_date,
+        TimesheetSrc.date <= end_date,
+    )
+    hours_rows = (
+        db.query(
+            ListModel.board_id.label("board_id"),
+            func.sum(TimesheetSrc.hours).label("total_hours"),
+            func.count(TimesheetSrc.id).label("timesheet_entries"),
+            func.count(func.distinct(TimesheetSrc.user_id)).label("users_with_hours"),
+        )
+        .join(CardSrc, CardSrc.id == TimesheetSrc.card_id)
+        .join(ListModel, ListModel.id == CardSrc.list_id)
+        .join(Board, Board.id == ListModel.board_id)
+        .filter(*hours_filter)
+        .group_by(ListModel.board_id)
+        .all()
+    )
+    for row in hours_rows:
+        portfolio[row.board_id].update(
+            total_hours=float(row.total_hours or 0),
+            timesheet_entries=int(row.timesheet_entries or 0),
+            users_with_hours=int(row.users_with_hours or 0),
+        )
+
+    user_rows = (
+        db.query(
+            TimesheetSrc.user_id.label("user_id"),
+            User.email.label("user_email"),
+            func.sum(TimesheetSrc.hours).label("total_hours"),
+            func.count(func.distinct(ListModel.board_id)).label("boards_count"),
+        )
+        .join(User, User.id == TimesheetSrc.user_id)
+        .join(CardSrc, CardSrc.id == TimesheetSrc.card_id)
+        .join(ListModel, ListModel.id == CardSrc.list_id)
+        .join(Board, Board.id == ListModel.board_id)
+        .filter(*hours_filter)
+        .group_by(TimesheetSrc.user_id, User.email)
+        .order_by(func.sum(TimesheetSrc.hours).desc())
+        .all()
+    )
+
+    boards_data = list(portfolio.values())
+    return {
+        "week": week,
+        "week_start": start_date.isoformat(),
+        "week_end": end_date.isoformat(),
+        "boards": boards_data,
+        "hours_by_user": [
+            {
+                "user_id": row.user_id,
+                "user_email": row.user_email,
+                "total_hours": float(row.total_hours or 0),
+                "boards_count": int(row.boards_count or 0),
+            }
+            for row in user_rows
+        ],
+        "totals": {
+            "boards": len(boards_data),
+            "total_cards": sum(b["total_cards"] for b in boards_data),
+            "open_cards": sum(b["open_cards"] for b in boards_data),
+            "created": sum(b["created"] for b in boards_data),
+            "completed": sum(b["completed"] for b in boards_data),
+            "overdue": sum(b["overdue"] for b in boards_data),
+            "total_hours": sum(b["total_hours"] for b in boards_data),
+        },
+    }
+
+DEBUG_SAMPLE_SIZE = 20
+DEBUG_DONE_LIST_NAMES = ("hecho", "done", "completado", "finalizado")
+
 @router.get("/debug/{board_id}")
 def debug_board_data(
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
-    """Endpoint para depurar y ver qué datos tienes realmente."""
+    """Endpoint para depurar y ver qué datos tienes realmente.
+
+    Los totales se agregan en SQL y las muestras se piden con LIMIT: el coste
+    no depende del tamaño del tablero.
+    """
     
     # 1. Verificar acceso al tablero
-    board = get_board_by_id_and_user(db, board_id, current_user.id)
+    board = owned_board(db, board_id, current_user.id)
     if not board:
         return {"error": f"No tienes acceso al tablero {board_id}", "user_id": current_user.id}
     
-    # 2. Obtener todas las listas del tablero con sus nombres
-    lists = db.query(ListModel).filter(ListModel.board_id == board_id).all()
+    # 2. Listas del tablero con su número de tarjetas (un GROUP BY)
+    lists = (
+        db.query(ListModel.id, ListModel.title, func.count(Card.id).label("card_count"))
+        .outerjoin(Card, Card.list_id == ListModel.id)
+        .filter(ListModel.board_id == board_id)
+        .group_by(ListModel.id, ListModel.title)
+        .order_by(ListModel.id)
+        .all()
+    )
     
-    # 3. Obtener todas las tarjetas del tablero
-    cards = (
-        db.query(Card)
+    # 3. Estadísticas de las tarjetas en una sola consulta
+    week_ago = datetime.utcnow() - timedelta(days=7)
+
+    def count_if(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    stats = (
+        db.query(
+            func.count(Card.id).label("total_cards"),
+            func.count(Card.due_date).label("cards_with_due_date"),
+            count_if(Card.completed == True).label("cards_completed"),
+            count_if(Card.overdue == True).label("cards_overdue"),
+            count_if(func.lower(ListModel.title).in_(DEBUG_DONE_LIST_NAMES)).label("cards_in_done_list"),
+            count_if(Card.updated_at >= week_ago).label("cards_updated_last_week"),
+            count_if(Card.created_at >= week_ago).label("cards_created_last_week"),
+        )
         .join(ListModel, Card.list_id == ListModel.id)
         .filter(ListModel.board_id == board_id)
-        .options(joinedload(Card.user))
-        .all()
+        .one()
     )
     
-    # 4. Obtener timesheets del tablero
-    timesheets = (
+    # 4. Muestras de tarjetas y horas (LIMIT en la consulta)
+    cards_sample = (
+        db.query(Card, ListModel.title.label("list_name"), User.email.label("user_email"))
+        .join(ListModel, Card.list_id == ListModel.id)
+        .outerjoin(User, User.id == Card.user_id)
+        .filter(ListModel.board_id == board_id)
+        .order_by(Card.id)
+        .limit(DEBUG_SAMPLE_SIZE)
+        .all()
+    )
+    timesheets_query = (
         db.query(Timesheet)
         .join(Card, Timesheet.card_id == Card.id)
         .join(ListModel, Card.list_id == ListModel.id)
         .filter(ListModel.board_id == board_id)
-        .all()
     )
+    timesheets_sample = timesheets_query.order_by(Timesheet.id).limit(DEBUG_SAMPLE_SIZE).all()
+    total_timesheets = timesheets_query.with_entities(func.count(Timesheet.id)).scalar() or 0
     
     # 5. Formatear respuesta para diagnóstico
     return {
@@ -77,15 +321,10 @@ def debug_board_data(
             "id": board.id,
             "title": board.title,
             "user_id": board.user_id,
-            "description": board.description
+            "version": board.version,
         },
         "lists": [
-            {
-                "id": l.id,
-                "title": l.title,
-                "position": l.position,
-                "card_count": len([c for c in cards if c.list_id == l.id])
-            }
+            {"id": l.id, "title": l.title, "card_count": int(l.card_count)}
             for l in lists
         ],
         "cards_sample": [
@@ -93,9 +332,9 @@ def debug_board_data(
                 "id": c.id,
                 "title": c.title,
                 "list_id": c.list_id,
-                "list_name": next((l.title for l in lists if l.id == c.list_id), "Unknown"),
+                "list_name": list_name,
                 "user_id": c.user_id,
-                "user_email": c.user.email if c.user else None,
+                "user_email": user_email,
                 "created_at": c.created_at.isoformat() if c.created_at else None,
                 "updated_at": c.updated_at.isoformat() if c.updated_at else None,
                 "due_date": c.due_date.isoformat() if c.due_date else None,
@@ -103,9 +342,9 @@ def debug_board_data(
                 "overdue": c.overdue,
                 "has_due_date": c.due_date is not None
             }
-            for c in cards[:20]  # Mostrar solo las primeras 20 para no saturar
+            for c, list_name, user_email in cards_sample
         ],
-        "total_cards": len(cards),
+        "total_cards": int(stats.total_cards),
         "timesheets_sample": [
             {
                 "id": t.id,
@@ -115,39 +354,37 @@ def debug_board_data(
                 "date": t.date.isoformat() if t.date else None,
                 "description": t.description
             }
-            for t in timesheets[:20]
+            for t in timesheets_sample
         ],
-        "total_timesheets": len(timesheets),
+        "total_timesheets": int(total_timesheets),
         "statistics": {
-            "cards_with_due_date": len([c for c in cards if c.due_date]),
-            "cards_completed": len([c for c in cards if c.completed]),
-            "cards_overdue": len([c for c in cards if c.overdue]),
-            "cards_in_done_list": len([c for c in cards if any(
-                l.title.lower() in ["hecho", "done", "completado", "finalizado"] 
-                for l in lists if l.id == c.list_id
-            )]),
-            "cards_updated_last_week": len([c for c in cards if c.updated_at and 
-                c.updated_at >= datetime.now() - timedelta(days=7)]),
-            "cards_created_last_week": len([c for c in cards if c.created_at and 
-                c.created_at >= datetime.now() - timedelta(days=7)])
+            name: int(getattr(stats, name))
+            for name in (
+                "cards_with_due_date",
+                "cards_completed",
+                "cards_overdue",
+                "cards_in_done_list",
+                "cards_updated_last_week",
+                "cards_created_last_week",
+            )
         }
     }
 
 @router.get("/{board_id}/summary")
+@report_snapshot("summary")
+@single_flight("summary")
 def report_summary(
     board_id: int,
     week: str = Query(..., description="Semana en formato YYYY-Www, por ejemplo 2025-W01"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    include_archived: bool = Query(False, description="Incluye tarjetas y horas archivadas"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+    board: BoardRef = Depends(report_board),
 ):
     """Resumen semanal del tablero - VERSIÓN MEJORADA que incluye tarjetas marcadas como completadas/vencidas."""
+    CardSrc = card_source(include_archived)
     
-    # 1. Verificar acceso al tablero
-    board = get_board_by_id_and_user(db, board_id, current_user.id)
-    if board is None:
-        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
-    
-    # 2. Obtener rango de fechas
+    # 1. Obtener rango de fechas (el acceso ya lo comprobó report_board)
     try:
         start_date, end_date = week_to_dates(week)
         start_dt = datetime.combine(start_date, datetime.min.time())
@@ -158,7 +395,7 @@ def report_summary(
     print(f"📊 [REPORT] Procesando tablero {board_id}, semana {week}")
     print(f"📅 [REPORT] Rango: {start_date} a {end_date}")
     
-    # 3. Buscar nombres de listas (flexible para diferentes nombres)
+    # 2. Buscar nombres de listas (flexible para diferentes nombres)
     lists = db.query(ListModel).filter(ListModel.board_id == board_id).all()
     
     # Intentar detectar automáticamente la lista "Hecho/Done"
@@ -180,7 +417,7 @@ def report_summary(
             print(f"⚠️ [REPORT] Lista 'Vencidas' detectada: '{lista.title}' (id={lista.id})")
             break
     
-    # 4. Función auxiliar para serializar - VERSIÓN MEJORADA
+    # 3. Función auxiliar para serializar - VERSIÓN MEJORADA
     def serialize_task_row(row) -> dict:
         return {
             "id": row.card_id,
@@ -194,270 +431,67 @@ def report_summary(
             "overdue": getattr(row, 'is_overdue', False),
         }
     
-    # 5. TAREAS NUEVAS: created_at en la semana
-    created_query = (
-        db.query(
-            Card.id.label("card_id"),
-            Card.title.label("title"),
-            User.email.label("responsible"),
-            ListModel.title.label("status"),
-            Card.created_at.label("created_at"),
-            Card.due_date.label("due_date"),
-            Card.completed.label("is_completed"),
-            Card.overdue.label("is_overdue")
-        )
-        .outerjoin(User, User.id == Card.user_id)
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(
-            Board.id == board_id,
-            Board.user_id == current_user.id,
-            Card.created_at.between(start_dt, end_dt)
-        )
-        .order_by(Card.created_at.desc())
-    )
-    
-    created_rows = created_query.all()
-    print(f"📊 [REPORT] Tarjetas NUEVAS encontradas: {len(created_rows)}")
-    
-    # 6. TAREAS COMPLETADAS - VERSIÓN MEJORADA (múltiples formas de detectar)
-    completed_rows = []
-    
-    # OPCIÓN 1: Por campo completed=True (lo más importante)
-    completed_by_field_query = (
-        db.query(
-            Card.id.label("card_id"),
-            Card.title.label("title"),
-            User.email.label("responsible"),
-            ListModel.title.label("status"),
-            Card.updated_at.label("updated_at"),
-            Card.due_date.label("due_date"),
-            Card.created_at.label("created_at"),
-            Card.completed.label("is_completed"),
-            Card.overdue.label("is_overdue")
-        )
-        .outerjoin(User, User.id == Card.user_id)
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(
-            Board.id == board_id,
-            Board.user_id == current_user.id,
-            Card.completed == True,  # ¡Esta es la clave!
-        )
-        .order_by(Card.updated_at.desc())
-    )
-    
-    completed_by_field = completed_by_field_query.all()
-    print(f"📊 [REPORT] Tarjetas COMPLETADAS (por campo completed=True): {len(completed_by_field)}")
-    
-    # OPCIÓN 2: Por lista "Hecho" (compatibilidad hacia atrás)
-    completed_by_list = []
-    if done_list:
-        completed_list_query = (
-            db.query(
-                Card.id.label("card_id"),
-                Card.title.label("title"),
-                User.email.label("responsible"),
-                ListModel.title.label("status"),
-                Card.updated_at.label("updated_at"),
-                Card.due_date.label("due_date"),
-                Card.created_at.label("created_at"),
-                Card.completed.label("is_completed"),
-                Card.overdue.label("is_overdue")
-            )
-            .outerjoin(User, User.id == Card.user_id)
-            .join(ListModel, ListModel.id == Card.list_id)
-            .join(Board, Board.id == ListModel.board_id)
-            .filter(
-                Board.id == board_id,
-                Board.user_id == current_user.id,
-                ListModel.id == done_list.id,
-            )
-            .order_by(Card.updated_at.desc())
-        )
-        completed_by_list = completed_list_query.all()
-        print(f"📊 [REPORT] Tarjetas en lista 'Hecho': {len(completed_by_list)}")
-    
-    # Combinar ambas opciones, evitando duplicados
-    completed_ids = set()
-    all_completed_rows = []
-    
-    # Primero las completadas por campo
-    for row in completed_by_field:
-        if row.card_id not in completed_ids:
-            completed_ids.add(row.card_id)
-            all_completed_rows.append(row)
-    
-    # Luego las de la lista (si no están ya)
-    for row in completed_by_list:
-        if row.card_id not in completed_ids:
-            completed_ids.add(row.card_id)
-            all_completed_rows.append(row)
-    
-    completed_rows = all_completed_rows
-    print(f"📊 [REPORT] Tarjetas COMPLETADAS totales: {len(completed_rows)}")
-    
-    # 7. TAREAS VENCIDAS - VERSIÓN MEJORADA (múltiples formas de detectar)
-    overdue_rows = []
-    
-    # OPCIÓN 1: Por campo overdue=True (lo más importante)
-    overdue_by_field_query = (
-        db.query(
-            Card.id.label("card_id"),
-            Card.title.label("title"),
-            User.email.label("responsible"),
-            ListModel.title.label("status"),
-            Card.due_date.label("due_date"),
-            Card.updated_at.label("updated_at"),
-            Card.created_at.label("created_at"),
-            Card.completed.label("is_completed"),
-            Card.overdue.label("is_overdue")
-        )
-        .outerjoin(User, User.id == Card.user_id)
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(
-            Board.id == board_id,
-            Board.user_id == current_user.id,
-            Card.overdue == True,  # ¡Esta es la clave!
+    # 4. TAREAS NUEVAS, COMPLETADAS Y VENCIDAS de la semana, según el historial
+    # de eventos: un rango sobre (board_id, event_type, at). Mover una tarjeta a
+    # la lista "Hecho" o "Vencidas" cuenta como completarla o vencerla.
+    moved_into = [
+        (and_(CardActivity.event_type == MOVED, CardActivity.to_list_id == lista.id), event_type)
+        for lista, event_type in ((done_list, COMPLETED), (overdue_list, OVERDUE))
+        if lista is not None
+    ]
+    kind = (case(*moved_into, else_=CardActivity.event_type) if moved_into else CardActivity.event_type).label("kind")
+    week_events = (
+        select(CardActivity.card_id, kind, func.max(CardActivity.at).label("at"))
+        .where(
+            CardActivity.board_id == board_id,
+            CardActivity.event_type.in_([CREATED, COMPLETED, OVERDUE, MOVED]),
+            CardActivity.at.between(start_dt, end_dt),
         )
-        .order_by(Card.due_date.desc())
+        .group_by(CardActivity.card_id, kind)
+        .subquery()
     )
-    
-    overdue_by_field = overdue_by_field_query.all()
-    print(f"📊 [REPORT] Tarjetas VENCIDAS (por campo overdue=True): {len(overdue_by_field)}")
-    
-    # OPCIÓN 2: Por lista "Vencidas"
-    overdue_by_list = []
-    if overdue_list:
-        overdue_list_query = (
-            db.query(
-                Card.id.label("card_id"),
-                Card.title.label("title"),
-                User.email.label("responsible"),
-                ListModel.title.label("status"),
-                Card.due_date.label("due_date"),
-                Card.updated_at.label("updated_at"),
-                Card.created_at.label("created_at"),
-                Card.completed.label("is_completed"),
-                Card.overdue.label("is_overdue")
-            )
-            .outerjoin(User, User.id == Card.user_id)
-            .join(ListModel, ListModel.id == Card.list_id)
-            .join(Board, Board.id == ListModel.board_id)
-            .filter(
-                Board.id == board_id,
-                Board.user_id == current_user.id,
-                ListModel.id == overdue_list.id,
-            )
-            .order_by(Card.due_date.desc())
-        )
-        overdue_by_list = overdue_list_query.all()
-        print(f"📊 [REPORT] Tarjetas en lista 'Vencidas': {len(overdue_by_list)}")
-    
-    # OPCIÓN 3: Por due_date pasado (compatibilidad)
-    overdue_by_date_query = (
+    event_rows = (
         db.query(
-            Card.id.label("card_id"),
-            Card.title.label("title"),
+            week_events.c.kind.label("kind"),
+            CardSrc.id.label("card_id"),
+            CardSrc.title.label("title"),
             User.email.label("responsible"),
             ListModel.title.label("status"),
-            Card.due_date.label("due_date"),
-            Card.updated_at.label("updated_at"),
-            Card.created_at.label("created_at"),
-            Card.completed.label("is_completed"),
-            Card.overdue.label("is_overdue")
-        )
-        .outerjoin(User, User.id == Card.user_id)
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(
-            Board.id == board_id,
-            Board.user_id == current_user.id,
-            Card.due_date.isnot(None),
-            Card.due_date < datetime.now(),
+            CardSrc.created_at.label("created_at"),
+            CardSrc.updated_at.label("updated_at"),
+            CardSrc.due_date.label("due_date"),
+            CardSrc.completed.label("is_completed"),
+            CardSrc.overdue.label("is_overdue")
         )
+        .join(CardSrc, CardSrc.id == week_events.c.card_id)
+        .outerjoin(User, User.id == CardSrc.user_id)
+        .outerjoin(ListModel, ListModel.id == CardSrc.list_id)
+        .filter(week_events.c.kind.in_([CREATED, COMPLETED, OVERDUE]))
+        .order_by(week_events.c.at.desc(), CardSrc.id.desc())
+        .all()
     )
-    
-    # Excluir tarjetas ya consideradas
-    if done_list:
-        overdue_by_date_query = overdue_by_date_query.filter(ListModel.id != done_list.id)
-    if overdue_list:
-        overdue_by_date_query = overdue_by_date_query.filter(ListModel.id != overdue_list.id)
-    
-    overdue_by_date = overdue_by_date_query.order_by(Card.due_date.desc()).all()
-    print(f"📊 [REPORT] Tarjetas VENCIDAS (por fecha): {len(overdue_by_date)}")
-    
-    # Combinar todas las opciones, evitando duplicados
-    overdue_ids = set()
-    all_overdue_rows = []
-    
-    for row in overdue_by_field:
-        if row.card_id not in overdue_ids:
-            overdue_ids.add(row.card_id)
-            all_overdue_rows.append(row)
-    
-    for row in overdue_by_list:
-        if row.card_id not in overdue_ids:
-            overdue_ids.add(row.card_id)
-            all_overdue_rows.append(row)
-    
-    for row in overdue_by_date:
-        if row.card_id not in overdue_ids:
-            overdue_ids.add(row.card_id)
-            all_overdue_rows.append(row)
-    
-    overdue_rows = all_overdue_rows
-    print(f"📊 [REPORT] Tarjetas VENCIDAS totales: {len(overdue_rows)}")
-    
-    # 8. Cálculos de la semana anterior para comparativas
+    rows_by_kind = {CREATED: [], COMPLETED: [], OVERDUE: []}
+    for row in event_rows:
+        rows_by_kind[row.kind].append(row)
+    created_rows = rows_by_kind[CREATED]
+    completed_rows = rows_by_kind[COMPLETED]
+    overdue_rows = rows_by_kind[OVERDUE]
+    print(f"📊 [REPORT] Eventos de la semana: {len(created_rows)} nuevas, "
+          f"{len(completed_rows)} completadas, {len(overdue_rows)} vencidas")
+    
+    # 5. Cálculos de la semana anterior para comparativas
     previous_start_date = start_date - timedelta(days=7)
     previous_end_date = end_date - timedelta(days=7)
     prev_start_dt = datetime.combine(previous_start_date, datetime.min.time())
     prev_end_dt = datetime.combine(previous_end_date, datetime.max.time())
     
-    # Conteo de nuevas semana anterior
-    created_prev_count = (
-        db.query(func.count(Card.id))
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(
-            Board.id == board_id,
-            Board.user_id == current_user.id,
-            Card.created_at.between(prev_start_dt, prev_end_dt)
-        )
-        .scalar() or 0
-    )
-    
-    # Conteo de completadas semana anterior (por campo completed)
-    completed_prev_count = (
-        db.query(func.count(Card.id))
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(
-            Board.id == board_id,
-            Board.user_id == current_user.id,
-            Card.completed == True,
-            Card.updated_at.between(prev_start_dt, prev_end_dt)
-        )
-        .scalar() or 0
-    )
-    
-    # Conteo de vencidas semana anterior (por campo overdue)
-    overdue_prev_count = (
-        db.query(func.count(Card.id))
-        .join(ListModel, ListModel.id == Card.list_id)
-        .join(Board, Board.id == ListModel.board_id)
-        .filter(
-            Board.id == board_id,
-            Board.user_id == current_user.id,
-            Card.overdue == True,
-            Card.updated_at.between(prev_start_dt, prev_end_dt)
-        )
-        .scalar() or 0
-    )
+    # Nuevas, completadas y vencidas de la semana anterior según el historial de eventos
+    prev_counts = activity_counts(db, board_id, (CREATED, COMPLETED, OVERDUE), prev_start_dt, prev_end_dt)
+    created_prev_count = prev_counts[CREATED]
+    completed_prev_count = prev_counts[COMPLETED]
+    overdue_prev_count = prev_counts[OVERDUE]
     
-    # 9. Preparar respuesta con metadatos adicionales
+    # 6. Preparar respuesta con metadatos adicionales
     response = {
         "created": [serialize_task_row(row) for row in created_rows],
         "completed": [serialize_task_row(row) for row in completed_rows],
@@ -484,17 +518,19 @@ def report_summary(
     return response
 
 @router.get("/{board_id}/hours-by-user")
+@report_snapshot("hours-by-user")
+@single_flight("hours-by-user")
 def report_hours_by_user(
     board_id: int,
     week: str = Query(..., description="Semana en formato YYYY-Www"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    include_archived: bool = Query(False, description="Incluye tarjetas y horas archivadas"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+    board: BoardRef = Depends(report_board),
 ):
     """Reporte de horas trabajadas por usuario."""
-    
-    board = get_board_by_id_and_user(db, board_id, current_user.id)
-    if board is None:
-        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
+    CardSrc = card_source(include_archived)
+    TimesheetSrc = timesheet_source(include_archived)
     
     try:
         start_date, end_date = week_to_dates(week)
@@ -506,23 +542,23 @@ def report_hours_by_user(
     # Consulta principal de horas - CORREGIDA
     rows = (
         db.query(
-            Timesheet.user_id.label("user_id"),
+            TimesheetSrc.user_id.label("user_id"),
             User.email.label("user_email"),  # CORREGIDO: username -> email
-            func.coalesce(func.sum(Timesheet.hours), 0).label("total_hours"),
-            func.count(func.distinct(Timesheet.card_id)).label("tasks_count"),
+            func.coalesce(func.sum(TimesheetSrc.hours), 0).label("total_hours"),
+            func.count(func.distinct(TimesheetSrc.card_id)).label("tasks_count"),
         )
-        .join(User, User.id == Timesheet.user_id)
-        .join(Card, Card.id == Timesheet.card_id)
-        .join(ListModel, ListModel.id == Card.list_id)
+        .join(User, User.id == TimesheetSrc.user_id)
+        .join(CardSrc, CardSrc.id == TimesheetSrc.card_id)
+        .join(ListModel, ListModel.id == CardSrc.list_id)
         .join(Board, Board.id == ListModel.board_id)
         .filter(
             Board.id == board_id,
             Board.user_id == current_user.id,
-            Timesheet.date >= start_date,
-            Timesheet.date <= end_date,
+            TimesheetSrc.date >= start_date,
+            TimesheetSrc.date <= end_date,
         )
-        .group_by(Timesheet.user_id, User.email)  # CORREGIDO: username -> email
-        .order_by(func.coalesce(func.sum(Timesheet.hours), 0).desc())
+        .group_by(TimesheetSrc.user_id, User.email)  # CORREGIDO: username -> email
+        .order_by(func.coalesce(func.sum(TimesheetSrc.hours), 0).desc())
         .all()
     )
     
@@ -532,8 +568,9 @@ def report_hours_by_user(
     if not rows:
         users_in_board = (
             db.query(User)
-            .join(Card, Card.user_id == User.id, isouter=True)
-            .join(ListModel, ListModel.id == Card.list_id, isouter=True)
+            .join(CardSrc, CardSrc.user_id == User.id, isouter=True)
+            .join(ListModel, ListModel.id == CardSrc.list_id, isouter=True)
+            .join(Board, Board.id == ListModel.board_id, isouter=True)
             .filter(
                 ListModel.board_id == board_id,
                 Board.user_id == current_user.id
@@ -553,29 +590,32 @@ def report_hours_by_user(
         ]
         print(f"⏱️ [HOURS-BY-USER] Mostrando {len(rows)} usuarios del tablero (sin horas)")
     
+    # Filas de la consulta (Row) o diccionarios del caso sin horas
+    rows = [row if isinstance(row, dict) else row._mapping for row in rows]
     return [
         {
-            "user_id": row.user_id if hasattr(row, 'user_id') else row.get('user_id'),
-            "user_email": row.user_email if hasattr(row, 'user_email') else row.get('user_email'),
-            "user_name": row.user_email.split('@')[0] if row.user_email else "Usuario",  # CORREGIDO
-            "total_hours": float(getattr(row, 'total_hours', 0) or row.get('total_hours', 0)),
-            "tasks_count": int(getattr(row, 'tasks_count', 0) or row.get('tasks_count', 0)),
+            "user_id": row["user_id"],
+            "user_email": row["user_email"],
+            "user_name": row["user_email"].split('@')[0] if row["user_email"] else "Usuario",  # CORREGIDO
+            "total_hours": float(row["total_hours"] or 0),
+            "tasks_count": int(row["tasks_count"] or 0),
         }
         for row in rows
     ]
 
 @router.get("/{board_id}/hours-by-card")
+@single_flight("hours-by-card")
 def report_hours_by_card(
     board_id: int,
     week: str = Query(..., description="Semana en formato YYYY-Www"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    include_archived: bool = Query(False, description="Incluye tarjetas y horas archivadas"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+    board: BoardRef = Depends(report_board),
 ):
     """Reporte de horas trabajadas por tarjeta."""
-    
-    board = get_board_by_id_and_user(db, board_id, current_user.id)
-    if board is None:
-        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
+    CardSrc = card_source(include_archived)
+    TimesheetSrc = timesheet_source(include_archived)
     
     try:
         start_date, end_date = week_to_dates(week)
@@ -587,30 +627,30 @@ def report_hours_by_card(
     # Consulta optimizada con left join para incluir tarjetas sin timesheets - CORREGIDA
     rows = (
         db.query(
-            Card.id.label("card_id"),
-            Card.title.label("title"),
-            Card.description.label("description"),
+            CardSrc.id.label("card_id"),
+            CardSrc.title.label("title"),
+            CardSrc.description.label("description"),
             ListModel.title.label("status"),
             User.email.label("responsible_email"),  # CORREGIDO: username -> email
-            func.coalesce(func.sum(Timesheet.hours), 0).label("total_hours"),
-            func.count(Timesheet.id).label("timesheet_entries"),
-            Card.completed.label("completed"),
-            Card.overdue.label("overdue")
+            func.coalesce(func.sum(TimesheetSrc.hours), 0).label("total_hours"),
+            func.count(TimesheetSrc.id).label("timesheet_entries"),
+            CardSrc.completed.label("completed"),
+            CardSrc.overdue.label("overdue")
         )
-        .join(ListModel, ListModel.id == Card.list_id)
+        .join(ListModel, ListModel.id == CardSrc.list_id)
         .join(Board, Board.id == ListModel.board_id)
-        .outerjoin(Timesheet, and_(
-            Timesheet.card_id == Card.id,
-            Timesheet.date >= start_date,
-            Timesheet.date <= end_date
+        .outerjoin(TimesheetSrc, and_(
+            TimesheetSrc.card_id == CardSrc.id,
+            TimesheetSrc.date >= start_date,
+            TimesheetSrc.date <= end_date
         ))
-        .outerjoin(User, User.id == Card.user_id)
+        .outerjoin(User, User.id == CardSrc.user_id)
         .filter(
             Board.id == board_id,
             Board.user_id == current_user.id,
         )
-        .group_by(Card.id, Card.title, Card.description, ListModel.title, User.email, Card.completed, Card.overdue)  # Agregados
-        .order_by(func.coalesce(func.sum(Timesheet.hours), 0).desc())
+        .group_by(CardSrc.id, CardSrc.title, CardSrc.description, ListModel.title, User.email, CardSrc.completed, CardSrc.overdue)  # Agregados
+        .order_by(func.coalesce(func.sum(TimesheetSrc.hours), 0).desc())
         .all()
     )
     
@@ -634,60 +674,187 @@ def report_hours_by_card(
         for row in rows
     ]
 
+@router.get("/{board_id}/trend")
+@single_flight("trend")
+def report_trend(
+    board_id: int,
+    from_week: str = Query(..., alias="from", description="Primera semana, formato YYYY-Www"),
+    to_week: str = Query(..., alias="to", description="Última semana, formato YYYY-Www"),
+    include_archived: bool = Query(False, description="Incluye tarjetas y horas archivadas"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+    board: BoardRef = Depends(report_board),
+):
+    """Tendencia semanal (nuevas, completadas, vencidas y horas) de un rango de semanas.
+
+    Cada métrica se resuelve con una única consulta agrupada por semana ISO,
+    en lugar de llamar a /summary, /hours-by-user y /hours-by-card por semana.
+    """
+    CardSrc = card_source(include_archived)
+    TimesheetSrc = timesheet_source(include_archived)
+
+    range_start, _ = week_to_dates(from_week)
+    _, range_end = week_to_dates(to_week)
+    if range_end < range_start:
+        raise HTTPException(status_code=400, detail="'from' debe ser anterior o igual a 'to'")
+    weeks_count = (range_end - range_start).days // 7 + 1
+    if weeks_count > MAX_TREND_WEEKS:
+        raise HTTPException(status_code=400, detail=f"El rango máximo es de {MAX_TREND_WEEKS} semanas")
+    start_dt = datetime.combine(range_start, datetime.min.time())
+    end_dt = datetime.combine(range_end, datetime.max.time())
+
+    # Semanas del rango, rellenadas con ceros
+    weeks = {}
+    for n in range(weeks_count):
+        week_start = range_start + timedelta(weeks=n)
+        label = _as_iso_week(week_start)
+        weeks[label] = {
+            "week": label,
+            "week_start": week_start.isoformat(),
+            "week_end": (week_start + timedelta(days=6)).isoformat(),
+            "created": 0,
+            "completed": 0,
+            "overdue": 0,
+            "total_hours": 0.0,
+            "hours_by_user": {},
+            "hours_by_card": {},
+        }
+
+    dialect_name = db.get_bind().dialect.name
+    week_of = lambda column: week_bucket_sql(column, dialect_name)
+    board_cards = and_(ListModel.id == CardSrc.list_id, ListModel.board_id == board_id)
+
+    # 1. Tarjetas nuevas por semana de creación
+    created_rows = (
+        db.query(week_of(CardSrc.created_at).label("week"), func.count(CardSrc.id).label("total"))
+        .join(ListModel, board_cards)
+        .filter(CardSrc.created_at.between(start_dt, end_dt))
+        .group_by("week")
+        .all()
+    )
+    for row in created_rows:
+        weeks[_as_iso_week(row.week)]["created"] += int(row.total)
+
+    # 2. Completadas y vencidas por semana del evento (mismo criterio que los
+    # contadores de la semana anterior en /summary)
+    status_rows = (
+        db.query(
+            week_of(CardActivity.at).label("week"),
+            CardActivity.event_type.label("event_type"),
+            func.count(func.distinct(CardActivity.card_id)).label("total"),
+        )
+        .filter(
+            CardActivity.board_id == board_id,
+            CardActivity.event_type.in_([COMPLETED, OVERDUE]),
+            CardActivity.at.between(start_dt, end_dt),
+        )
+        .group_by("week", CardActivity.event_type)
+        .all()
+    )
+    for row in status_rows:
+        weeks[_as_iso_week(row.week)][row.event_type] += int(row.total)
+
+    # 3. Horas por usuario y semana
+    user_rows = (
+        db.query(
+            week_of(TimesheetSrc.date).label("week"),
+            TimesheetSrc.user_id.label("user_id"),
+            User.email.label("user_email"),
+            func.sum(TimesheetSrc.hours).label("total_hours"),
+            func.count(func.distinct(TimesheetSrc.card_id)).label("tasks_count"),
+        )
+        .join(User, User.id == TimesheetSrc.user_id)
+        .join(CardSrc, CardSrc.id == TimesheetSrc.card_id)
+        .join(ListModel, board_cards)
+        .filter(TimesheetSrc.date >= range_start, TimesheetSrc.date <= range_end)
+        .group_by("week", TimesheetSrc.user_id, User.email)
+        .all()
+    )
+    for row in user_rows:
+        bucket = weeks[_as_iso_week(row.week)]
+        entry = bucket["hours_by_user"].setdefault(row.user_id, {
+            "user_id": row.user_id,
+            "user_email": row.user_email,
+            "total_hours": 0.0,
+            "tasks_count": 0,
+        })
+        entry["total_hours"] += float(row.total_hours or 0)
+        entry["tasks_count"] += int(row.tasks_count or 0)
+        bucket["total_hours"] += float(row.total_hours or 0)
+
+    # 4. Horas por tarjeta y semana
+    card_rows = (
+        db.query(
+            week_of(TimesheetSrc.date).label("week"),
+            CardSrc.id.label("card_id"),
+            CardSrc.title.label("title"),
+            func.sum(TimesheetSrc.hours).label("total_hours"),
+            func.count(TimesheetSrc.id).label("timesheet_entries"),
+        )
+        .join(CardSrc, CardSrc.id == TimesheetSrc.card_id)
+        .join(ListModel, board_cards)
+        .filter(TimesheetSrc.date >= range_start, TimesheetSrc.date <= range_end)
+        .group_by("week", CardSrc.id, CardSrc.title)
+        .all()
+    )
+    for row in card_rows:
+        entry = weeks[_as_iso_week(row.week)]["hours_by_card"].setdefault(row.card_id, {
+            "card_id": row.card_id,
+            "title": row.title,
+            "total_hours": 0.0,
+            "timesheet_entries": 0,
+        })
+        entry["total_hours"] += float(row.total_hours or 0)
+        entry["timesheet_entries"] += int(row.timesheet_entries or 0)
+
+    for bucket in weeks.values():
+        bucket["hours_by_user"] = sorted(
+            bucket["hours_by_user"].values(), key=lambda e: e["total_hours"], reverse=True
+        )
+        bucket["hours_by_card"] = sorted(
+            bucket["hours_by_card"].values(), key=lambda e: e["total_hours"], reverse=True
+        )
+
+    return {
+        "board_id": board_id,
+        "board_title": board.title,
+        "from": _as_iso_week(range_start),
+        "to": _as_iso_week(range_end),
+        "weeks": list(weeks.values()),
+    }
+
 @router.get("/{board_id}/weeks-available")
 def get_available_weeks(
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    include_archived: bool = Query(False, description="Incluye tarjetas y horas archivadas"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+    board: BoardRef = Depends(report_board),
 ):
     """Obtiene las semanas que tienen datos disponibles para reportes."""
+    CardSrc = card_source(include_archived)
+    TimesheetSrc = timesheet_source(include_archived)
     
-    board = get_board_by_id_and_user(db, board_id, current_user.id)
-    if board is None:
-        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
-    
-    # Obtener todas las fechas con actividad en el tablero
-    dates = []
-    
-    # Fechas de creación de tarjetas
-    card_dates = db.query(func.date(Card.created_at)).join(
-        ListModel, ListModel.id == Card.list_id
-    ).filter(
-        ListModel.board_id == board_id
-    ).distinct().all()
-    
-    # Fechas de actualización de tarjetas
-    update_dates = db.query(func.date(Card.updated_at)).join(
-        ListModel, ListModel.id == Card.list_id
-    ).filter(
-        ListModel.board_id == board_id,
-        Card.updated_at.isnot(None)
-    ).distinct().all()
-    
-    # Fechas de timesheets
-    timesheet_dates = db.query(func.date(Timesheet.date)).join(
-        Card, Card.id == Timesheet.card_id
-    ).join(
-        ListModel, ListModel.id == Card.list_id
-    ).filter(
-        ListModel.board_id == board_id,
-        Timesheet.date.isnot(None)
-    ).distinct().all()
-    
-    # Combinar todas las fechas
-    all_dates = set()
-    for date_set in [card_dates, update_dates, timesheet_dates]:
-        for d in date_set:
-            if d[0]:  # Si no es None
-                all_dates.add(d[0])
-    
-    # Convertir a semanas ISO
-    weeks = set()
-    for d in all_dates:
-        if isinstance(d, date):
-            iso_year, iso_week, _ = d.isocalendar()
-            weeks.add(f"{iso_year}-W{iso_week:02d}")
-    
+    # Una sola consulta UNION que calcula la semana ISO en SQL: la base de
+    # datos devuelve solo las semanas distintas, no todas las fechas.
+    dialect_name = db.get_bind().dialect.name
+    week_of = lambda column: week_bucket_sql(column, dialect_name)
+
+    weeks_query = union(
+        select(week_of(CardSrc.created_at).label("week"))
+        .join(ListModel, ListModel.id == CardSrc.list_id)
+        .where(ListModel.board_id == board_id, CardSrc.created_at.isnot(None)),
+        select(week_of(CardSrc.updated_at).label("week"))
+        .join(ListModel, ListModel.id == CardSrc.list_id)
+        .where(ListModel.board_id == board_id, CardSrc.updated_at.isnot(None)),
+        select(week_of(TimesheetSrc.date).label("week"))
+        .join(CardSrc, CardSrc.id == TimesheetSrc.card_id)
+        .join(ListModel, ListModel.id == CardSrc.list_id)
+        .where(ListModel.board_id == board_id, TimesheetSrc.date.isnot(None)),
+    )
+    # En dialectos sin expresión ISO llegan fechas y se convierten aquí
+    weeks = {_as_iso_week(row[0]) for row in db.execute(weeks_query) if row[0]}
+
     return {
         "board_id": board_id,
         "board_title": board.title,
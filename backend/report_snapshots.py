@@ -0,0 +1,232 @@
+# report_snapshots.py - Informes semanales pregenerados
+"""Cuando se cierra una semana ISO, se generan el resumen y las horas por
+usuario de todos los tableros activos y se guardan en ``report_snapshots``
+como JSON comprimido. Un snapshot no se modifica nunca: pedir un informe de una
+semana cerrada es una única lectura por clave. Solo se congelan informes
+acotados a la semana; las horas por tarjeta listan todas las tarjetas actuales
+y se calculan siempre.
+
+La generación va por la cola de trabajos (job_queue.py):
+
+- ``job_worker.py`` llama a ``schedule_weekly_reports`` en cada vuelta y encola,
+  una sola vez por semana, el trabajo ``weekly_reports`` de cada semana cerrada
+  desde la última encolada (si el worker estuvo parado, recupera las que faltan);
+- ese trabajo reparte los tableros en lotes de ``REPORT_SNAPSHOT_BATCH_SIZE``
+  (trabajos ``report_snapshots``) que los workers procesan en paralelo.
+
+Solo se sirven desde snapshot las peticiones sin ``include_archived``; el resto
+(y las semanas abiertas) se calculan como siempre.
+
+Uso (desde backend/)::
+
+    python report_snapshots.py                  # encola las semanas cerradas pendientes
+    python report_snapshots.py --week 2025-W01  # encola una semana concreta
+    python report_snapshots.py --week 2025-W01 --inline   # sin worker
+"""
+import argparse
+import inspect
+import json
+import zlib
+from datetime import date, datetime, time, timedelta
+from functools import wraps
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import REPORT_SNAPSHOT_BATCH_SIZE, REPORT_SNAPSHOT_DELAY_HOURS
+from database import SessionLocal
+from metrics import REPORT_SNAPSHOTS
+from models import Board, Job, ReportSnapshot, User
+
+SNAPSHOT_KINDS = ("summary", "hours-by-user")
+
+
+def _week_closes_at(week: str) -> Optional[datetime]:
+    """Momento en que la semana se da por cerrada (None si el formato no es válido)."""
+    try:
+        year, number = week.split("-W")
+        sunday = date.fromisocalendar(int(year), int(number), 7)
+    except (ValueError, AttributeError):
+        return None
+    return datetime.combine(sunday + timedelta(days=1), time.min) + timedelta(hours=REPORT_SNAPSHOT_DELAY_HOURS)
+
+
+def week_is_closed(week: str, now: Optional[datetime] = None) -> bool:
+    closes_at = _week_closes_at(week)
+    return closes_at is not None and closes_at <= (now or datetime.utcnow())
+
+
+def _iso_week(day: date) -> str:
+    iso_year, iso_week, _ = day.isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+
+def last_closed_week(now: Optional[datetime] = None) -> str:
+    now = now or datetime.utcnow()
+    return _iso_week(now - timedelta(hours=REPORT_SNAPSHOT_DELAY_HOURS, weeks=1))
+
+
+def _weeks_after(week: str, last: str) -> list:
+    """Semanas posteriores a ``week`` hasta ``last`` incluida."""
+    year, number = week.split("-W")
+    monday = date.fromisocalendar(int(year), int(number), 1)
+    weeks = []
+    while True:
+        monday += timedelta(weeks=1)
+        if _iso_week(monday) > last:
+            return weeks
+        weeks.append(_iso_week(monday))
+
+
+# --- Lectura y escritura ---
+
+def load_snapshot(db: Session, board_id: int, kind: str, week: str) -> Optional[Any]:
+    payload = db.execute(
+        select(ReportSnapshot.payload).where(
+            ReportSnapshot.board_id == board_id,
+            ReportSnapshot.kind == kind,
+            ReportSnapshot.week == week,
+        )
+    ).scalar_one_or_none()
+    return json.loads(zlib.decompress(payload)) if payload is not None else None
+
+
+def store_snapshot(db: Session, board_id: int, kind: str, week: str, result: Any) -> bool:
+    """Guarda el snapshot si aún no existe (sin commit). Nunca sobrescribe uno previo."""
+    payload = zlib.compress(json.dumps(jsonable_encoder(result)).encode("utf-8"))
+    try:
+        with db.begin_nested():
+            db.add(ReportSnapshot(board_id=board_id, kind=kind, week=week, payload=payload))
+    except IntegrityError:
+        return False
+    return True
+
+
+def report_snapshot(kind: str):
+    """Decorador (encima de ``single_flight``) que sirve las semanas cerradas
+    desde su snapshot. Si no lo hay, calcula el informe normalmente."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(**kwargs):
+            week = kwargs["week"]
+            if kwargs.get("include_archived") or not week_is_closed(week):
+                return func(**kwargs)
+            # El acceso ya lo comprobó la dependencia report_board
+            cached = load_snapshot(kwargs["db"], kwargs["board"].id, kind, week)
+            REPORT_SNAPSHOTS.inc((kind, "miss" if cached is None else "hit"))
+            return func(**kwargs) if cached is None else cached
+        return wrapper
+    return decorator
+
+
+# --- Generación ---
+
+def _report_functions() -> dict:
+    # Import diferido: report_router usa el decorador de este módulo
+    from report_router import report_hours_by_user, report_summary
+
+    # Las funciones originales, sin coalescencia ni snapshot
+    return {
+        "summary": inspect.unwrap(report_summary),
+        "hours-by-user": inspect.unwrap(report_hours_by_user),
+    }
+
+
+def generate_board_snapshots(db: Session, board: Board, week: str) -> int:
+    """Genera los informes que falten de un tablero y semana. Devuelve cuántos."""
+    reports = _report_functions()
+    existing = set(db.execute(
+        select(ReportSnapshot.kind).where(ReportSnapshot.board_id == board.id, ReportSnapshot.week == week)
+    ).scalars())
+    owner = db.get(User, board.user_id)
+    created = 0
+    for kind in SNAPSHOT_KINDS:
+        if kind in existing:
+            continue
+        result = reports[kind](
+            board_id=board.id, week=week, include_archived=False, db=db, current_user=owner, board=board
+        )
+        created += store_snapshot(db, board.id, kind, week, result)
+    db.commit()
+    return created
+
+
+def _active_board_ids(db: Session) -> list:
+    return db.execute(
+        select(Board.id).where(Board.user_id.isnot(None), Board.deleted_at.is_(None)).order_by(Board.id)
+    ).scalars().all()
+
+
+def pending_closed_weeks(db: Session, now: Optional[datetime] = None) -> list:
+    """Semanas cerradas posteriores a la última con ``weekly_reports`` encolado
+    (solo la última cerrada si nunca se encoló ninguna)."""
+    last = last_closed_week(now)
+    latest_key = db.execute(
+        select(func.max(Job.unique_key)).where(Job.kind == "weekly_reports")
+    ).scalar()
+    if latest_key is None:
+        return [last]
+    return _weeks_after(latest_key.split(":", 1)[1], last)
+
+
+def schedule_weekly_reports(db: Session, week: Optional[str] = None) -> list:
+    """Encola la generación de la semana indicada o, sin ella, de todas las
+    semanas cerradas pendientes. Devuelve los trabajos encolados."""
+    from job_queue import enqueue
+
+    jobs = []
+    for pending in [week] if week else pending_closed_weeks(db):
+        job = enqueue(db, "weekly_reports", {"week": pending}, unique_key=f"weekly_reports:{pending}")
+        if job is not None:
+            jobs.append(job)
+    db.commit()
+    return jobs
+
+
+def enqueue_snapshot_batches(db: Session, week: str) -> int:
+    """Reparte los tableros activos en trabajos ``report_snapshots``. Devuelve cuántos."""
+    from job_queue import enqueue
+
+    board_ids = _active_board_ids(db)
+    batches = 0
+    for start in range(0, len(board_ids), REPORT_SNAPSHOT_BATCH_SIZE):
+        batch = board_ids[start:start + REPORT_SNAPSHOT_BATCH_SIZE]
+        if enqueue(db, "report_snapshots", {"week": week, "board_ids": batch},
+                   unique_key=f"report_snapshots:{week}:{batch[0]}") is not None:
+            batches += 1
+    db.commit()
+    return batches
+
+
+def snapshot_boards(db: Session, week: str, board_ids: list, progress=None) -> int:
+    created = 0
+    for done, board_id in enumerate(board_ids, start=1):
+        board = db.get(Board, board_id)
+        # Tableros borrados o desvinculados desde que se encoló el lote
+        if board is not None and board.user_id is not None and board.deleted_at is None:
+            created += generate_board_snapshots(db, board, week)
+        if progress is not None:
+            progress(done / len(board_ids), f"{done}/{len(board_ids)} tableros")
+    return created
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera los informes de una semana cerrada")
+    parser.add_argument("--week", help="Semana YYYY-Www (por defecto, la última cerrada)")
+    parser.add_argument("--inline", action="store_true", help="Genera aquí en lugar de encolar")
+    args = parser.parse_args()
+    if args.week and not week_is_closed(args.week):
+        parser.error(f"La semana {args.week} aún no está cerrada")
+    db = SessionLocal()
+    try:
+        if args.inline:
+            week = args.week or last_closed_week()
+            print(f"Informes generados: {snapshot_boards(db, week, _active_board_ids(db))}")
+        else:
+            jobs = schedule_weekly_reports(db, args.week)
+            print(f"Trabajos encolados: {[job.id for job in jobs]}" if jobs else "No había semanas pendientes")
+    finally:
+        db.close()
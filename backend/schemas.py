@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+import json
+
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 from datetime import datetime, date
 
@@ -53,10 +55,21 @@ class Card(CardBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    version: int = 0
+    total_hours: float = 0
+    subtasks_total: int = 0
+    subtasks_done: int = 0
+    labels_count: int = 0
 
     class Config:
         from_attributes = True
 
+class CardPage(BaseModel):
+    """Página de tarjetas con paginación por clave: ``next_cursor`` se pasa como
+    ``cursor`` para pedir la siguiente (None si no hay más)."""
+    items: List[Card]
+    next_cursor: Optional[str] = None
+
 # List Schemas
 class ListBase(BaseModel):
     title: str
@@ -67,6 +80,7 @@ class ListCreate(ListBase):
 class ListModel(ListBase):
     id: int
     board_id: int
+    version: int = 0
     cards: List[Card] = []
 
     class Config:
@@ -82,6 +96,7 @@ class BoardCreate(BoardBase):
 class Board(BoardBase):
     id: int
     user_id: int
+    version: int = 0
     lists: List[ListModel] = []
 
     class Config:
@@ -101,10 +116,30 @@ class Timesheet(TimesheetBase):
     id: int
     user_id: int
     created_at: datetime
+    version: int = 0
 
     class Config:
         from_attributes = True
 
+class TimesheetBulkCreate(BaseModel):
+    entries: List[TimesheetCreate] = Field(..., min_length=1, max_length=500)
+    # Cada (usuario, tarjeta, día) es una celda. upsert=False suma las horas a
+    # la celda; upsert=True sustituye su valor y hours=0 la vacía.
+    upsert: bool = False
+
+class TimesheetBulkResult(BaseModel):
+    index: int
+    status: str  # created | updated | deleted | unchanged | error
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class TimesheetBulkResponse(BaseModel):
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    errors: int = 0
+    results: List[TimesheetBulkResult] = []
+
 # Semana 6: Schemas para etiquetas (labels) y subtareas (checklists)
 
 class LabelBase(BaseModel):
@@ -117,6 +152,7 @@ class LabelCreate(LabelBase):
 class Label(LabelBase):
     id: int
     card_id: int
+    version: int = 0
 
     class Config:
         from_attributes = True
@@ -135,6 +171,71 @@ class SubtaskUpdate(BaseModel):
 class Subtask(SubtaskBase):
     id: int
     card_id: int
+    version: int = 0
+
+    class Config:
+        from_attributes = True
+
+# Sincronización incremental (/api/boards/{id}/changes)
+
+class ListChange(ListBase):
+    id: int
+    board_id: int
+    version: int = 0
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BoardDeletions(BaseModel):
+    lists: List[int] = []
+    cards: List[int] = []
+    labels: List[int] = []
+    subtasks: List[int] = []
+    timesheets: List[int] = []
+
+class BoardChanges(BaseModel):
+    board_id: int
+    title: str
+    since: int
+    version: int
+    full_reload: bool = False
+    lists: List[ListChange] = []
+    cards: List[Card] = []
+    labels: List[Label] = []
+    subtasks: List[Subtask] = []
+    timesheets: List[Timesheet] = []
+    deleted: BoardDeletions = BoardDeletions()
+
+# Cola de trabajos (/api/jobs)
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    progress: float
+    progress_message: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_validator("result", mode="before")
+    @classmethod
+    def _parse_result(cls, value):
+        # En la tabla el resultado se guarda como texto JSON
+        return json.loads(value) if isinstance(value, str) else value
+
+    @field_validator("error", mode="before")
+    @classmethod
+    def _error_summary(cls, value):
+        # La traza completa (con rutas del servidor) se queda en la tabla
+        if not value:
+            return value
+        return value.strip().splitlines()[-1]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,204 @@
+# single_flight.py - Un único cálculo para informes idénticos y simultáneos
+"""Cuando llegan a la vez muchas peticiones iguales (mismo endpoint, tablero,
+versión del tablero y parámetros), solo una calcula el informe y el resto
+reutiliza su resultado:
+
+- Dentro del proceso, los hilos que piden la misma clave esperan al primero.
+- Entre procesos, el primero toma un lease en ``report_leases`` (INSERT de la
+  clave; un lease caducado se puede robar con un UPDATE condicional). Los demás
+  lo marcan como esperado y sondean hasta que desaparece; el dueño, al
+  soltarlo, guarda el resultado en ``report_results`` solo si alguien espera.
+  Sin competencia no se escribe ningún resultado.
+
+La clave incluye ``Board.version``, que cambia con cualquier modificación del
+tablero, así que un resultado guardado nunca corresponde a datos anteriores.
+Los resultados se borran pasados ``REPORT_RESULT_TTL_SECONDS``.
+"""
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from config import REPORT_LEASE_SECONDS, REPORT_RESULT_TTL_SECONDS
+from database import SessionLocal
+from metrics import REPORT_COALESCING
+from models import ReportLease, ReportResult
+
+POLL_INTERVAL_SECONDS = 0.05
+_OWNER = uuid.uuid4().hex
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+_inflight: dict = {}
+_inflight_lock = threading.Lock()
+
+
+# --- Entre procesos: lease y resultado en la base de datos principal ---
+
+def _load_result(key: str) -> Optional[Any]:
+    db = SessionLocal()
+    try:
+        payload = db.execute(
+            select(ReportResult.payload).where(
+                ReportResult.key == key,
+                ReportResult.created_at >= datetime.utcnow() - timedelta(seconds=REPORT_RESULT_TTL_SECONDS),
+            )
+        ).scalar_one_or_none()
+    finally:
+        db.close()
+    return json.loads(payload) if payload is not None else None
+
+
+def _acquire_lease(key: str) -> bool:
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=REPORT_LEASE_SECONDS)
+    db = SessionLocal()
+    try:
+        db.add(ReportLease(key=key, owner=_OWNER, expires_at=expires_at))
+        try:
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+        # Ya hay lease: solo se puede tomar si ha caducado (su dueño murió)
+        stolen = db.execute(
+            update(ReportLease)
+            .where(ReportLease.key == key, ReportLease.expires_at < now)
+            .values(owner=_OWNER, expires_at=expires_at)
+        ).rowcount
+        db.commit()
+        return stolen == 1
+    finally:
+        db.close()
+
+
+def _release_lease(key: str, result: Any = None) -> None:
+    """Suelta el lease y, solo si otro proceso lo espera, guarda ``result`` en la
+    misma transacción: quien espera ve a la vez el lease libre y el resultado."""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        waiting = db.execute(
+            delete(ReportLease)
+            .where(ReportLease.key == key, ReportLease.owner == _OWNER)
+            .returning(ReportLease.waiting)
+        ).scalar_one_or_none()
+        if waiting and result is not None:
+            db.execute(delete(ReportResult).where(
+                ReportResult.created_at < now - timedelta(seconds=REPORT_RESULT_TTL_SECONDS)
+            ))
+            db.merge(ReportResult(key=key, payload=json.dumps(result), created_at=now))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _wait_on_lease(key: str) -> bool:
+    """Marca el lease como esperado. False si ya no existe o ha caducado."""
+    db = SessionLocal()
+    try:
+        marked = db.execute(
+            update(ReportLease)
+            .where(ReportLease.key == key, ReportLease.expires_at >= datetime.utcnow())
+            .values(waiting=True)
+        ).rowcount
+        db.commit()
+        return marked == 1
+    finally:
+        db.close()
+
+
+def _lease_held(key: str) -> bool:
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(ReportLease.key).where(ReportLease.key == key, ReportLease.expires_at >= datetime.utcnow())
+        ).first() is not None
+    finally:
+        db.close()
+
+
+def _compute_shared(key: str, compute: Callable[[], Any]) -> tuple:
+    """Devuelve (resultado, outcome) coordinándose con otros procesos.
+
+    Sin competencia cuesta dos escrituras (tomar y soltar el lease); el
+    resultado solo se guarda si otro proceso lo está esperando."""
+    deadline = time.monotonic() + REPORT_LEASE_SECONDS
+    while True:
+        if _acquire_lease(key):
+            result = None
+            try:
+                result = jsonable_encoder(compute())
+                return result, "leader"
+            finally:
+                _release_lease(key, result)
+        # Otro proceso lo calcula: esperamos su resultado mientras su lease siga vivo
+        if _wait_on_lease(key):
+            while _lease_held(key):
+                if time.monotonic() >= deadline:
+                    # El dueño del lease no termina: calculamos sin coordinar
+                    return jsonable_encoder(compute()), "leader"
+                time.sleep(POLL_INTERVAL_SECONDS)
+        cached = _load_result(key)
+        if cached is not None:
+            return cached, "shared"
+
+
+def coalesce(endpoint: str, key: str, compute: Callable[[], Any]) -> Any:
+    """Ejecuta ``compute`` una sola vez para todas las peticiones con ``key``."""
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+
+    if not leader:
+        call.done.wait()
+        REPORT_COALESCING.inc((endpoint, "joined"))
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result, outcome = _compute_shared(key, compute)
+        REPORT_COALESCING.inc((endpoint, outcome))
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+def single_flight(endpoint: str):
+    """Decorador para informes de un tablero. El parámetro ``board`` llega ya
+    con el acceso comprobado (report_router.report_board); su versión y el
+    resto de parámetros de la petición forman la clave."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(**kwargs):
+            board = kwargs["board"]
+            params = sorted(
+                (name, value) for name, value in kwargs.items() if name not in ("db", "current_user", "board")
+            )
+            key = f"{endpoint}:{board.version}:{json.dumps(params, default=str)}"
+            return coalesce(endpoint, key, lambda: func(**kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,197 @@
+# sql_profiler.py - Detector de N+1 y log de consultas lentas (solo desarrollo)
+"""Se activa con ``NEOCARE_SQL_PROFILE=1``. Por cada petición agrupa las
+sentencias idénticas y las cargas perezosas por relación (p. ej. ``Card.labels``)
+y avisa cuando alguna se repite ``N_PLUS_ONE_THRESHOLD`` veces o más. Las
+consultas que superan ``SLOW_QUERY_MS`` se registran con sus parámetros y su
+plan de ejecución.
+
+Para tests, ``assert_max_queries`` falla si un bloque supera un presupuesto de
+consultas::
+
+    with assert_max_queries(engine, 5):
+        client.get(f"/api/cards/?board_id={board_id}", headers=headers)
+
+``tests/test_query_budgets.py`` fija así el presupuesto de los endpoints calientes.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from config import SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger("neocare.sql")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestProfile:
+    __slots__ = ("statements", "lazy_loads")
+
+    def __init__(self):
+        self.statements: Counter = Counter()
+        self.lazy_loads: Counter = Counter()
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_sql_profile", default=None
+)
+
+# Grabadores activos de assert_max_queries (el cliente de tests ejecuta la app
+# en otro hilo, así que no podemos usar el contexto de la petición).
+_recorders: list = []
+_recorders_lock = threading.Lock()
+
+
+def _explain(cursor, dialect_name: str, statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        return "\n".join(" | ".join(str(col) for col in row) for row in explain_cursor.fetchall())
+    except Exception as e:  # El plan es informativo: nunca rompemos la petición
+        return f"(EXPLAIN no disponible: {e})"
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiler_start", []).append((context, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["profiler_start"].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.statements[statement] += 1
+    if _recorders:
+        with _recorders_lock:
+            for recorder in _recorders:
+                recorder.append(statement)
+
+    if elapsed_ms >= SLOW_QUERY_MS and not executemany and statement.lstrip().upper().startswith("SELECT"):
+        plan = _explain(cursor, conn.dialect.name, statement, parameters)
+        logger.warning(
+            "Consulta lenta (%.1f ms)\n%s\nParámetros: %r\nPlan:\n%s",
+            elapsed_ms, statement, parameters, plan,
+        )
+
+
+def _handle_error(exception_context):
+    # Si la sentencia falla no hay after_cursor_execute: se retira su inicio de la pila
+    conn = exception_context.connection
+    if conn is None:
+        return
+    starts = conn.info.get("profiler_start")
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+def _listen_cursor_events(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _remove_cursor_events(engine: Engine) -> None:
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+    event.remove(engine, "handle_error", _handle_error)
+
+
+def _do_orm_execute(orm_execute_state):
+    profile = _current_profile.get()
+    if profile is None or not orm_execute_state.is_relationship_load:
+        return
+    if orm_execute_state.lazy_loaded_from is None:
+        return
+    path = orm_execute_state.loader_strategy_path
+    if path is None or not path.path:
+        return
+    prop = path.path[-1]
+    profile.lazy_loads[f"{prop.parent.class_.__name__}.{prop.key}"] += 1
+
+
+def install(engine: Engine, session_factory: sessionmaker) -> None:
+    """Registra los hooks del perfilador en el engine y en las sesiones."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    _listen_cursor_events(engine)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+
+
+def _report(method: str, path: str, profile: RequestProfile) -> None:
+    for relationship, count in profile.lazy_loads.most_common():
+        if count < N_PLUS_ONE_THRESHOLD:
+            break
+        logger.warning(
+            "Posible N+1 en %s %s: relación %s cargada perezosamente %d veces "
+            "(usa selectinload/joinedload)",
+            method, path, relationship, count,
+        )
+    for statement, count in profile.statements.most_common():
+        if count < N_PLUS_ONE_THRESHOLD:
+            break
+        logger.warning(
+            "Sentencia repetida %d veces en %s %s:\n%s", count, method, path, statement
+        )
+
+
+class ProfilerMiddleware:
+    """Middleware ASGI que abre un perfil SQL por petición y lo analiza al final."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_profile.reset(token)
+            route = scope.get("route")
+            _report(scope["method"], route.path if route is not None else scope["path"], profile)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine, budget: int):
+    """Falla con ``QueryBudgetExceeded`` si el bloque ejecuta más de ``budget`` sentencias."""
+    install_counting = not event.contains(engine, "before_cursor_execute", _before_cursor_execute)
+    if install_counting:
+        _listen_cursor_events(engine)
+
+    statements: list = []
+    with _recorders_lock:
+        _recorders.append(statements)
+    try:
+        yield statements
+    finally:
+        with _recorders_lock:
+            _recorders.remove(statements)
+        if install_counting:
+            _remove_cursor_events(engine)
+
+    if len(statements) > budget:
+        grouped = "\n".join(
+            f"  {count}x {statement.splitlines()[0][:120]}"
+            for statement, count in Counter(statements).most_common()
+        )
+        raise QueryBudgetExceeded(
+            f"Se ejecutaron {len(statements)} consultas (presupuesto: {budget}):\n{grouped}"
+        )
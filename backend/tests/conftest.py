@@ -0,0 +1,117 @@
+# tests/conftest.py - Base de datos temporal y clientes de la API para las pruebas
+"""Las pruebas usan siempre una base SQLite temporal (nunca ``DATABASE_URL``),
+que se recrea antes de cada prueba. Desde backend/::
+
+    python -m pytest
+"""
+import os
+import sys
+import tempfile
+
+# database.py lee la configuración al importarse: se fija antes de importar la app
+_TMP_DIR = tempfile.mkdtemp(prefix="neocare-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_TMP_DIR, "neocare.db")
+os.environ.pop("DATABASE_REPLICA_URL", None)
+# Sin límites de tasa ni bus de cachés: cada prueba lee la base directamente
+os.environ["NEOCARE_ADMISSION"] = "0"
+os.environ["NEOCARE_CACHE_BUS"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+
+PASSWORD = "secreto"
+
+
+class Api:
+    """Cliente autenticado con atajos para crear tableros, listas y tarjetas."""
+
+    def __init__(self, client: TestClient, email: str):
+        self.client = client
+        client.post("/api/auth/register", json={"email": email, "password": PASSWORD})
+        response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        self.user_id = _user_id(email)
+
+    def request(self, method: str, url: str, **kwargs):
+        return self.client.request(method, url, headers=self.headers, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def board(self, title: str = "Tablero") -> dict:
+        response = self.post("/api/boards/", json={"title": title})
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    def list(self, board_id: int, title: str = "Lista") -> dict:
+        response = self.post("/api/lists/", json={"title": title, "board_id": board_id})
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    def card(self, list_id: int, title: str = "Tarjeta", **fields) -> dict:
+        payload = {"title": title, "list_id": list_id, "user_id": self.user_id, **fields}
+        response = self.post("/api/cards/", json=payload)
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    def changes(self, board_id: int, since: int) -> dict:
+        response = self.get(f"/api/boards/{board_id}/changes", params={"since": since})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+
+def _user_id(email: str) -> int:
+    from hot_queries import user_credentials
+
+    db = SessionLocal()
+    try:
+        return user_credentials(db, email).id
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_schema():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def api(client) -> Api:
+    return Api(client, "ana@example.com")
+
+
+@pytest.fixture
+def other_api(client) -> Api:
+    return Api(client, "luis@example.com")
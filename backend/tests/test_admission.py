@@ -0,0 +1,111 @@
+# tests/test_admission.py - Control de admisión por clase de endpoint (admission.py)
+"""conftest.py desactiva el middleware en la app; aquí se envuelve la app con
+límites pequeños. Los usuarios se crean con el cliente sin límites para que el
+registro y el login no gasten tokens."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from admission import AdmissionMiddleware
+
+LIMITS = {
+    "report": {"max_concurrent": 1, "max_queue": 1, "queue_timeout": 0.2, "rate": 0.01, "burst": 2},
+    "crud": {"max_concurrent": 4, "max_queue": 4, "queue_timeout": 0.2, "rate": 0.01, "burst": 2},
+}
+
+
+@pytest.fixture
+def limited():
+    return TestClient(AdmissionMiddleware(main.app, LIMITS))
+
+
+def _metric(body: str, line: str) -> bool:
+    return any(row.startswith(line) for row in body.splitlines())
+
+
+def test_empty_bucket_answers_429_only_to_that_user(api, other_api, limited):
+    for _ in range(2):
+        assert limited.get("/api/boards/", headers=api.headers).status_code == 200
+
+    response = limited.get("/api/boards/", headers=api.headers)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert limited.get("/api/boards/", headers=other_api.headers).status_code == 200
+
+
+def test_reports_and_crud_have_separate_buckets(api, limited):
+    board = api.board()
+    for _ in range(2):
+        assert limited.get("/api/boards/", headers=api.headers).status_code == 200
+    assert limited.get("/api/boards/", headers=api.headers).status_code == 429
+
+    response = limited.get(f"/report/{board['id']}/summary", headers=api.headers, params={"week": "2025-W10"})
+
+    assert response.status_code == 200, response.text
+
+
+def _scope(path: str = "/report/1/summary") -> dict:
+    return {"type": "http", "method": "GET", "path": path, "headers": [], "client": ("10.0.0.1", 1)}
+
+
+async def _call(middleware, scope) -> int:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    await middleware(scope, receive, send)
+    return sent[0]["status"]
+
+
+def test_full_queue_and_queue_timeout_answer_503(client):
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    limits = {name: dict(cfg, rate=1000, burst=1000) for name, cfg in LIMITS.items()}
+    middleware = AdmissionMiddleware(slow_app, limits)
+
+    async def scenario():
+        running = asyncio.create_task(_call(middleware, _scope()))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(_call(middleware, _scope()))
+        await asyncio.sleep(0.01)
+
+        # Una en curso y otra en cola: la siguiente no cabe
+        full = await _call(middleware, _scope())
+        metrics = (await asyncio.to_thread(client.get, "/api/metrics")).text
+        # La encolada agota su espera mientras la primera sigue ocupando el hueco
+        timed_out = await queued
+        release.set()
+        return full, timed_out, await running, metrics
+
+    full, timed_out, finished, metrics = asyncio.run(scenario())
+
+    assert (full, timed_out, finished) == (503, 503, 200)
+    assert _metric(metrics, 'neocare_admission_in_flight{endpoint_class="report"} 1')
+    assert _metric(metrics, 'neocare_admission_queue_depth{endpoint_class="report"} 1')
+    assert middleware.limiters["report"].in_flight == 0
+
+    body = client.get("/api/metrics").text
+    assert _metric(body, 'neocare_admission_rejected_total{endpoint_class="report",reason="queue_full"}')
+    assert _metric(body, 'neocare_admission_rejected_total{endpoint_class="report",reason="queue_timeout"}')
+    assert _metric(body, 'neocare_admission_queue_depth{endpoint_class="report"} 0')
+
+
+def test_rate_limit_rejections_are_counted(api, limited, client):
+    for _ in range(3):
+        limited.get("/api/boards/", headers=api.headers)
+
+    body = client.get("/api/metrics").text
+
+    assert _metric(body, 'neocare_admission_rejected_total{endpoint_class="crud",reason="rate_limited"}')
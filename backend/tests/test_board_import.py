@@ -0,0 +1,104 @@
+# tests/test_board_import.py - Importación de tableros desde CSV y Trello
+import io
+import os
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+
+import board_router
+from board_import import IMPORT_DIR, import_trello
+from card_activity import COMPLETED, CREATED
+from card_counters import reconcile_card_counters
+from job_queue import SUCCEEDED, claim_next, run_job
+from models import Card, CardActivity, Job, List as ListModel, Timesheet
+
+CSV = (
+    "lista;titulo;completada;completada_el;etiquetas;subtareas;horas;fecha\n"
+    "Por hacer;Escribir informe;;;urgente|cliente;Borrador|[x] Índice;2,5;03/03/2025\n"
+    "Hecho;Revisar contrato;sí;2025-03-05T10:00:00;;;1;04/03/2025\n"
+    "Hecho;Tarea antigua;sí;;;;;\n"
+)
+
+
+def _upload(api, content: bytes, filename="tareas.csv"):
+    return api.post("/api/boards/import", files={"file": (filename, content, "text/csv")})
+
+
+def _imports() -> set:
+    return set(os.listdir(IMPORT_DIR)) if os.path.isdir(IMPORT_DIR) else set()
+
+
+def _events(db, event_type) -> dict:
+    rows = db.query(Card.title, CardActivity.at).join(Card, Card.id == CardActivity.card_id)
+    return dict(rows.filter(CardActivity.event_type == event_type).all())
+
+
+def test_csv_import_runs_as_a_job(api, db):
+    response = _upload(api, CSV.encode("utf-8"))
+    assert response.status_code == 202, response.text
+    assert run_job(claim_next(db, "worker")) == SUCCEEDED
+
+    job = api.get(response.headers["Location"]).json()
+    board_id = job["result"]["board_id"]
+    lists = db.query(ListModel.title).filter(ListModel.board_id == board_id).order_by(ListModel.id)
+    assert [row.title for row in lists] == ["Por hacer", "Hecho"]
+    cards = {card["title"]: card for card in api.get("/api/cards/", params={"board_id": board_id}).json()}
+    assert cards["Escribir informe"]["labels_count"] == 2
+    assert (cards["Escribir informe"]["subtasks_total"], cards["Escribir informe"]["subtasks_done"]) == (2, 1)
+    assert [(row.date, row.hours) for row in db.query(Timesheet).order_by(Timesheet.date)] == [
+        (date(2025, 3, 3), 2.5), (date(2025, 3, 4), 1),
+    ]
+    assert reconcile_card_counters(db, fix=False) == 0
+
+
+def test_completed_event_uses_the_real_completion_time(api, db):
+    _upload(api, CSV.encode("utf-8"))
+    run_job(claim_next(db, "worker"))
+
+    assert set(_events(db, CREATED)) == {"Escribir informe", "Revisar contrato", "Tarea antigua"}
+    # Sin fecha de completada no se inventa el evento (caería en la semana de la importación)
+    assert _events(db, COMPLETED) == {"Revisar contrato": datetime(2025, 3, 5, 10)}
+    assert db.query(Card).filter(Card.completed.is_(True)).count() == 2
+
+
+def test_trello_completion_time_comes_from_the_last_activity(api, db):
+    data = {
+        "name": "Desde Trello",
+        "lists": [{"id": "l1", "name": "Hecho", "pos": 1}],
+        "cards": [
+            {"id": "5e0000000000000000000001", "idList": "l1", "name": "Cerrada", "pos": 1,
+             "dueComplete": True, "dateLastActivity": "2025-03-05T10:00:00.000Z"},
+            {"id": "5e0000000000000000000002", "idList": "l1", "name": "Abierta", "pos": 2,
+             "dateLastActivity": "2025-03-06T10:00:00.000Z"},
+        ],
+    }
+
+    import_trello(db, data, api.user_id)
+    db.commit()
+
+    assert _events(db, COMPLETED) == {"Cerrada": datetime(2025, 3, 5, 10)}
+
+
+def test_oversized_upload_is_rejected(api, db, monkeypatch):
+    monkeypatch.setattr(board_router, "IMPORT_MAX_BYTES", 100)
+    monkeypatch.setattr(board_router, "UPLOAD_CHUNK_BYTES", 16)
+    before = _imports()
+
+    response = _upload(api, CSV.encode("utf-8"))
+
+    assert response.status_code == 413
+    assert _imports() == before
+    assert db.query(Job).count() == 0
+
+
+def test_copy_stops_when_the_declared_size_was_missing(monkeypatch, tmp_path):
+    monkeypatch.setattr(board_router, "IMPORT_MAX_BYTES", 100)
+    monkeypatch.setattr(board_router, "UPLOAD_CHUNK_BYTES", 16)
+    path = tmp_path / "subida.csv"
+
+    with pytest.raises(HTTPException) as error:
+        board_router._save_upload(io.BytesIO(b"x" * 101), str(path))
+
+    assert error.value.status_code == 413
+    assert not path.exists()
@@ -0,0 +1,134 @@
+# tests/test_board_sync.py - Sincronización incremental (/api/boards/{id}/changes)
+
+
+def _ids(rows):
+    return sorted(row["id"] for row in rows)
+
+
+def test_changes_only_returns_rows_newer_than_since(api):
+    board = api.board()
+    lst = api.list(board["id"])
+    first = api.card(lst["id"], "Primera")
+    second = api.card(lst["id"], "Segunda")
+    since = api.changes(board["id"], 0)["version"]
+
+    api.put(f"/api/cards/{second['id']}", json={"title": "Segunda editada"})
+
+    changes = api.changes(board["id"], since)
+    assert changes["version"] == since + 1
+    assert [card["title"] for card in changes["cards"]] == ["Segunda editada"]
+    assert changes["lists"] == []
+    assert first["id"] not in _ids(changes["cards"])
+
+
+def test_full_snapshot_from_zero_and_nothing_when_up_to_date(api):
+    board = api.board()
+    lst = api.list(board["id"])
+    card = api.card(lst["id"])
+
+    changes = api.changes(board["id"], 0)
+    assert _ids(changes["lists"]) == [lst["id"]]
+    assert _ids(changes["cards"]) == [card["id"]]
+
+    current = api.changes(board["id"], changes["version"])
+    assert current["cards"] == [] and current["full_reload"] is False
+    # Un cliente por delante del servidor (p. ej. base restaurada) debe recargar
+    assert api.changes(board["id"], changes["version"] + 5)["full_reload"] is True
+
+
+def test_one_version_per_transaction(api):
+    board = api.board()
+    lst = api.list(board["id"])
+    cards = [api.card(lst["id"], f"T{n}") for n in range(4)]
+    since = api.changes(board["id"], 0)["version"]
+
+    # Mover la última al principio desplaza a todas las demás en la misma transacción
+    api.patch(f"/api/cards/{cards[-1]['id']}/move", json={"list_id": lst["id"], "new_order": 1})
+
+    changes = api.changes(board["id"], since)
+    assert changes["version"] == since + 1
+    assert _ids(changes["cards"]) == _ids(cards)
+    assert {card["version"] for card in changes["cards"]} == {since + 1}
+
+
+def test_children_are_versioned_with_their_board(api):
+    board = api.board()
+    card = api.card(api.list(board["id"])["id"])
+    since = api.changes(board["id"], 0)["version"]
+
+    label = api.post(f"/api/cards/{card['id']}/labels", json={"name": "urgente", "color": "red"}).json()
+    subtask = api.post(f"/api/cards/{card['id']}/subtasks", json={"title": "Revisar"}).json()
+    timesheet = api.post(
+        "/api/timesheets/",
+        json={"description": "Trabajo", "hours": 2, "date": "2025-03-03", "card_id": card["id"]},
+    ).json()
+
+    changes = api.changes(board["id"], since)
+    assert _ids(changes["labels"]) == [label["id"]]
+    assert _ids(changes["subtasks"]) == [subtask["id"]]
+    assert _ids(changes["timesheets"]) == [timesheet["id"]]
+
+
+def test_deletions_leave_tombstones(api):
+    board = api.board()
+    keep = api.list(board["id"], "Se queda")
+    doomed = api.list(board["id"], "Se borra")
+    card = api.card(keep["id"])
+    doomed_cards = [api.card(doomed["id"]), api.card(doomed["id"])]
+    label = api.post(f"/api/cards/{card['id']}/labels", json={"name": "x", "color": "red"}).json()
+    since = api.changes(board["id"], 0)["version"]
+
+    assert api.delete(f"/api/cards/labels/{label['id']}").status_code == 204
+    assert api.delete(f"/api/cards/{card['id']}").status_code == 204
+    assert api.delete(f"/api/lists/{doomed['id']}").status_code == 204
+
+    deleted = api.changes(board["id"], since)["deleted"]
+    assert deleted["labels"] == [label["id"]]
+    assert sorted(deleted["cards"]) == sorted([card["id"]] + _ids(doomed_cards))
+    assert deleted["lists"] == [doomed["id"]]
+    # Un cliente que ya conoce los borrados no los vuelve a recibir
+    latest = api.changes(board["id"], 0)["version"]
+    assert api.changes(board["id"], latest)["deleted"]["cards"] == []
+
+
+def test_moving_a_card_to_another_board(api):
+    source = api.board("Origen")
+    target = api.board("Destino")
+    source_list = api.list(source["id"])
+    target_list = api.list(target["id"])
+    card = api.card(source_list["id"])
+    label = api.post(f"/api/cards/{card['id']}/labels", json={"name": "x", "color": "red"}).json()
+    subtask = api.post(f"/api/cards/{card['id']}/subtasks", json={"title": "Paso"}).json()
+    source_since = api.changes(source["id"], 0)["version"]
+    target_since = api.changes(target["id"], 0)["version"]
+
+    response = api.patch(f"/api/cards/{card['id']}/move", json={"list_id": target_list["id"], "new_order": 1})
+    assert response.status_code == 200
+
+    # El origen la ve como borrada...
+    source_changes = api.changes(source["id"], source_since)
+    assert source_changes["deleted"]["cards"] == [card["id"]]
+    assert source_changes["cards"] == []
+    # ...y el destino la recibe con sus hijos, aunque estos no hayan cambiado
+    target_changes = api.changes(target["id"], target_since)
+    assert _ids(target_changes["cards"]) == [card["id"]]
+    assert _ids(target_changes["labels"]) == [label["id"]]
+    assert _ids(target_changes["subtasks"]) == [subtask["id"]]
+
+
+def test_moving_with_update_card_list_id(api):
+    source = api.board("Origen")
+    target = api.board("Destino")
+    card = api.card(api.list(source["id"])["id"])
+    target_list = api.list(target["id"])
+    source_since = api.changes(source["id"], 0)["version"]
+
+    api.put(f"/api/cards/{card['id']}", json={"list_id": target_list["id"]})
+
+    assert api.changes(source["id"], source_since)["deleted"]["cards"] == [card["id"]]
+    assert _ids(api.changes(target["id"], 0)["cards"]) == [card["id"]]
+
+
+def test_changes_of_another_users_board_are_not_visible(api, other_api):
+    board = api.board()
+    assert other_api.get(f"/api/boards/{board['id']}/changes", params={"since": 0}).status_code == 404
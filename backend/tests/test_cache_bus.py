@@ -0,0 +1,82 @@
+# tests/test_cache_bus.py - Publicación y poda del bus de invalidación
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+import cache_bus
+from database import engine
+from models import CacheInvalidation
+
+
+def _rename(api, board):
+    assert api.put(f"/api/boards/{board['id']}", json={"title": "Otro"}).status_code == 200
+
+
+def test_disabled_bus_publishes_nothing_to_the_table(api, db):
+    board = api.board()
+    _rename(api, board)
+
+    assert db.query(CacheInvalidation).count() == 0
+
+
+def test_enabled_bus_publishes_each_board_change(api, db, monkeypatch):
+    monkeypatch.setattr(cache_bus, "CACHE_BUS_ENABLED", True)
+    board = api.board()
+    _rename(api, board)
+
+    assert {(row.topic, row.key) for row in db.query(CacheInvalidation)} == {("board", str(board["id"]))}
+
+
+def test_prune_keeps_only_recent_invalidations(db):
+    old = datetime.utcnow() - timedelta(seconds=cache_bus.CACHE_BUS_RETENTION_SECONDS + 60)
+    db.add_all([
+        CacheInvalidation(topic="board", key="1", created_at=old),
+        CacheInvalidation(topic="board", key="2", created_at=datetime.utcnow()),
+    ])
+    db.commit()
+
+    assert cache_bus.prune_invalidations(db.connection()) == 1
+    db.commit()
+    assert [row.key for row in db.query(CacheInvalidation)] == ["2"]
+
+
+def test_listeners_must_implement_listen():
+    with pytest.raises(TypeError):
+        cache_bus._Listener()
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "la condición no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+def _publish_from_another_worker(key: str) -> None:
+    # Fila escrita por otro proceso: aquí solo llega a través del oyente
+    with engine.begin() as conn:
+        conn.execute(insert(CacheInvalidation).values(topic="test", key=key, created_at=datetime.utcnow()))
+
+
+@pytest.fixture
+def received(monkeypatch):
+    keys = []
+    monkeypatch.setitem(cache_bus._subscribers, "test", [keys.append])
+    cache_bus.start()
+    yield keys
+    cache_bus.stop()
+
+
+def test_invalidations_still_arrive_after_pruning_every_row(received, monkeypatch):
+    for key in ("1", "2", "3"):
+        _publish_from_another_worker(key)
+    _wait_until(lambda: received[-1:] == ["3"])
+
+    monkeypatch.setattr(cache_bus, "CACHE_BUS_RETENTION_SECONDS", -60)
+    with engine.begin() as conn:
+        assert cache_bus.prune_invalidations(conn) == 3
+    _publish_from_another_worker("4")
+
+    _wait_until(lambda: received[-1:] == ["4"])
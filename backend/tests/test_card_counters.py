@@ -0,0 +1,93 @@
+# tests/test_card_counters.py - Contadores desnormalizados de las tarjetas
+import pytest
+
+from card_archive import archive_completed_cards
+from card_counters import COUNTER_COLUMNS, reconcile_card_counters
+from models import ArchivedCard
+
+DAY = "2025-03-03"
+NEXT_DAY = "2025-03-04"
+
+
+@pytest.fixture
+def card(api):
+    return api.card(api.list(api.board()["id"])["id"])
+
+
+def _counters(api, card) -> dict:
+    response = api.get(f"/api/cards/{card['id']}")
+    assert response.status_code == 200, response.text
+    return {name: response.json()[name] for name in COUNTER_COLUMNS}
+
+
+def _hours(api, card) -> float:
+    return _counters(api, card)["total_hours"]
+
+
+def _log(api, card, hours, day=DAY):
+    return api.post("/api/timesheets/", json={"card_id": card["id"], "hours": hours, "date": day,
+                                              "description": "Trabajo"})
+
+
+def _bulk(api, *cells, upsert):
+    entries = [{"card_id": card["id"], "hours": hours, "date": day, "description": "Rejilla"}
+               for card, hours, day in cells]
+    response = api.post("/api/timesheets/bulk", json={"entries": entries, "upsert": upsert})
+    assert response.status_code == 200, response.text
+
+
+def test_logging_and_deleting_hours(api, db, card):
+    assert _log(api, card, 2).status_code == 201
+    assert _log(api, card, 1.5).status_code == 201
+    entry = _log(api, card, 1, NEXT_DAY).json()
+    assert _hours(api, card) == 4.5
+
+    assert _log(api, card, -0.5).status_code == 201
+    assert _hours(api, card) == 4
+
+    assert api.delete(f"/api/timesheets/{entry['id']}").status_code == 204
+    assert _hours(api, card) == 3
+    assert reconcile_card_counters(db, fix=False) == 0
+
+
+def test_bulk_adds_and_upsert_replaces(api, db, card):
+    _bulk(api, (card, 2, DAY), (card, 1, DAY), (card, 4, NEXT_DAY), upsert=False)
+    assert _hours(api, card) == 7
+
+    _bulk(api, (card, 5, DAY), upsert=True)
+    assert _hours(api, card) == 9
+
+    _bulk(api, (card, 0, NEXT_DAY), upsert=True)
+    assert _hours(api, card) == 5
+    assert reconcile_card_counters(db, fix=False) == 0
+
+
+def test_labels_and_subtasks(api, db, card):
+    label = api.post(f"/api/cards/{card['id']}/labels", json={"name": "Urgente", "color": "red"}).json()
+    done = api.post(f"/api/cards/{card['id']}/subtasks", json={"title": "Paso 1"}).json()
+    api.post(f"/api/cards/{card['id']}/subtasks", json={"title": "Paso 2"})
+    api.patch(f"/api/cards/subtasks/{done['id']}", json={"completed": True})
+    assert _counters(api, card) == {"total_hours": 0, "subtasks_total": 2, "subtasks_done": 1, "labels_count": 1}
+
+    assert api.delete(f"/api/cards/subtasks/{done['id']}").status_code == 204
+    assert api.delete(f"/api/cards/labels/{label['id']}").status_code == 204
+    assert _counters(api, card) == {"total_hours": 0, "subtasks_total": 1, "subtasks_done": 0, "labels_count": 0}
+    assert reconcile_card_counters(db, fix=False) == 0
+
+
+def test_archived_cards_keep_their_counters(api, db, card):
+    _log(api, card, 3)
+    api.post(f"/api/cards/{card['id']}/subtasks", json={"title": "Paso"})
+    counters = _counters(api, card)
+    api.put(f"/api/cards/{card['id']}", json={"completed": True})
+
+    assert archive_completed_cards(db, older_than_days=0) == 1
+
+    archived = db.get(ArchivedCard, card["id"])
+    assert {name: getattr(archived, name) for name in COUNTER_COLUMNS} == counters
+    assert reconcile_card_counters(db, fix=False) == 0
+
+
+def test_cannot_log_hours_on_another_users_card(api, other_api, card):
+    assert _log(other_api, card, 8).status_code == 404
+    assert _hours(api, card) == 0
@@ -0,0 +1,62 @@
+# tests/test_card_pages.py - Agenda y "mi trabajo" con paginación por clave
+import base64
+
+import pytest
+
+SAME_DAY = "2025-03-05T10:00:00"
+NEXT_DAY = "2025-03-06T10:00:00"
+RANGE = {"from": "2025-03-01T00:00:00", "to": "2025-03-31T00:00:00"}
+
+
+@pytest.fixture
+def lst(api):
+    return api.list(api.board()["id"])
+
+
+def _all_pages(api, url, **params) -> list:
+    ids, cursor = [], None
+    while True:
+        response = api.get(url, params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= 2
+        ids += [card["id"] for card in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_due_pages_keep_ties_on_the_due_date_in_order(api, lst):
+    # Tres tarjetas con la misma fecha: el id desempata entre páginas
+    tied = [api.card(lst["id"], f"Empate {n}", due_date=SAME_DAY)["id"] for n in range(3)]
+    later = [api.card(lst["id"], f"Después {n}", due_date=NEXT_DAY)["id"] for n in range(2)]
+    first = api.card(lst["id"], "Antes", due_date="2025-03-02T08:00:00")["id"]
+    api.card(lst["id"], "Fuera del rango", due_date="2025-04-02T08:00:00")
+
+    assert _all_pages(api, "/api/cards/due", **RANGE) == [first, *tied, *later]
+
+
+def test_assigned_to_me_pages_newest_first(api, other_api, lst):
+    mine = [api.card(lst["id"], f"Mía {n}")["id"] for n in range(5)]
+    other_api.card(other_api.list(other_api.board()["id"])["id"], "Ajena")
+
+    assert _all_pages(api, "/api/cards/assigned-to-me") == mine[::-1]
+
+
+def _b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("url, cursor", [
+    ("/api/cards/due", "no-es-un-cursor!"),
+    ("/api/cards/due", _b64("[5]")),
+    ("/api/cards/due", _b64('["ayer", 5]')),
+    ("/api/cards/due", _b64('{"a": 1, "b": 2}')),
+    ("/api/cards/assigned-to-me", _b64('["cinco"]')),
+    ("/api/cards/assigned-to-me", _b64("7")),
+])
+def test_corrupted_cursor_is_a_bad_request(api, url, cursor):
+    response = api.get(url, params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor no válido"
@@ -0,0 +1,19 @@
+# tests/test_db_maintenance.py - Mantenimiento de la base SQLite
+import pytest
+
+import db_maintenance
+from database import engine
+
+
+def test_uses_the_configured_sqlite_file():
+    assert db_maintenance.default_database_path() == engine.url.database
+
+
+def test_refuses_to_guess_the_file_for_other_databases(monkeypatch, capsys):
+    monkeypatch.setattr(db_maintenance, "SQLALCHEMY_DATABASE_URL", "postgresql://neocare@localhost/neocare")
+
+    with pytest.raises(SystemExit) as exit_info:
+        db_maintenance.main(["stats"])
+
+    assert exit_info.value.code == 2
+    assert "--database" in capsys.readouterr().err
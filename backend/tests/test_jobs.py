@@ -0,0 +1,95 @@
+# tests/test_jobs.py - Cola de trabajos y su consulta en /api/jobs
+import logging
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+import job_queue
+import job_worker
+from job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, claim_next, enqueue, run_job
+from models import Job
+
+
+def _expire(db, job_id: int, attempts: int) -> None:
+    db.query(Job).filter(Job.id == job_id).update({
+        "status": RUNNING,
+        "attempts": attempts,
+        "locked_by": "worker-caido",
+        "locked_until": datetime.utcnow() - timedelta(seconds=1),
+    })
+    db.commit()
+
+
+def test_expired_lease_is_retried_while_attempts_remain(db):
+    job = enqueue(db, "archive_cards", max_attempts=2)
+    db.commit()
+    _expire(db, job.id, attempts=1)
+
+    assert claim_next(db, "otro-worker") == job.id
+    db.refresh(job)
+    assert (job.status, job.attempts) == (RUNNING, 2)
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(db):
+    job = enqueue(db, "archive_cards", max_attempts=2)
+    db.commit()
+    _expire(db, job.id, attempts=2)
+
+    assert claim_next(db, "otro-worker") is None
+    db.refresh(job)
+    assert (job.status, job.attempts, job.locked_by) == (FAILED, 2, None)
+    assert job.error == job_queue.ABANDONED_ERROR
+
+
+def test_api_shows_only_the_last_line_of_the_traceback(api, db, monkeypatch):
+    def explode(payload, progress):
+        raise ValueError("No se pudo archivar")
+
+    monkeypatch.setitem(job_queue._HANDLERS, "archive_cards", explode)
+    job = enqueue(db, "archive_cards", user_id=api.user_id, max_attempts=2)
+    db.commit()
+
+    assert run_job(claim_next(db, "worker")) == QUEUED
+
+    db.refresh(job)
+    assert "Traceback" in job.error and __file__ in job.error
+    response = api.get(f"/api/jobs/{job.id}")
+    assert response.json()["error"] == "ValueError: No se pudo archivar"
+
+
+def _failed(error: Exception) -> Future:
+    future = Future()
+    future.set_exception(error)
+    return future
+
+
+def _crash_on_first_job(job_id: int) -> str:
+    # Se ejecuta en el proceso hijo: un fallo fuera de run_job (p. ej. al guardar)
+    if job_id == 1:
+        raise RuntimeError("La base de datos se ha caído")
+    return run_job(job_id)
+
+
+def test_a_failed_future_does_not_stop_the_worker(db, monkeypatch):
+    monkeypatch.setattr(job_worker, "run_job", _crash_on_first_job)
+    first, second = enqueue(db, "archive_cards"), enqueue(db, "archive_cards")
+    db.commit()
+
+    job_worker.run_worker(processes=1, once=True)
+
+    db.expire_all()
+    assert (db.get(Job, first.id).status, db.get(Job, second.id).status) == (RUNNING, SUCCEEDED)
+
+
+def test_collect_logs_each_failure_and_reports_a_broken_pool(caplog):
+    with caplog.at_level(logging.ERROR, logger="job_worker"):
+        assert not job_worker._collect({_failed(RuntimeError("uno"))})
+        assert job_worker._collect({_failed(RuntimeError("dos")), _failed(BrokenProcessPool())})
+
+    assert len(caplog.records) == 3
+
+
+def test_delete_board_documents_both_responses(client):
+    responses = client.get("/openapi.json").json()["paths"]["/api/boards/{board_id}"]["delete"]["responses"]
+
+    assert {"202", "204"} <= set(responses)
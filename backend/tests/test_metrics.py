@@ -0,0 +1,24 @@
+# tests/test_metrics.py - Métricas por ruta y hooks de consultas (metrics.py)
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database import engine
+
+
+def test_metrics_are_labelled_by_route_template(api):
+    board = api.board()
+    api.get(f"/api/lists/by-board/{board['id']}")
+
+    body = api.client.get("/api/metrics").text
+    assert 'neocare_http_requests_total{method="GET",route="/api/lists/by-board/{board_id}",status="200"} 1' in body
+    assert 'neocare_request_db_queries_count{method="GET",route="/api/lists/by-board/{board_id}"} 1' in body
+
+
+def test_failed_statement_does_not_leak_its_start_time():
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM tabla_inexistente"))
+        conn.rollback()
+        conn.execute(text("SELECT 1"))
+        assert conn.info.get("query_start") == []
@@ -0,0 +1,60 @@
+# tests/test_migrations.py - Bases creadas antes de las migraciones (esquema 0001)
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from conftest import Api
+from database import BASE_DIR, Base, engine
+from models import Label, Subtask, Timesheet
+
+
+def _alembic() -> Config:
+    # Sin alembic.ini: su configuración de logging silenciaría los de las pruebas
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    return config
+
+
+@pytest.fixture
+def baseline():
+    """Base en el esquema 0001, con claves foráneas sin ON DELETE CASCADE."""
+    Base.metadata.drop_all(engine)
+    command.upgrade(_alembic(), "0001")
+    yield
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+
+
+def _seed(conn) -> None:
+    conn.execute(text("INSERT INTO boards (id, title) VALUES (1, 'Antiguo')"))
+    conn.execute(text("INSERT INTO lists (id, title, board_id) VALUES (1, 'Se borra', 1), (2, 'Se queda', 1)"))
+    conn.execute(text(
+        'INSERT INTO cards (id, title, list_id, "order", completed, overdue) '
+        "VALUES (1, 'En lista borrada', 1, 1, 0, 0), (2, 'Se borra sola', 2, 1, 0, 0)"
+    ))
+    for card_id in (1, 2):
+        conn.execute(text(f"INSERT INTO labels (card_id, name, color) VALUES ({card_id}, 'x', 'red')"))
+        conn.execute(text(f"INSERT INTO subtasks (card_id, title, completed) VALUES ({card_id}, 'Paso', 0)"))
+        conn.execute(text(
+            f"INSERT INTO timesheets (card_id, description, hours, date) VALUES ({card_id}, 'T', 1, '2025-03-03')"
+        ))
+
+
+def test_upgraded_baseline_cascades_card_and_list_deletes(baseline, client, db):
+    with engine.begin() as conn:
+        _seed(conn)
+    command.upgrade(_alembic(), "head")
+
+    api = Api(client, "ana@example.com")
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE boards SET user_id = :user_id"), {"user_id": api.user_id})
+
+    assert api.delete("/api/cards/2").status_code == 204
+    assert api.delete("/api/lists/1").status_code == 204
+
+    for model in (Label, Subtask, Timesheet):
+        assert db.query(model).count() == 0
+    assert [row["title"] for row in api.get("/api/lists/by-board/1").json()] == ["Se queda"]
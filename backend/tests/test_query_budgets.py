@@ -0,0 +1,78 @@
+# tests/test_query_budgets.py - Presupuesto de consultas de los endpoints calientes
+"""Cada endpoint debe ejecutar un número fijo de consultas, sin importar cuántas
+listas, tarjetas o hijos tenga el tablero. Un N+1 nuevo (una carga perezosa
+por fila) supera el presupuesto y la prueba falla con las sentencias repetidas.
+
+Los presupuestos incluyen la consulta del usuario autenticado."""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database import engine
+from models import Board, Card, Label, List as ListModel, Subtask, Timesheet
+from sql_profiler import assert_max_queries
+
+LISTS = 3
+CARDS_PER_LIST = 3
+WEEK = "2025-W10"
+
+
+@pytest.fixture
+def board(api, db):
+    board = Board(title="Tablero", user_id=api.user_id)
+    db.add(board)
+    for _ in range(LISTS):
+        lst = ListModel(title="Lista", board=board)
+        for order in range(CARDS_PER_LIST):
+            card = Card(
+                title="Tarea", list_ref=lst, user_id=api.user_id, order=order, due_date=datetime(2030, 1, 15, 9)
+            )
+            card.labels.append(Label(name="x", color="red"))
+            card.subtasks.append(Subtask(title="Paso"))
+            card.timesheets.append(
+                Timesheet(description="Trabajo", hours=1, date=date(2025, 3, 4), user_id=api.user_id)
+            )
+            db.add(card)
+    db.commit()
+    return {"id": board.id, "list_id": lst.id, "card_id": card.id}
+
+
+BUDGETS = [
+    ("/api/boards/", 4),
+    ("/api/lists/by-board/{id}", 4),
+    ("/api/cards/?board_id={id}", 2),
+    ("/api/cards/by-list/{list_id}", 3),
+    ("/api/cards/search?board_id={id}&query=Tarea", 2),
+    ("/api/cards/{card_id}", 2),
+    ("/api/cards/{card_id}/labels", 3),
+    ("/api/cards/{card_id}/subtasks", 3),
+    ("/api/cards/due?from=2030-01-01T00:00:00&to=2030-02-01T00:00:00", 2),
+    ("/api/cards/assigned-to-me", 2),
+    ("/api/timesheets/me", 2),
+    ("/api/boards/{id}/changes?since=0", 8),
+    ("/report/{id}/summary?week=" + WEEK, 8),
+    ("/report/{id}/hours-by-user?week=" + WEEK, 6),
+    ("/report/{id}/hours-by-card?week=" + WEEK, 5),
+    ("/report/{id}/trend?from=2025-W08&to=" + WEEK, 8),
+    ("/report/{id}/weeks-available", 3),
+    ("/report/portfolio?week=" + WEEK, 6),
+]
+
+
+@pytest.mark.parametrize("url, budget", BUDGETS, ids=[url for url, _ in BUDGETS])
+def test_hot_endpoint_stays_within_query_budget(api, board, url, budget):
+    with assert_max_queries(engine, budget):
+        response = api.get(url.format(**board))
+    assert response.status_code == 200, response.text
+
+
+def test_failed_statement_does_not_leak_its_start_time():
+    with engine.connect() as conn, assert_max_queries(engine, 5) as statements:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM tabla_inexistente"))
+        conn.rollback()
+        conn.execute(text("SELECT 1"))
+        assert conn.info.get("profiler_start") == []
+    assert statements == ["SELECT 1"]
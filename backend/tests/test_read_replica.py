@@ -0,0 +1,83 @@
+# tests/test_read_replica.py - Lecturas contra una réplica SQLite local
+"""La réplica es una copia del fichero de la base temporal (replica_sync.py):
+lo que se escribe después de copiarla no llega hasta la siguiente copia."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import db_router
+import main
+from conftest import Api
+from database import engine
+from replica_sync import sync_replica
+from sql_profiler import assert_max_queries
+
+
+@pytest.fixture
+def client():
+    # main.py solo añade el middleware si hay réplica al arrancar
+    return TestClient(db_router.ReadYourWritesMiddleware(main.app))
+
+
+@pytest.fixture
+def replica(api, client, tmp_path, monkeypatch):
+    """Activa la réplica y devuelve la función que la pone al día."""
+    path = str(tmp_path / "replica.db")
+    replica_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(db_router, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica_engine))
+    monkeypatch.setattr(db_router, "_last_write_by_user", {})
+    monkeypatch.setattr(db_router, "_replica_down_until", 0.0)
+
+    def sync():
+        sync_replica(engine.url.database, path)
+        # Sin la marca de escritura reciente, las lecturas van a la réplica
+        db_router._last_write_by_user.clear()
+        client.cookies.clear()
+
+    yield sync
+    replica_engine.dispose()
+
+
+def _rename_on_primary(board_id: int, title: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE boards SET title = :title WHERE id = :id"), {"title": title, "id": board_id})
+
+
+def test_read_endpoints_never_touch_the_primary(api, replica):
+    board = api.board("En la réplica")
+    replica()
+    _rename_on_primary(board["id"], "Solo en el primario")
+
+    # Ni el endpoint ni la autenticación abren una sesión en el primario
+    with assert_max_queries(engine, 0):
+        response = api.get("/api/boards/")
+
+    assert [row["title"] for row in response.json()] == ["En la réplica"]
+
+
+def test_recent_writers_read_their_own_writes(api, replica):
+    replica()
+    board = api.board("Recién creado")
+
+    assert [row["id"] for row in api.get("/api/boards/").json()] == [board["id"]]
+
+
+def test_login_does_not_send_reads_to_the_primary(api, client, replica):
+    replica()
+
+    response = client.post("/api/auth/login", json={"email": "ana@example.com", "password": "secreto"})
+
+    assert db_router.LAST_WRITE_COOKIE not in response.cookies
+    assert db_router._last_write_by_user == {}
+
+
+def test_user_missing_from_the_replica_is_read_from_the_primary(client, replica):
+    replica()
+    newcomer = Api(client, "nuevo@example.com")
+    replica_cookies = dict(client.cookies)
+
+    response = newcomer.get("/api/boards/")
+
+    assert response.status_code == 200, response.text
+    assert replica_cookies == {}
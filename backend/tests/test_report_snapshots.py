@@ -0,0 +1,60 @@
+# tests/test_report_snapshots.py - Informes pregenerados de semanas cerradas
+import json
+from datetime import datetime, timedelta
+
+from card_activity import COMPLETED
+from job_queue import enqueue
+from models import Board, CardActivity, Job, ReportSnapshot
+from report_snapshots import (
+    SNAPSHOT_KINDS, generate_board_snapshots, last_closed_week, load_snapshot, pending_closed_weeks,
+    schedule_weekly_reports,
+)
+
+WEEK = "2025-W10"
+
+
+def _enqueue_week(db, week):
+    enqueue(db, "weekly_reports", {"week": week}, unique_key=f"weekly_reports:{week}")
+    db.commit()
+
+
+def _weeks(jobs):
+    return [json.loads(job.payload)["week"] for job in jobs]
+
+
+def test_snapshots_only_freeze_week_scoped_reports(api, db):
+    board = api.board()
+    lst = api.list(board["id"])
+    done_in_week = api.card(lst["id"], "Completada en la semana")
+    done_today = api.card(lst["id"], "Completada hoy")
+    db.add(CardActivity(board_id=board["id"], card_id=done_in_week["id"], event_type=COMPLETED, at=datetime(2025, 3, 5)))
+    db.commit()
+    api.put(f"/api/cards/{done_today['id']}", json={"completed": True})
+
+    assert generate_board_snapshots(db, db.get(Board, board["id"]), WEEK) == len(SNAPSHOT_KINDS)
+
+    assert {row.kind for row in db.query(ReportSnapshot)} == {"summary", "hours-by-user"}
+    summary = load_snapshot(db, board["id"], "summary", WEEK)
+    assert [row["id"] for row in summary["completed"]] == [done_in_week["id"]]
+
+
+def test_first_schedule_enqueues_the_last_closed_week(db):
+    assert _weeks(schedule_weekly_reports(db)) == [last_closed_week()]
+    assert schedule_weekly_reports(db) == []
+
+
+def test_schedule_backfills_every_missing_closed_week(db):
+    _enqueue_week(db, "2026-W50")
+
+    assert pending_closed_weeks(db, now=datetime(2027, 1, 13)) == ["2026-W51", "2026-W52", "2026-W53", "2027-W01"]
+
+
+def test_schedule_enqueues_each_pending_week_once(db):
+    now = datetime.utcnow()
+    _enqueue_week(db, last_closed_week(now - timedelta(weeks=2)))
+
+    jobs = schedule_weekly_reports(db)
+
+    assert _weeks(jobs) == [last_closed_week(now - timedelta(weeks=1)), last_closed_week(now)]
+    assert schedule_weekly_reports(db) == []
+    assert db.query(Job).filter(Job.kind == "weekly_reports").count() == 3
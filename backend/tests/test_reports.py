@@ -0,0 +1,200 @@
+# tests/test_reports.py - Informes semanales por tablero
+from datetime import datetime
+
+import pytest
+
+from card_activity import COMPLETED, CREATED, OVERDUE
+from card_archive import archive_completed_cards
+from models import Card, CardActivity
+from report_router import DEBUG_SAMPLE_SIZE, MAX_TREND_WEEKS
+
+WEEK = "2025-W10"
+IN_WEEK = datetime(2025, 3, 5, 10)
+LATER = datetime(2025, 3, 20, 10)
+
+
+@pytest.fixture
+def board(api):
+    return api.board()
+
+
+def _summary(api, board, week=WEEK):
+    response = api.get(f"/report/{board['id']}/summary", params={"week": week})
+    assert response.status_code == 200, response.text
+    return {kind: [row["id"] for row in response.json()[kind]] for kind in ("created", "completed", "overdue")}
+
+
+def _event(db, board, card, event_type, at):
+    db.add(CardActivity(board_id=board["id"], card_id=card["id"], event_type=event_type,
+                        to_list_id=card["list_id"], at=at))
+
+
+def test_summary_lists_only_the_events_of_the_week(api, db, board):
+    lst = api.list(board["id"])
+    this_week = api.card(lst["id"], "Completada en la semana")
+    later = api.card(lst["id"], "Completada después")
+    _event(db, board, this_week, CREATED, IN_WEEK)
+    _event(db, board, this_week, COMPLETED, IN_WEEK)
+    _event(db, board, later, OVERDUE, LATER)
+    _event(db, board, later, COMPLETED, LATER)
+    db.commit()
+    # Hoy ambas están completadas y una vencida, pero eso no es de la semana pedida
+    for card in (this_week, later):
+        api.put(f"/api/cards/{card['id']}", json={"completed": True})
+
+    assert _summary(api, board) == {"created": [this_week["id"]], "completed": [this_week["id"]], "overdue": []}
+
+
+def test_moving_into_the_done_list_counts_as_completed(api, board):
+    todo = api.list(board["id"], "Por hacer")
+    done = api.list(board["id"], "Hecho")
+    card = api.card(todo["id"])
+    api.patch(f"/api/cards/{card['id']}/move", json={"list_id": done["id"], "new_order": 1})
+
+    current = "{}-W{:02d}".format(*datetime.utcnow().isocalendar()[:2])
+    summary = _summary(api, board, current)
+    assert summary["created"] == [card["id"]]
+    assert summary["completed"] == [card["id"]]
+    assert _summary(api, board)["completed"] == []
+
+
+@pytest.mark.parametrize("report", ["summary", "hours-by-user", "hours-by-card", "weeks-available"])
+def test_reports_of_another_users_board_are_forbidden(other_api, board, report):
+    # La semana está cerrada: tampoco se sirve desde el snapshot
+    response = other_api.get(f"/report/{board['id']}/{report}", params={"week": WEEK})
+
+    assert response.status_code == 403
+
+
+def test_debug_counts_every_card_but_samples_only_the_first(api, db, board):
+    todo, done = api.list(board["id"], "Por hacer"), api.list(board["id"], "Hecho")
+    cards = [api.card(todo["id"], f"Tarea {n}") for n in range(DEBUG_SAMPLE_SIZE + 2)]
+    finished = api.card(done["id"], "Terminada", due_date="2025-03-07T10:00:00")
+    api.put(f"/api/cards/{finished['id']}", json={"completed": True})
+    api.put(f"/api/cards/{cards[0]['id']}", json={"overdue": True, "due_date": "2025-03-01T10:00:00"})
+    entries = [{"card_id": cards[0]["id"], "hours": 1, "date": f"2025-03-{day:02d}", "description": "Trabajo"}
+               for day in range(1, DEBUG_SAMPLE_SIZE + 3)]
+    assert api.post("/api/timesheets/bulk", json={"entries": entries, "upsert": False}).status_code == 200
+    # Una tarjeta sin cambios desde hace meses
+    old = datetime(2025, 1, 1)
+    db.query(Card).filter(Card.id == cards[1]["id"]).update({"created_at": old, "updated_at": old})
+    db.commit()
+
+    response = api.get(f"/report/debug/{board['id']}")
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [(row["title"], row["card_count"]) for row in data["lists"]] == [("Por hacer", 22), ("Hecho", 1)]
+    assert data["total_cards"] == 23
+    assert data["statistics"] == {
+        "cards_with_due_date": 2,
+        "cards_completed": 1,
+        "cards_overdue": 1,
+        "cards_in_done_list": 1,
+        "cards_updated_last_week": 22,
+        "cards_created_last_week": 22,
+    }
+    assert [row["id"] for row in data["cards_sample"]] == [card["id"] for card in cards[:DEBUG_SAMPLE_SIZE]]
+    assert len(data["timesheets_sample"]) == DEBUG_SAMPLE_SIZE
+    assert data["total_timesheets"] == DEBUG_SAMPLE_SIZE + 2
+
+
+def _trend(api, board, start, end):
+    return api.get(f"/report/{board['id']}/trend", params={"from": start, "to": end})
+
+
+def test_trend_buckets_by_iso_week_across_the_year_boundary(api, db, board):
+    card = api.card(api.list(board["id"])["id"])
+    # El lunes 2024-12-30 pertenece a 2025-W01
+    db.query(Card).filter(Card.id == card["id"]).update({"created_at": datetime(2024, 12, 30, 9)})
+    _event(db, board, card, COMPLETED, datetime(2024, 12, 29, 23))
+    _event(db, board, card, OVERDUE, datetime(2025, 1, 6, 8))
+    db.commit()
+    entries = [{"card_id": card["id"], "hours": hours, "date": day, "description": "Trabajo"}
+               for day, hours in (("2024-12-23", 1), ("2024-12-30", 2), ("2025-01-05", 3))]
+    assert api.post("/api/timesheets/bulk", json={"entries": entries, "upsert": False}).status_code == 200
+
+    response = _trend(api, board, "2024-W52", "2025-W02")
+
+    assert response.status_code == 200, response.text
+    weeks = [(w["week"], w["week_start"], w["created"], w["completed"], w["overdue"], w["total_hours"])
+             for w in response.json()["weeks"]]
+    assert weeks == [
+        ("2024-W52", "2024-12-23", 0, 1, 0, 1),
+        ("2025-W01", "2024-12-30", 1, 0, 0, 5),
+        ("2025-W02", "2025-01-06", 0, 0, 1, 0),
+    ]
+
+
+def test_trend_rejects_reversed_or_too_long_ranges(api, board):
+    assert _trend(api, board, "2025-W10", "2025-W09").status_code == 400
+    assert _trend(api, board, "2023-W01", "2024-W52").status_code == 200  # 104 semanas
+    response = _trend(api, board, "2023-W01", "2025-W01")
+
+    assert response.status_code == 400
+    assert str(MAX_TREND_WEEKS) in response.json()["detail"]
+
+
+def _log(api, card, hours, day="2025-03-05"):
+    entry = {"card_id": card["id"], "hours": hours, "date": day, "description": "Trabajo"}
+    assert api.post("/api/timesheets/bulk", json={"entries": [entry], "upsert": False}).status_code == 200
+
+
+def test_portfolio_groups_the_users_boards_and_skips_other_users(api, other_api, db, board):
+    second = api.board("Segundo")
+    first_list = api.list(board["id"])
+    done, open_card = api.card(first_list["id"], "Hecha"), api.card(first_list["id"], "Abierta")
+    late = api.card(api.list(second["id"])["id"], "Vencida")
+    foreign_board = other_api.board("Ajeno")
+    foreign = other_api.card(other_api.list(foreign_board["id"])["id"])
+    api.put(f"/api/cards/{done['id']}", json={"completed": True})
+    _event(db, board, done, CREATED, IN_WEEK)
+    _event(db, board, done, COMPLETED, IN_WEEK)
+    _event(db, second, late, OVERDUE, IN_WEEK)
+    _event(db, foreign_board, foreign, CREATED, IN_WEEK)
+    db.commit()
+    _log(api, done, 2)
+    _log(api, open_card, 1)
+    _log(api, late, 4)
+    _log(other_api, foreign, 8)
+
+    response = api.get("/report/portfolio", params={"week": WEEK})
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    rows = [(b["board_title"], b["total_cards"], b["open_cards"], b["created"], b["completed"], b["overdue"],
+             b["total_hours"], b["timesheet_entries"]) for b in data["boards"]]
+    assert rows == [("Tablero", 2, 1, 1, 1, 0, 3, 2), ("Segundo", 1, 1, 0, 0, 1, 4, 1)]
+    assert data["totals"] == {"boards": 2, "total_cards": 3, "open_cards": 2, "created": 1, "completed": 1,
+                              "overdue": 1, "total_hours": 7}
+    assert [(u["user_email"], u["total_hours"], u["boards_count"]) for u in data["hours_by_user"]] == [
+        ("ana@example.com", 7, 2),
+    ]
+    # Las nuevas cuentan igual que en /summary: por el evento, no por created_at
+    assert data["boards"][0]["created"] == len(_summary(api, board)["created"])
+
+
+def _weeks(api, board, include_archived=False):
+    response = api.get(f"/report/{board['id']}/weeks-available", params={"include_archived": include_archived})
+    assert response.status_code == 200, response.text
+    return response.json()["available_weeks"]
+
+
+def test_weeks_available_include_archived_rows_only_on_request(api, db, board):
+    lst = api.list(board["id"])
+    live, old = api.card(lst["id"], "Viva"), api.card(lst["id"], "Antigua")
+    _log(api, live, 1, "2025-03-05")
+    _log(api, old, 2, "2024-11-05")
+    api.put(f"/api/cards/{old['id']}", json={"completed": True})
+    db.query(Card).filter(Card.id == old["id"]).update(
+        {"created_at": datetime(2024, 10, 1), "updated_at": datetime(2024, 10, 8)}
+    )
+    db.commit()
+    assert archive_completed_cards(db, older_than_days=30) == 1
+    current = "{}-W{:02d}".format(*datetime.utcnow().isocalendar()[:2])
+
+    assert _weeks(api, board) == sorted({current, "2025-W10"}, reverse=True)
+    # Creación, última actualización y horas de la tarjeta archivada
+    assert _weeks(api, board, include_archived=True) == sorted(
+        {current, "2025-W10", "2024-W45", "2024-W41", "2024-W40"}, reverse=True
+    )
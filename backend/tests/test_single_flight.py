@@ -0,0 +1,91 @@
+# tests/test_single_flight.py - Coalescencia de informes dentro y entre procesos
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import single_flight
+from models import ReportLease, ReportResult
+
+KEY = "summary:1:[]"
+
+
+def _run_in_thread(compute):
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(result=single_flight.coalesce("summary", KEY, compute)))
+    thread.start()
+    return thread, outcome
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "la condición no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+def _lease_waiting(db) -> bool:
+    db.rollback()  # lectura nueva, fuera de la transacción anterior
+    return db.query(ReportLease.waiting).filter(ReportLease.key == KEY).scalar()
+
+
+def test_uncontended_report_leaves_nothing_behind(db):
+    assert single_flight.coalesce("summary", KEY, lambda: {"total": 1}) == {"total": 1}
+
+    assert db.query(ReportLease).count() == 0
+    assert db.query(ReportResult).count() == 0
+
+
+def test_concurrent_requests_in_one_process_compute_once():
+    started, release, calls = threading.Event(), threading.Event(), []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"total": 1}
+
+    leader, leader_out = _run_in_thread(compute)
+    started.wait(5)
+    joiner, joiner_out = _run_in_thread(compute)
+    time.sleep(0.1)  # el segundo hilo se une al cálculo en curso
+    release.set()
+    leader.join(5)
+    joiner.join(5)
+
+    assert calls == [1]
+    assert leader_out["result"] == joiner_out["result"] == {"total": 1}
+
+
+def test_leader_stores_the_result_only_for_waiting_processes(db):
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        return {"total": 2}
+
+    leader, _ = _run_in_thread(compute)
+    started.wait(5)
+    # Otro proceso llega mientras tanto y marca el lease como esperado
+    assert single_flight._wait_on_lease(KEY)
+    release.set()
+    leader.join(5)
+
+    assert db.query(ReportLease).count() == 0
+    assert json.loads(db.get(ReportResult, KEY).payload) == {"total": 2}
+
+
+def test_waits_for_the_process_holding_the_lease(db):
+    db.add(ReportLease(key=KEY, owner="otro-proceso", expires_at=datetime.utcnow() + timedelta(seconds=30)))
+    db.commit()
+    waiter, outcome = _run_in_thread(lambda: {"total": "calculado aquí"})
+    _wait_until(lambda: _lease_waiting(db))
+
+    # El otro proceso termina: suelta el lease y deja el resultado a la vez
+    db.query(ReportLease).delete()
+    db.add(ReportResult(key=KEY, payload=json.dumps({"total": "compartido"}), created_at=datetime.utcnow()))
+    db.commit()
+    waiter.join(5)
+
+    assert outcome["result"] == {"total": "compartido"}
@@ -0,0 +1,127 @@
+# tests/test_timesheet_partitions.py - Particiones mensuales de timesheets
+"""Las pruebas de PostgreSQL necesitan ``NEOCARE_TEST_POSTGRES_URL`` apuntando a
+una base de pruebas: se vacía al empezar y al terminar. Sin ella se omiten."""
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import ArchivedTimesheet, Board, Card, List as ListModel, Timesheet, User
+from timesheet_partitions import (
+    DEFAULT_PARTITION, check_pruning, convert_to_partitioned, detach_partitions, ensure_partitions,
+    is_partitioned, list_partitions, revert_to_plain,
+)
+
+POSTGRES_URL = os.getenv("NEOCARE_TEST_POSTGRES_URL")
+needs_postgres = pytest.mark.skipif(not POSTGRES_URL, reason="NEOCARE_TEST_POSTGRES_URL no está definida")
+
+JANUARY = date(2025, 1, 15)
+MARCH = date(2025, 3, 5)
+
+
+@pytest.fixture
+def pg():
+    pg_engine = create_engine(POSTGRES_URL)
+    Base.metadata.drop_all(pg_engine)
+    Base.metadata.create_all(pg_engine)
+    with Session(pg_engine) as session:
+        user = User(email="ana@example.com", hashed_password="x")
+        card = Card(title="Tarea", order=1, user=user,
+                    list_ref=ListModel(title="Lista", board=Board(title="Tablero", owner=user)))
+        session.add_all([
+            Timesheet(description="Enero", hours=1, date=JANUARY, user=user, card=card),
+            Timesheet(description="Marzo", hours=2, date=MARCH, user=user, card=card),
+        ])
+        session.commit()
+    yield pg_engine
+    Base.metadata.drop_all(pg_engine)
+    pg_engine.dispose()
+
+
+def _hours(conn, table) -> float:
+    return conn.execute(select(func.sum(table.hours))).scalar()
+
+
+@needs_postgres
+def test_converted_table_prunes_partitions_by_date(pg):
+    with pg.begin() as conn:
+        assert convert_to_partitioned(conn)
+        assert not convert_to_partitioned(conn)
+        ensure_partitions(conn, months_ahead=0, today=MARCH)
+
+        assert {name for name, _ in list_partitions(conn)} >= {
+            "timesheets_2025_01", "timesheets_2025_03", DEFAULT_PARTITION,
+        }
+        ok, scanned, _ = check_pruning(conn, date(2025, 3, 3), date(2025, 3, 9))
+        assert ok and scanned == {"timesheets_2025_03"}
+        assert _hours(conn, Timesheet) == 3
+
+
+@needs_postgres
+def test_converted_table_keeps_the_unique_cell(pg):
+    with pg.begin() as conn:
+        convert_to_partitioned(conn)
+        repeat = text(
+            "INSERT INTO timesheets (description, hours, date, version, user_id, card_id) "
+            "SELECT 'Repetida', 1, date, 0, user_id, card_id FROM timesheets WHERE date = :day"
+        )
+        with pytest.raises(IntegrityError), conn.begin_nested():
+            conn.execute(repeat, {"day": MARCH})
+
+
+@needs_postgres
+def test_detach_archives_old_months_and_revert_restores_a_plain_table(pg):
+    with pg.begin() as conn:
+        convert_to_partitioned(conn)
+
+        assert detach_partitions(conn, before=date(2025, 2, 1)) == ["timesheets_2025_01"]
+        assert (_hours(conn, Timesheet), _hours(conn, ArchivedTimesheet)) == (2, 1)
+
+        assert revert_to_plain(conn)
+        assert not is_partitioned(conn)
+        assert _hours(conn, Timesheet) == 2
+
+
+# --- Horas de meses archivados de tarjetas que siguen vivas ---
+
+@pytest.fixture
+def board(api):
+    return api.board()
+
+
+def _archive_month(db, card) -> None:
+    # Lo que deja detach_partitions: horas archivadas de una tarjeta no archivada
+    db.add(ArchivedTimesheet(description="Enero", hours=1, date=JANUARY, version=0, card_id=card["id"]))
+    db.commit()
+
+
+def _archived_cards(db) -> list:
+    db.expire_all()
+    return sorted(row.card_id for row in db.query(ArchivedTimesheet))
+
+
+def test_deleting_a_card_deletes_its_archived_hours(api, db, board):
+    lst = api.list(board["id"])
+    gone, kept = api.card(lst["id"], "Se borra"), api.card(lst["id"], "Se queda")
+    _archive_month(db, gone)
+    _archive_month(db, kept)
+
+    assert api.delete(f"/api/cards/{gone['id']}").status_code == 204
+
+    assert _archived_cards(db) == [kept["id"]]
+
+
+def test_deleting_a_list_or_board_deletes_its_archived_hours(api, db, board):
+    first, second = api.list(board["id"]), api.list(board["id"])
+    _archive_month(db, api.card(first["id"]))
+    _archive_month(db, api.card(second["id"]))
+
+    assert api.delete(f"/api/lists/{first['id']}").status_code == 204
+    assert len(_archived_cards(db)) == 1
+
+    assert api.delete(f"/api/boards/{board['id']}").status_code == 204
+    assert _archived_cards(db) == []
@@ -0,0 +1,99 @@
+# tests/test_timesheets.py - Celdas (usuario, tarjeta, día) de horas y su escritura en lote
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from card_archive import archive_completed_cards
+from models import Timesheet
+
+DAY = "2025-03-03"
+NEXT_DAY = "2025-03-04"
+
+
+@pytest.fixture
+def board(api):
+    return api.board()
+
+
+@pytest.fixture
+def card(api, board):
+    return api.card(api.list(board["id"])["id"])
+
+
+def _entry(card, hours, day=DAY, description="Trabajo"):
+    return {"card_id": card["id"], "hours": hours, "date": day, "description": description}
+
+
+def _bulk(api, *entries, upsert=True):
+    response = api.post("/api/timesheets/bulk", json={"entries": list(entries), "upsert": upsert})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _cells(db):
+    return sorted((row.card_id, row.date.isoformat(), row.hours) for row in db.query(Timesheet))
+
+
+def test_upsert_inserts_new_cells(api, db, card):
+    result = _bulk(api, _entry(card, 2), _entry(card, 3, NEXT_DAY))
+
+    assert (result["created"], result["updated"]) == (2, 0)
+    assert _cells(db) == [(card["id"], DAY, 2), (card["id"], NEXT_DAY, 3)]
+
+
+def test_upsert_overwrites_an_existing_cell(api, db, card):
+    first = _bulk(api, _entry(card, 2))["results"][0]
+
+    result = _bulk(api, _entry(card, 5, description="Corregido"))
+
+    assert result["results"][0] == {"index": 0, "status": "updated", "id": first["id"], "detail": None}
+    assert _cells(db) == [(card["id"], DAY, 5)]
+    assert db.query(Timesheet).one().description == "Corregido"
+
+
+def test_upsert_zero_clears_the_cell(api, db, board, card):
+    _bulk(api, _entry(card, 2))
+    since = api.changes(board["id"], 0)["version"]
+
+    result = _bulk(api, _entry(card, 0), _entry(card, 0, NEXT_DAY))
+
+    assert [r["status"] for r in result["results"]] == ["deleted", "unchanged"]
+    assert _cells(db) == []
+    assert len(api.changes(board["id"], since)["deleted"]["timesheets"]) == 1
+
+
+def test_duplicate_cells(api, db, card):
+    # Con upsert, la segunda entrada de la misma celda es un error...
+    result = _bulk(api, _entry(card, 2), _entry(card, 4))
+    assert [r["status"] for r in result["results"]] == ["created", "error"]
+    assert _cells(db) == [(card["id"], DAY, 2)]
+
+    # ...sin upsert se suman en la misma fila, igual que POST /
+    result = _bulk(api, _entry(card, 1), _entry(card, 1.5), upsert=False)
+    assert {r["id"] for r in result["results"]} == {db.query(Timesheet.id).scalar()}
+    api.post("/api/timesheets/", json=_entry(card, -0.5))
+    db.expire_all()
+    assert _cells(db) == [(card["id"], DAY, 4)]
+
+
+def test_the_database_rejects_a_second_row_for_a_cell(api, db, card):
+    _bulk(api, _entry(card, 2))
+    db.add(Timesheet(description="Duplicada", hours=1, date=db.query(Timesheet.date).scalar(),
+                     card_id=card["id"], user_id=api.user_id))
+    with pytest.raises(IntegrityError):
+        db.commit()
+
+
+
+def test_my_timesheets_can_include_archived_cards(api, db, card):
+    live = api.card(card["list_id"], "Sigue activa")
+    _bulk(api, _entry(card, 2), _entry(live, 1))
+    api.put(f"/api/cards/{card['id']}", json={"completed": True})
+    assert archive_completed_cards(db, older_than_days=0) == 1
+
+    def my_cards(**params):
+        response = api.get("/api/timesheets/me", params=params)
+        assert response.status_code == 200, response.text
+        return sorted(row["card_id"] for row in response.json())
+
+    assert my_cards() == [live["id"]]
+    assert my_cards(include_archived=True) == [card["id"], live["id"]]
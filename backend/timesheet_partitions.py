@@ -0,0 +1,278 @@
+# timesheet_partitions.py - Particiones mensuales de timesheets (PostgreSQL)
+"""En PostgreSQL, ``timesheets`` se puede convertir en una tabla particionada
+por rangos de ``date``: una partición por mes (``timesheets_2025_01``) y una
+por defecto (``timesheets_default``) que recoge las fechas sin partición
+propia. Como todos los informes filtran por fechas, PostgreSQL descarta (poda)
+las particiones fuera del rango. Los modelos y las migraciones no saben nada
+del particionado: se decide aquí, sobre la base ya migrada.
+
+- ``convert``: recrea ``timesheets`` particionada y copia las filas, en una
+  transacción que bloquea la tabla mientras dura. ``revert`` la deshace;
+- ``ensure``: crea las particiones del mes actual y de los
+  ``TIMESHEET_PARTITIONS_AHEAD`` siguientes, y saca de la partición por defecto
+  los meses que hayan caído en ella. ``job_worker.py`` lo llama periódicamente.
+- ``detach --before 2024-01``: desengancha los meses anteriores y pasa sus filas
+  a ``archived_timesheets`` (visibles con ``include_archived``). Con ``--keep``
+  la partición queda como tabla suelta, fuera de la aplicación, p. ej. para
+  volcarla con ``pg_dump`` y borrarla después.
+- ``check-pruning``: ``EXPLAIN`` de una consulta por rango de fechas; falla si
+  se recorren particiones de más.
+
+En SQLite (y en PostgreSQL sin convertir) ``timesheets`` es una tabla normal
+y el resto de comandos no hacen nada.
+
+Uso (desde backend/)::
+
+    python timesheet_partitions.py convert
+    python timesheet_partitions.py list
+    python timesheet_partitions.py ensure
+    python timesheet_partitions.py detach --before 2024-01 [--keep]
+    python timesheet_partitions.py check-pruning --from 2025-03-03 --to 2025-03-09
+"""
+import argparse
+import re
+import sys
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from config import TIMESHEET_PARTITIONS_AHEAD
+from database import engine
+
+PARENT = "timesheets"
+DEFAULT_PARTITION = "timesheets_default"
+_NAME_PATTERN = re.compile(r"^timesheets_(\d{4})_(\d{2})$")
+_COLUMNS = "id, description, hours, date, created_at, updated_at, version, user_id, card_id"
+# Índices y restricción única de models.Timesheet, que se recrean al convertir
+_INDEXES = {
+    "ix_timesheets_id": "id",
+    "ix_timesheets_updated_at": "updated_at",
+    "ix_timesheets_card_version": "card_id, version",
+}
+_UNIQUE_CELL = "uq_timesheets_user_card_date"
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    kind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT}
+    ).scalar()
+    return kind == "p"
+
+
+def _rebuild(conn: Connection, partitioned: bool) -> None:
+    """Recrea timesheets (particionada o no) conservando filas, índices, la
+    celda única y la secuencia de ids."""
+    old = f"{PARENT}_old"
+    conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {old}"))
+    # Los nombres de índices y restricciones son únicos en el esquema
+    for constraint in (f"{PARENT}_pkey", _UNIQUE_CELL):
+        conn.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT {constraint} TO {constraint}_old"))
+    for index in _INDEXES:
+        conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}_old"))
+
+    # Con particiones, la clave primaria y la restricción única deben incluir date
+    conn.execute(text(
+        f"CREATE TABLE {PARENT} ("
+        f"id INTEGER NOT NULL DEFAULT nextval('{PARENT}_id_seq'), "
+        "description VARCHAR NOT NULL, hours FLOAT NOT NULL, date DATE NOT NULL, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE, updated_at TIMESTAMP WITHOUT TIME ZONE, "
+        "version INTEGER NOT NULL, "
+        "user_id INTEGER REFERENCES users (id), "
+        "card_id INTEGER REFERENCES cards (id) ON DELETE CASCADE, "
+        f"CONSTRAINT {_UNIQUE_CELL} UNIQUE (user_id, card_id, date), "
+        + (f"CONSTRAINT {PARENT}_pkey PRIMARY KEY (id, date)) PARTITION BY RANGE (date)"
+           if partitioned else f"CONSTRAINT {PARENT}_pkey PRIMARY KEY (id))")
+    ))
+    if partitioned:
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+        months = conn.execute(text(
+            f"SELECT DISTINCT CAST(date_trunc('month', date) AS date) FROM {old}"
+        )).scalars().all()
+        for month in months:
+            conn.execute(text(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF {PARENT} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            ))
+    for index, columns in _INDEXES.items():
+        conn.execute(text(f"CREATE INDEX {index} ON {PARENT} ({columns})"))
+
+    conn.execute(text(f"INSERT INTO {PARENT} ({_COLUMNS}) SELECT {_COLUMNS} FROM {old}"))
+    conn.execute(text(f"ALTER SEQUENCE {PARENT}_id_seq OWNED BY {PARENT}.id"))
+    # Con la tabla particionada se borran también sus particiones
+    conn.execute(text(f"DROP TABLE {old}"))
+
+
+def convert_to_partitioned(conn: Connection) -> bool:
+    """Convierte timesheets en tabla particionada por meses. Devuelve si cambió."""
+    if conn.dialect.name != "postgresql" or is_partitioned(conn):
+        return False
+    _rebuild(conn, partitioned=True)
+    return True
+
+
+def revert_to_plain(conn: Connection) -> bool:
+    """Vuelve a una tabla normal con todas las filas enganchadas. Devuelve si cambió."""
+    if not is_partitioned(conn):
+        return False
+    _rebuild(conn, partitioned=False)
+    return True
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, Optional[date]]]:
+    """[(nombre, mes)] de las particiones enganchadas; el mes es None en la de defecto."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:name) ORDER BY c.relname"
+    ), {"name": PARENT}).scalars().all()
+    partitions = []
+    for name in names:
+        match = _NAME_PATTERN.match(name)
+        partitions.append((name, date(int(match[1]), int(match[2]), 1) if match else None))
+    return partitions
+
+
+def create_month_partition(conn: Connection, month: date) -> bool:
+    """Crea la partición del mes si no existe. Las filas de ese mes que estén en
+    la partición por defecto se mueven a ella antes de engancharla (si no,
+    PostgreSQL rechaza el ATTACH). Devuelve si se creó."""
+    name = partition_name(month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    bounds = {"start": month, "end": add_months(month, 1)}
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar() is not None:
+        in_month = "date >= :start AND date < :end"
+        conn.execute(text(
+            f"INSERT INTO {name} ({_COLUMNS}) SELECT {_COLUMNS} FROM {DEFAULT_PARTITION} WHERE {in_month}"
+        ), bounds)
+        conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds)
+    # Al enganchar, la partición hereda índices, clave primaria y claves foráneas
+    conn.execute(text(
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    return True
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = TIMESHEET_PARTITIONS_AHEAD,
+                      today: Optional[date] = None) -> List[str]:
+    """Particiones del mes actual y siguientes, más los meses presentes en la
+    partición por defecto. Devuelve las creadas."""
+    if not is_partitioned(conn):
+        return []
+    current = month_start(today or date.today())
+    months = {add_months(current, n) for n in range(months_ahead + 1)}
+    months.update(conn.execute(text(
+        f"SELECT DISTINCT CAST(date_trunc('month', date) AS date) FROM {DEFAULT_PARTITION}"
+    )).scalars())
+    return [partition_name(month) for month in sorted(months) if create_month_partition(conn, month)]
+
+
+def detach_partitions(conn: Connection, before: date, keep: bool = False) -> List[str]:
+    """Desengancha las particiones de meses anteriores a ``before``. Sin ``keep``,
+    sus filas pasan a ``archived_timesheets`` y la tabla se borra."""
+    if not is_partitioned(conn):
+        return []
+    detached = []
+    for name, month in list_partitions(conn):
+        if month is None or month >= month_start(before):
+            continue
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if not keep:
+            conn.execute(text(f"INSERT INTO archived_timesheets ({_COLUMNS}) SELECT {_COLUMNS} FROM {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+def _relations(plan) -> set:
+    """Tablas que recorre un plan de ``EXPLAIN (FORMAT JSON)``."""
+    found = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", ()):
+        found |= _relations(child)
+    return found
+
+
+def check_pruning(conn: Connection, start: date, end: date) -> Tuple[bool, set, set]:
+    """Comprueba con ``EXPLAIN`` que una suma de horas entre ``start`` y ``end``
+    (incluidos) solo recorre las particiones de esos meses.
+    Devuelve (correcto, particiones recorridas, particiones esperadas)."""
+    plan = conn.execute(
+        text(f"EXPLAIN (FORMAT JSON) SELECT SUM(hours) FROM {PARENT} WHERE date >= :start AND date <= :end"),
+        {"start": start, "end": end},
+    ).scalar()
+    scanned = _relations(plan[0]["Plan"])
+    attached = {name for name, _ in list_partitions(conn)}
+    expected = set()
+    month = month_start(start)
+    while month <= end:
+        expected.add(partition_name(month))
+        month = add_months(month, 1)
+    # Los meses sin partición propia se leen de la partición por defecto
+    if expected - attached:
+        expected = (expected & attached) | {DEFAULT_PARTITION}
+    return scanned <= expected, scanned, expected
+
+
+def _month_arg(value: str) -> date:
+    return date.fromisoformat(f"{value}-01")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Particiones mensuales de timesheets (PostgreSQL)")
+    parser.add_argument("command", choices=("convert", "revert", "list", "ensure", "detach", "check-pruning"))
+    parser.add_argument("--before", type=_month_arg, help="Mes YYYY-MM (detach): se desenganchan los anteriores")
+    parser.add_argument("--keep", action="store_true", help="detach: deja la tabla suelta en vez de archivarla")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="check-pruning: primer día")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="check-pruning: último día")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        if conn.dialect.name != "postgresql":
+            print("El particionado de timesheets solo existe en PostgreSQL")
+            sys.exit(0)
+        if args.command == "convert":
+            print("timesheets particionada" if convert_to_partitioned(conn) else "timesheets ya estaba particionada")
+        elif args.command == "revert":
+            print("timesheets vuelve a ser una tabla normal" if revert_to_plain(conn)
+                  else "timesheets no estaba particionada")
+        elif not is_partitioned(conn):
+            print("timesheets no está particionada (python timesheet_partitions.py convert)")
+            sys.exit(0)
+        elif args.command == "list":
+            for name, _ in list_partitions(conn):
+                count = conn.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar()
+                print(f"  {name:<22}{count:>10} filas")
+        elif args.command == "ensure":
+            print(f"Particiones creadas: {', '.join(ensure_partitions(conn)) or 'ninguna'}")
+        elif args.command == "detach":
+            if args.before is None:
+                parser.error("detach necesita --before YYYY-MM")
+            print(f"Desenganchadas: {', '.join(detach_partitions(conn, args.before, args.keep)) or 'ninguna'}")
+        else:
+            today = date.today()
+            start = args.start or today - timedelta(days=today.weekday())
+            end = args.end or start + timedelta(days=6)
+            ok, scanned, expected = check_pruning(conn, start, end)
+            print(f"Recorridas: {', '.join(sorted(scanned))}")
+            print(f"Esperadas:  {', '.join(sorted(expected))}")
+            if not ok:
+                print("La poda de particiones no se aplica")
+                sys.exit(1)
@@ -1,41 +1,210 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
-from models import Timesheet, User, Card
-from schemas import Timesheet as TimesheetSchema, TimesheetCreate
-from auth_router import get_current_user
+from db_router import get_read_db
+from models import Timesheet, User, Card, List as ListModel, Board, Tombstone
+from schemas import (
+    Timesheet as TimesheetSchema,
+    TimesheetCreate,
+    TimesheetBulkCreate,
+    TimesheetBulkResponse,
+    TimesheetBulkResult,
+)
+from auth_router import get_current_read_user, get_current_user
+from board_sync import touch_board
+from card_archive import timesheet_source
+from card_counters import adjust_card_counters, recompute_card_hours
+from hot_queries import owned_card
 
 router = APIRouter(tags=["Timesheets"])
 
+# Celda de la rejilla: (usuario, tarjeta, día), única en la tabla
+_CELL = ["user_id", "card_id", "date"]
+_timesheets = Timesheet.__table__
+
+
+def _write_cells(db: Session, rows: list, add: bool) -> list:
+    """Escribe las celdas con ``INSERT ... ON CONFLICT DO UPDATE`` y devuelve sus
+    ids en el orden de ``rows``. Con ``add`` las horas se suman a las de la celda;
+    si no, la sustituyen. Las filas sin tarjeta nunca coinciden y se insertan."""
+    insert_cells = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_cells(_timesheets)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_CELL,
+        set_={
+            "hours": _timesheets.c.hours + stmt.excluded.hours if add else stmt.excluded.hours,
+            "description": stmt.excluded.description,
+            "updated_at": stmt.excluded.updated_at,
+            "version": stmt.excluded.version,
+        },
+    )
+    return db.execute(stmt.returning(_timesheets.c.id, sort_by_parameter_order=True), rows).scalars().all()
+
+
+def _cell_row(user_id: int, entry, hours: float, version: int, now: datetime) -> dict:
+    return {
+        **entry.model_dump(),
+        "hours": hours,
+        "user_id": user_id,
+        "created_at": now,
+        "updated_at": now,
+        "version": version,
+    }
+
+
 @router.post("/", response_model=TimesheetSchema, status_code=status.HTTP_201_CREATED)
 async def create_timesheet(
     timesheet_in: TimesheetCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Suma horas a la celda (tarjeta, día) del usuario; las negativas restan.
+    Devuelve la celda con su total."""
     # Verificar si la tarjeta existe y pertenece al usuario (si se envía card_id)
+    board_id = None
     if timesheet_in.card_id:
-        card = db.query(Card).filter(Card.id == timesheet_in.card_id).first()
-        if not card:
+        card = owned_card(db, timesheet_in.card_id, current_user.id)
+        if card is None:
             raise HTTPException(status_code=404, detail="Tarjeta no encontrada")
+        board_id = card.board_id
 
-    new_entry = Timesheet(
-        **timesheet_in.dict(),
-        user_id=current_user.id
-    )
-    db.add(new_entry)
+    version = touch_board(db, board_id) if board_id else 0
+    row = _cell_row(current_user.id, timesheet_in, timesheet_in.hours, version, datetime.utcnow())
+    [entry_id] = _write_cells(db, [row], add=True)
+    if timesheet_in.card_id:
+        adjust_card_counters(db, timesheet_in.card_id, board_id, total_hours=timesheet_in.hours)
     db.commit()
-    db.refresh(new_entry)
-    return new_entry
+    return db.get(Timesheet, entry_id)
 
-@router.get("/me", response_model=List[TimesheetSchema])
-async def get_my_timesheets(
+@router.post("/bulk", response_model=TimesheetBulkResponse)
+async def create_timesheets_bulk(
+    bulk_in: TimesheetBulkCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
+):
+    """Registra muchas horas a la vez (p. ej. la rejilla semanal) en una sola transacción.
+
+    Sin ``upsert`` las horas se suman a cada celda, como en ``POST /``; con
+    ``upsert`` sustituyen su valor y 0 la vacía. Las filas con tarjetas
+    inexistentes o ajenas se devuelven como `error` y no impiden guardar el resto.
+    """
+    entries = bulk_in.entries
+    results = [TimesheetBulkResult(index=i, status="pending") for i in range(len(entries))]
+
+    # 1. Validar todas las tarjetas (existencia y propiedad) con una sola consulta
+    card_ids = {e.card_id for e in entries if e.card_id}
+    card_boards = {}
+    if card_ids:
+        card_boards = dict(
+            db.query(Card.id, ListModel.board_id)
+            .join(ListModel, ListModel.id == Card.list_id)
+            .join(Board, Board.id == ListModel.board_id)
+            .filter(Card.id.in_(card_ids), Board.user_id == current_user.id)
+            .all()
+        )
+
+    cells = {}  # (tarjeta, día) -> índices de la petición
+    loose = []  # horas sin tarjeta: filas sueltas, fuera de la rejilla
+    for i, entry in enumerate(entries):
+        cell = (entry.card_id, entry.date)
+        if entry.card_id and entry.card_id not in card_boards:
+            results[i].status, results[i].detail = "error", "Tarjeta no encontrada"
+        elif entry.hours < 0 or (entry.hours == 0 and not bulk_in.upsert):
+            results[i].status, results[i].detail = "error", "Las horas deben ser positivas"
+        elif bulk_in.upsert and not entry.card_id:
+            results[i].status, results[i].detail = "error", "La celda necesita una tarjeta"
+        elif bulk_in.upsert and cell in cells:
+            results[i].status, results[i].detail = "error", "Celda duplicada en la petición"
+        elif not entry.card_id:
+            loose.append(i)
+        else:
+            # Sin upsert, las entradas de una misma celda se suman en una sola fila
+            cells.setdefault(cell, []).append(i)
+
+    # 2. Celdas que ya existen, solo para informar de created/updated
+    existing = set()
+    if cells:
+        existing = {
+            (row.card_id, row.date)
+            for row in db.query(Timesheet.card_id, Timesheet.date).filter(
+                Timesheet.user_id == current_user.id,
+                Timesheet.card_id.in_({card_id for card_id, _ in cells}),
+                Timesheet.date.in_({day for _, day in cells}),
+            )
+        } & cells.keys()
+
+    now = datetime.utcnow()
+    rows, row_indexes, to_clear = [], [], []
+    for cell, indexes in cells.items():
+        hours = sum(entries[i].hours for i in indexes)
+        if hours == 0:
+            to_clear.append(cell)
+            continue
+        version = touch_board(db, card_boards[cell[0]])
+        rows.append(_cell_row(current_user.id, entries[indexes[-1]], hours, version, now))
+        row_indexes.append(indexes)
+    for i in loose:
+        rows.append(_cell_row(current_user.id, entries[i], entries[i].hours, 0, now))
+        row_indexes.append([i])
+
+    # 3. Escribir todo en la misma transacción: un INSERT ... ON CONFLICT
+    # multi-fila (seguro ante peticiones concurrentes) y un DELETE por celdas.
+    if rows:
+        for indexes, row, entry_id in zip(row_indexes, rows, _write_cells(db, rows, add=not bulk_in.upsert)):
+            cell = (row["card_id"], row["date"])
+            for i in indexes:
+                results[i].status = "updated" if cell in existing else "created"
+                results[i].id = entry_id
+    cleared = {}
+    if to_clear:
+        cleared = {
+            (card_id, day): entry_id
+            for entry_id, card_id, day in db.execute(
+                delete(_timesheets)
+                .where(_timesheets.c.user_id == current_user.id,
+                       tuple_(_timesheets.c.card_id, _timesheets.c.date).in_(to_clear))
+                .returning(_timesheets.c.id, _timesheets.c.card_id, _timesheets.c.date)
+            )
+        }
+        for (card_id, _), entry_id in cleared.items():
+            board_id = card_boards[card_id]
+            db.add(Tombstone(
+                board_id=board_id,
+                entity_type="timesheets",
+                entity_id=entry_id,
+                version=touch_board(db, board_id),
+            ))
+        for cell in to_clear:
+            for i in cells[cell]:
+                results[i].status = "deleted" if cell in cleared else "unchanged"
+    # Otra petición pudo escribir las mismas celdas: se suman de nuevo las horas
+    recompute_card_hours(db, {card_id: card_boards[card_id] for card_id, _ in cells})
+    db.commit()
+
+    counts = {name: sum(1 for r in results if r.status == name)
+              for name in ("created", "updated", "deleted", "error")}
+    return TimesheetBulkResponse(
+        created=counts["created"],
+        updated=counts["updated"],
+        deleted=counts["deleted"],
+        errors=counts["error"],
+        results=results,
+    )
+
+@router.get("/me", response_model=List[TimesheetSchema])
+async def get_my_timesheets(
+    include_archived: bool = Query(False, description="Incluye las horas de tarjetas archivadas"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """Retorna todos los registros de horas del usuario autenticado"""
-    return db.query(Timesheet).filter(Timesheet.user_id == current_user.id).all()
+    TimesheetSrc = timesheet_source(include_archived)
+    return db.query(TimesheetSrc).filter(TimesheetSrc.user_id == current_user.id).all()
 
 @router.delete("/{timesheet_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_timesheet(
@@ -51,6 +220,9 @@ async def delete_timesheet(
     if not db_entry:
         raise HTTPException(status_code=404, detail="Registro no encontrado")
     
+    if db_entry.card_id:
+        board_id = db_entry.card.list_ref.board_id
+        adjust_card_counters(db, db_entry.card_id, board_id, total_hours=-db_entry.hours)
     db.delete(db_entry)
     db.commit()
     return None
\ No newline at end of file